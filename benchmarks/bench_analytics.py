@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark: full season rebuild vs incremental update of the derived analytics
+
+Usage:
+    python benchmarks/bench_analytics.py PAGES_DIR [--season 1230] [--night 8]
+
+Builds a season of --season games from the saved pages (each copy with its
+own game id, a date spread over the season and two of 30 scheduled teams), then times:
+
+- a full build of every metric over the whole season, and
+- adding one more night of --night games to the already built season, which
+  recomputes only the players and teams who played that night.
+
+Also checks that the incremental result matches a full rebuild.
+"""
+
+import argparse
+import contextlib
+import datetime
+import glob
+import io
+import itertools
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from src.analytics import SeasonAnalytics, player_rows
+from src.scraper import NBAGameScraper
+
+SEASON_START = datetime.date(2025, 10, 21)
+TEAMS = 30
+
+
+def page_rows(paths):
+    """Player rows of each distinct page, parsed once"""
+    frames = []
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            html = f.read()
+        scraper = NBAGameScraper(path)
+        with contextlib.redirect_stdout(io.StringIO()):
+            scraper.parse(html)
+        frame = player_rows(scraper)
+        if not frame.empty:
+            frames.append(frame)
+    return frames
+
+
+def season_games(frames, count, first=0, games_per_day=8):
+    """
+    count copies of the page rows on a round-robin schedule of TEAMS teams
+
+    Each copy gets its own game id and date; its two box scores become the
+    scheduled home and away teams, and players are named by team and roster slot.
+    """
+    games = []
+    for index, frame in zip(range(first, first + count), itertools.cycle(frames)):
+        date = SEASON_START + datetime.timedelta(days=index // games_per_day)
+        home = index % TEAMS
+        away = (home + 1 + (index // TEAMS) % (TEAMS - 1)) % TEAMS
+        sides = dict(zip(frame['team'].unique(), (f"Team {home:02d}", f"Team {away:02d}")))
+        game = frame.assign(game_id=f"game_{index:05d}", date=date.isoformat(), team=frame['team'].map(sides))
+        game['player'] = game['team'] + ' #' + game.groupby('team').cumcount().astype(str)
+        games.append(game)
+    return pd.concat(games, ignore_index=True)
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time full vs incremental analytics updates')
+    parser.add_argument('pages_dir', help='Directory of saved game pages (*.html)')
+    parser.add_argument('--season', type=int, default=1230, help='Games already in the season (default: 1230)')
+    parser.add_argument('--night', type=int, default=8, help='Games added incrementally (default: 8)')
+    args = parser.parse_args()
+
+    frames = page_rows(sorted(glob.glob(os.path.join(args.pages_dir, '*.html'))))
+    if not frames:
+        print(f"No pages with box scores found in {args.pages_dir}")
+        sys.exit(1)
+
+    season = season_games(frames, args.season)
+    night = season_games(frames, args.night, first=args.season, games_per_day=args.night)
+    print(f"Season: {args.season} games, {len(season)} player rows; night: {args.night} games")
+
+    analytics, full = timed(SeasonAnalytics().add_games, season)
+    print(f"Full build of the season:             {full:7.3f}s")
+
+    _, incremental = timed(analytics.add_games, night)
+    update = analytics.last_update
+    print(f"Incremental night ({update['players']} players, {update['teams']} teams): {incremental:7.3f}s")
+
+    rebuilt, rebuild = timed(SeasonAnalytics().add_games, pd.concat([season, night], ignore_index=True))
+    print(f"Full rebuild including the night:     {rebuild:7.3f}s  ({rebuild / incremental:.1f}x slower)")
+
+    for name, frame in analytics.tables().items():
+        keys = [column for column in ('game_id', 'team', 'player') if column in frame]
+        expected = rebuilt.tables()[name].sort_values(keys).reset_index(drop=True)
+        pd.testing.assert_frame_equal(frame.sort_values(keys).reset_index(drop=True), expected[frame.columns],
+                                      check_dtype=False)
+    print("Incremental result matches the full rebuild")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Batch mode end to end against a local stand-in for the game site
+
+Usage:
+    python benchmarks/bench_batch.py [PAGES_DIR] [--fetch-workers 4] [--parse-workers 2] [--format csv]
+
+Serves the saved pages (default: fixtures/corpus/pages) from a
+ThreadingHTTPServer on an ephemeral port, runs BatchScraper over every page
+plus one game id the server doesn't have, and checks each game's record:
+every page succeeds with its output written under the game id, and the
+missing game fails with the fetcher's 404 error. When a page has a golden
+document (fixtures/corpus/golden/<page>.json) its player count must match
+it, otherwise the page must give some players. Prints the batch throughput
+and OK, or each mismatch and exits with status 1.
+"""
+
+import argparse
+import contextlib
+import functools
+import glob
+import io
+import json
+import os
+import sys
+import tempfile
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.batch import BatchScraper
+from src.fetcher import create_fetcher
+from src.writers import create_writers
+
+GOLDEN_DIR = os.path.join(ROOT, 'fixtures', 'corpus', 'golden')
+MISSING_GAME = '00000000-0000-0000-0000-000000000000'
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(directory):
+    """Server for the files in directory on 127.0.0.1 and a free port, running in a daemon thread"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), functools.partial(_QuietHandler, directory=directory))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def expected_players(name):
+    """Player rows the golden document for a page records, or None when the page has no golden"""
+    path = os.path.join(GOLDEN_DIR, f"{name}.json")
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return len(json.load(f).get('player_stats') or [])
+
+
+def check_results(results, pages, base_url):
+    """Mismatches between the batch's per-game records and what the served pages should give"""
+    problems = []
+    by_url = {result['url']: result for result in results}
+    if len(results) != len(pages) + 1:
+        problems.append(f"{len(results)} records for {len(pages) + 1} games")
+    for name in pages:
+        result = by_url.get(base_url + name)
+        if result is None:
+            problems.append(f"{name}: no record")
+        elif not result['success']:
+            problems.append(f"{name}: failed with {result['error']}")
+        elif not result['output'] or not os.path.exists(result['output']) or name not in result['output']:
+            problems.append(f"{name}: output {result['output']!r} missing or not named after the game")
+        else:
+            expected = expected_players(name)
+            if expected is None and not result['players']:
+                problems.append(f"{name}: no player rows")
+            elif expected is not None and result['players'] != expected:
+                problems.append(f"{name}: {result['players']} player rows, golden has {expected}")
+    missing = by_url.get(base_url + MISSING_GAME)
+    if missing is None:
+        problems.append(f"{MISSING_GAME}: no record")
+    elif missing['success'] or 'Fetch failed' not in missing['error'] or '404' not in missing['error']:
+        problems.append(f"{MISSING_GAME}: expected a 404 fetch failure, got {missing}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run batch mode against saved pages served locally')
+    parser.add_argument('pages_dir', nargs='?', default=os.path.join(ROOT, 'fixtures', 'corpus', 'pages'),
+                        help='Directory of saved game pages (*.html) (default: fixtures/corpus/pages)')
+    parser.add_argument('--fetch-workers', type=int, default=4, help='Concurrent fetches (default: 4)')
+    parser.add_argument('--parse-workers', type=int, default=2, help='Parse processes (default: 2)')
+    parser.add_argument('--format', default='csv', help='Comma-separated output formats (default: csv)')
+    args = parser.parse_args()
+
+    pages = sorted(os.path.basename(path) for path in glob.glob(os.path.join(args.pages_dir, '*.html')))
+    if not pages:
+        print(f"No .html pages found in {args.pages_dir}")
+        sys.exit(1)
+
+    server = start_server(os.path.abspath(args.pages_dir))
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/"
+    urls = [base_url + name for name in pages] + [base_url + MISSING_GAME]
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            formats = [name.strip() for name in args.format.split(',')]
+            writers = create_writers(formats, roots={name: os.path.join(tmp, name) for name in formats})
+            batch = BatchScraper(urls, fetch_workers=args.fetch_workers, parse_workers=args.parse_workers,
+                                 writers=writers, session=create_fetcher(pool_size=args.fetch_workers, retries=0))
+            with contextlib.redirect_stdout(io.StringIO()):
+                summary = batch.run()
+            problems = check_results(batch.results, pages, base_url)
+    finally:
+        server.shutdown()
+
+    print(f"Games: {summary['games']} (succeeded: {summary['succeeded']}, failed: {summary['failed']})  "
+          f"{summary['games_per_second']:.1f} games/s, {summary['megabytes']:.2f} MB")
+    for problem in problems:
+        print(f"MISMATCH {problem}")
+    if problems:
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Benchmark: typed columnar box scores vs lists of string dicts
+
+Usage:
+    python benchmarks/bench_boxscore.py PAGES_DIR [--copies N]
+
+Converts every page's box-score tables (N times, to approximate a season) and
+compares, for all games together:
+  - memory held by the string DataFrames vs the typed frames
+  - time to numeric columns: player_stats dicts + DataFrame + string parsing vs the typed builder
+
+Both paths get the same tables, the ones the scraper classifies as box scores
+(src/layout.py), and must produce the same number of player rows.
+"""
+
+import argparse
+import contextlib
+import glob
+import io
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from src.boxscore import BoxScoreBuilder
+from src.layout import BOX_SCORE, classify_page
+from src.scraper import NBAGameScraper
+
+
+def numeric_from_strings(df):
+    """What downstream code has to do with the string frame to aggregate it"""
+    out = pd.DataFrame(index=df.index)
+    for col in df.columns:
+        values = df[col].astype(str)
+        if values.str.fullmatch(r'\d+:\d+').any():
+            parts = values.str.split(':', expand=True)
+            out[col] = pd.to_numeric(parts[0], errors='coerce') * 60 + pd.to_numeric(parts[1], errors='coerce')
+        elif values.str.fullmatch(r'\d+-\d+').any():
+            parts = values.str.split('-', expand=True)
+            out[f'{col}_made'] = pd.to_numeric(parts[0], errors='coerce')
+            out[f'{col}_att'] = pd.to_numeric(parts[1], errors='coerce')
+        else:
+            out[col] = pd.to_numeric(values, errors='coerce')
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare typed and string box-score representations')
+    parser.add_argument('pages_dir', help='Directory of saved game pages (*.html)')
+    parser.add_argument('--copies', type=int, default=20, help='Times each page is parsed (default: 20)')
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(os.path.join(args.pages_dir, '*.html')))
+    if not paths:
+        print(f"No .html pages found in {args.pages_dir}")
+        sys.exit(1)
+
+    # Parse once; both representations are built from the same box-score tables
+    tables = []
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            scraper = NBAGameScraper(path)
+            with contextlib.redirect_stdout(io.StringIO()):
+                page = classify_page(scraper.build_page(f.read()), path)
+        tables.append([table for table in page.tables if table.role == BOX_SCORE])
+    games = tables * args.copies
+
+    def string_path():
+        frames = []
+        for game in games:
+            player_stats = []
+            for table in game:
+                for cols in table.rows[1:]:
+                    if len(cols) > 1:  # Section rows (替補) carry no stats; the typed builder skips them too
+                        player_stats.append({table.headers[i]: col for i, col in enumerate(cols)
+                                             if i < len(table.headers)})
+            frames.append(pd.DataFrame(player_stats))
+            numeric_from_strings(frames[-1])
+        return frames
+
+    def typed_path():
+        frames = []
+        for game in games:
+            builder = BoxScoreBuilder()
+            for table in game:
+                builder.start_table(table.headers)
+                for cols in table.rows[1:]:
+                    if cols:
+                        builder.add_row(cols)
+            frames.append(builder.to_frame())
+        return frames
+
+    results = {}
+    for name, func in (('string dicts', string_path), ('typed columns', typed_path)):
+        start = time.perf_counter()
+        frames = func()
+        elapsed = time.perf_counter() - start
+        del frames
+
+        # Separate run for memory; tracemalloc would distort the timing
+        tracemalloc.start()
+        frames = func()
+        held, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        rows = sum(len(df) for df in frames)
+        frame_bytes = sum(df.memory_usage(deep=True).sum() for df in frames)
+        results[name] = (elapsed, held, frame_bytes, rows)
+        del frames
+
+    if results['string dicts'][3] != results['typed columns'][3]:
+        print(f"Row counts differ: {results['string dicts'][3]} string rows vs {results['typed columns'][3]} typed rows")
+        sys.exit(1)
+    print(f"Games: {len(games)} ({len(paths)} pages x {args.copies})")
+    for name, (elapsed, held, frame_bytes, rows) in results.items():
+        print(f"{name:<14} {elapsed * 1000:9.1f} ms  {held / 1e6:8.2f} MB held  "
+              f"{frame_bytes / 1e6:8.2f} MB in frames  {rows} rows")
+    string_result, typed_result = results['string dicts'], results['typed columns']
+    print(f"Time: {string_result[0] / typed_result[0]:.2f}x faster  "
+          f"Frame memory: {string_result[2] / typed_result[2]:.2f}x smaller")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark: one workbook per game vs one combined workbook for a night or a batch
+
+Usage:
+    python benchmarks/bench_combined.py PAGES_DIR [--games 15,100]
+
+For each game count (cycling through the saved pages, each copy with its own
+game id) the games are parsed first, then written by:
+
+- excel normal:     one workbook per game through pandas/openpyxl (the default)
+- excel write-only: one workbook per game in openpyxl's write-only mode
+- combined:         every game spooled, then streamed into one write-only workbook
+
+Reports wall time, Python peak memory of the writing (tracemalloc, in a
+second pass so tracing does not skew the timings), files written and bytes.
+"""
+
+import argparse
+import contextlib
+import gc
+import glob
+import io
+import itertools
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.scraper import NBAGameScraper
+from src.writers import CombinedExcelOutput, ExcelOutput
+
+
+def parse_games(paths):
+    scrapers = []
+    for index, path in enumerate(paths):
+        with open(path, encoding='utf-8') as f:
+            html = f.read()
+        scraper = NBAGameScraper(f"bench/game_{index:04d}")
+        with contextlib.redirect_stdout(io.StringIO()):
+            scraper.parse(html)
+            scraper.compact()
+        scrapers.append(scraper)
+    return scrapers
+
+
+def write_all(make_writer, scrapers):
+    """Write every game into a fresh directory; returns (seconds, files, bytes)"""
+    with tempfile.TemporaryDirectory() as tmp:
+        writer = make_writer(tmp)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for scraper in scrapers:
+                if not writer.write(scraper, scraper.output_basename(include_game_id=True)):
+                    raise RuntimeError(f"Writing {scraper.game_id} failed")
+            writer.close()
+        elapsed = time.perf_counter() - start
+        files = glob.glob(os.path.join(tmp, '*.xlsx'))
+        return elapsed, len(files), sum(os.path.getsize(path) for path in files)
+
+
+def peak_memory(make_writer, scrapers):
+    """Peak Python memory (MB) allocated while writing every game"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        write_all(make_writer, scrapers)
+        return tracemalloc.get_traced_memory()[1] / 1e6
+    finally:
+        tracemalloc.stop()
+
+
+MODES = {
+    'excel normal': lambda root: ExcelOutput(root),
+    'excel write-only': lambda root: ExcelOutput(root, mode='write-only'),
+    'combined': lambda root: CombinedExcelOutput(root, combine_by='all'),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare per-game and combined Excel output')
+    parser.add_argument('pages_dir', help='Directory of saved game pages (*.html)')
+    parser.add_argument('--games', default='15,100', help='Comma-separated game counts (default: 15,100)')
+    args = parser.parse_args()
+
+    pages = sorted(glob.glob(os.path.join(args.pages_dir, '*.html')))
+    if not pages:
+        print(f"No .html pages found in {args.pages_dir}")
+        sys.exit(1)
+
+    for count in [int(value) for value in args.games.split(',')]:
+        scrapers = parse_games(list(itertools.islice(itertools.cycle(pages), count)))
+        print(f"\n{count} games")
+        print(f"{'mode':<18} {'seconds':>8} {'games/s':>8} {'peak MB':>8} {'files':>6} {'MB on disk':>10}")
+        for name, make_writer in MODES.items():
+            elapsed, files, size = write_all(make_writer, scrapers)
+            peak = peak_memory(make_writer, scrapers)
+            print(f"{name:<18} {elapsed:8.2f} {count / elapsed:8.1f} {peak:8.1f} {files:6d} {size / 1e6:10.2f}")
+        scrapers = None
+
+
+if __name__ == "__main__":
+    main()
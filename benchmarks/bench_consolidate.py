@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark: vectorized season-stat consolidation vs the row-by-row pivot loop
+
+Usage:
+    python benchmarks/bench_consolidate.py PAGES_DIR [--repeat N]
+
+Parses every page once, then times building the 'Team Season Statistics'
+table per game with the old loop (two pivot_tables plus per-cell .loc) and
+with the single reshape, checks both give the same table, and times the
+league-wide team x statistic matrix over all games at once.
+"""
+
+import argparse
+import contextlib
+import glob
+import io
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.consolidate import STAT_MAPPING, is_season_table, league_matrix, league_stats_long, season_stats_wide
+from src.layout import BOX_SCORE
+from src.scraper import NBAGameScraper, table_role
+
+
+def loop_consolidation(scraper):
+    """The original consolidation: shape-check tables in Python, two pivots, then .loc per cell"""
+    team_season_stats = []
+    for table_info in scraper.all_data.get('tables', []):
+        data = table_info['data']
+        if data and table_role(table_info) != BOX_SCORE and is_season_table(data):
+            stat_category = data[0][0]
+            if stat_category in STAT_MAPPING:
+                for row in data[1:3]:
+                    english_name = scraper.team_name_mapping.get(row[0], row[0])
+                    team_season_stats.append({'Team': f"{row[0]}({english_name})",
+                                              'Statistic': STAT_MAPPING[stat_category],
+                                              'Value': row[1], 'League Rank': row[2]})
+    if not team_season_stats:
+        return pd.DataFrame()
+
+    df_team_stats = pd.DataFrame(team_season_stats)
+    pivot_stats = df_team_stats.pivot_table(index='Statistic', columns='Team', values='Value', aggfunc='first')
+    pivot_ranks = df_team_stats.pivot_table(index='Statistic', columns='Team', values='League Rank',
+                                            aggfunc='first')
+    combined_data = []
+    for stat in pivot_stats.index:
+        row_data = {'Statistic': stat}
+        for team in pivot_stats.columns:
+            row_data[f'{team} Value'] = pivot_stats.loc[stat, team]
+            row_data[f'{team} Rank'] = pivot_ranks.loc[stat, team] if team in pivot_ranks.columns else ''
+        combined_data.append(row_data)
+    return pd.DataFrame(combined_data)
+
+
+def timed(function, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = function()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare season-stat consolidation strategies')
+    parser.add_argument('pages_dir', help='Directory of saved game pages (*.html)')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed repetitions (default: 5)')
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(os.path.join(args.pages_dir, '*.html')))
+    if not paths:
+        print(f"No .html pages found in {args.pages_dir}")
+        sys.exit(1)
+
+    scrapers = []
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            scraper = NBAGameScraper(path)
+            with contextlib.redirect_stdout(io.StringIO()):
+                scraper.parse(f.read())
+        scrapers.append(scraper)
+
+    loop_time, loop_tables = timed(lambda: [loop_consolidation(s) for s in scrapers], args.repeat)
+    vector_time, vector_tables = timed(lambda: [season_stats_wide(s.season_stats_frame()) for s in scrapers],
+                                       args.repeat)
+    mismatches = sum(1 for old, new in zip(loop_tables, vector_tables)
+                     if not old.reset_index(drop=True).equals(new.reset_index(drop=True)))
+
+    matrix_time, matrix = timed(lambda: league_matrix(league_stats_long(scrapers)), args.repeat)
+
+    print(f"Games: {len(scrapers)}")
+    print(f"{'strategy':<28} {'total ms':>10} {'ms/game':>9}")
+    print(f"{'pivot loop':<28} {loop_time * 1000:10.1f} {loop_time * 1000 / len(scrapers):9.3f}")
+    print(f"{'single reshape':<28} {vector_time * 1000:10.1f} {vector_time * 1000 / len(scrapers):9.3f}")
+    print(f"{'league matrix (all games)':<28} {matrix_time * 1000:10.1f} {matrix_time * 1000 / len(scrapers):9.3f}")
+    print(f"Speedup: {loop_time / vector_time:.1f}x   Mismatched tables: {mismatches}")
+    print(f"League matrix: {matrix.shape[0]} teams x {matrix.shape[1]} statistics")
+
+
+if __name__ == "__main__":
+    main()
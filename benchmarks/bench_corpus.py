@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Benchmark and regression check over the saved page corpus (fixtures/corpus)
+
+Usage:
+    python benchmarks/bench_corpus.py [--repeat 20] [--parser bs4|lxml] [--format excel,csv]
+                                      [--threshold 0.25] [--record-golden] [--save-baseline]
+    python benchmarks/bench_corpus.py --save-page URL NAME
+
+Serves the corpus pages from a local HTTP server and runs each one through
+fetch, parse and export (into a temporary directory) --repeat times. Reports
+per-stage p50/p90/p99 latency and throughput, then:
+
+- compares player_stats, team_stats, all_data, game_data, team names and
+  every exported sheet with fixtures/corpus/golden/<page>.json, and
+- compares each stage's p50 and the overall throughput with
+  fixtures/corpus/baseline.json.
+
+Exits with status 1 when any output differs or a stage is more than
+--threshold slower than the baseline (stages under --floor ms are ignored,
+they are too short to time reliably). --record-golden rewrites the golden
+files after an intended output change; --save-baseline stores this run's
+timings (baselines are machine-specific, record one per machine).
+--save-page downloads a live game page into the corpus.
+"""
+
+import argparse
+import contextlib
+import functools
+import glob
+import http.server
+import io
+import json
+import math
+import os
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.fetcher import create_fetcher
+from src.scraper import NBAGameScraper
+from src.writers import WRITERS, create_writers
+
+CORPUS_DIR = os.path.join(ROOT, 'fixtures', 'corpus')
+PAGES_DIR = os.path.join(CORPUS_DIR, 'pages')
+GOLDEN_DIR = os.path.join(CORPUS_DIR, 'golden')
+BASELINE_PATH = os.path.join(CORPUS_DIR, 'baseline.json')
+
+PERCENTILES = (50, 90, 99)
+
+
+class QuietHandler(http.server.SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def _plain(value):
+    """Sheet cell as a JSON value: missing values become None, everything else its string form"""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+    try:
+        if value != value:  # pd.NA and NaT
+            return None
+    except TypeError:
+        return None
+    return str(value)
+
+
+def snapshot(scraper):
+    """Everything the regression check compares, as JSON-compatible data"""
+    sheets = {}
+    for sheet in scraper.build_sheets():
+        sheets[sheet.name] = {
+            'header': sheet.header,
+            'columns': [str(col) for col in sheet.frame.columns],
+            'rows': [[_plain(value) for value in row] for row in sheet.frame.itertuples(index=False, name=None)],
+        }
+    document = {
+        'game_data': scraper.game_data,
+        'team_names': scraper.team_names,
+        'team_names_chinese': scraper.team_names_chinese,
+        'player_stats': scraper.player_stats,
+        'team_stats': scraper.team_stats,
+        'all_data': getattr(scraper, 'all_data', {}),
+        'sheets': sheets,
+    }
+    return json.loads(json.dumps(document, ensure_ascii=False))
+
+
+def differences(expected, actual):
+    """Top-level keys (and sheet names) whose content changed"""
+    changed = []
+    for key in sorted(set(expected) | set(actual)):
+        if key == 'sheets':
+            sheets_expected, sheets_actual = expected.get(key, {}), actual.get(key, {})
+            changed.extend(f"sheet {name!r}" for name in sorted(set(sheets_expected) | set(sheets_actual))
+                           if sheets_expected.get(name) != sheets_actual.get(name))
+        elif expected.get(key) != actual.get(key):
+            changed.append(key)
+    return changed
+
+
+def run_game(url, parser, fetcher, writers):
+    """Fetch, parse and export one page; returns (scraper, wall seconds)"""
+    start = time.perf_counter()
+    scraper = NBAGameScraper(url, parser=parser, session=fetcher)
+    with contextlib.redirect_stdout(io.StringIO()):
+        html = scraper.fetch_page()
+        if html is None:
+            raise RuntimeError(f"Could not fetch {url}: {scraper.last_error}")
+        scraper.scrape(html_content=html, include_game_id=True, writers=writers)
+    return scraper, time.perf_counter() - start
+
+
+def save_page(url, name):
+    """Download a live game page into the corpus (record its golden output with --record-golden)"""
+    fetcher = create_fetcher()
+    response = fetcher.get(url)
+    response.raise_for_status()
+    response.encoding = 'utf-8'
+    path = os.path.join(PAGES_DIR, name if name.endswith('.html') else f"{name}.html")
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(response.text)
+    print(f"Saved {url} to {path} ({len(response.content) / 1e3:.1f} kB)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark and regression-check the scraper on the page corpus')
+    parser.add_argument('--repeat', type=int, default=20, help='Runs per page (default: 20)')
+    parser.add_argument('--parser', choices=['bs4', 'lxml'], default='bs4', help='Parser backend (default: bs4)')
+    parser.add_argument('--format', default='excel',
+                        help=f"Comma-separated export formats: {', '.join(WRITERS)} (default: excel)")
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='Allowed slowdown against the baseline, 0.25 = 25%% (default: 0.25)')
+    parser.add_argument('--floor', type=float, default=1.0,
+                        help='Stages with a baseline p50 under this many ms are not checked (default: 1)')
+    parser.add_argument('--record-golden', action='store_true', help='Rewrite the golden outputs from this run')
+    parser.add_argument('--save-baseline', action='store_true', help='Store this run as the timing baseline')
+    parser.add_argument('--save-page', nargs=2, metavar=('URL', 'NAME'), help='Add a live page to the corpus')
+    args = parser.parse_args()
+
+    if args.save_page:
+        save_page(*args.save_page)
+        return
+
+    pages = sorted(os.path.basename(path) for path in glob.glob(os.path.join(PAGES_DIR, '*.html')))
+    if not pages:
+        print(f"No pages in {PAGES_DIR}")
+        sys.exit(1)
+
+    handler = functools.partial(QuietHandler, directory=PAGES_DIR)
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}/"
+    fetcher = create_fetcher()
+
+    failures = []
+    stage_seconds = {}
+    game_seconds = []
+    os.makedirs(GOLDEN_DIR, exist_ok=True)
+    with tempfile.TemporaryDirectory() as tmp:
+        formats = [name.strip() for name in args.format.split(',') if name.strip()]
+        writers = create_writers(formats, roots={name: os.path.join(tmp, name) for name in formats})
+
+        # Warm-up: imports and first-call costs stay out of the timings
+        run_game(base + pages[0], args.parser, fetcher, writers)
+
+        start = time.perf_counter()
+        for page in pages:
+            golden_path = os.path.join(GOLDEN_DIR, f"{page}.json")
+            for run in range(args.repeat):
+                scraper, seconds = run_game(base + page, args.parser, fetcher, writers)
+                game_seconds.append(seconds)
+                for name, stats in scraper.profiler.summary()['stages'].items():
+                    stage_seconds.setdefault(name, []).append(stats['seconds'])
+                if run:
+                    continue
+
+                with contextlib.redirect_stdout(io.StringIO()):
+                    actual = snapshot(scraper)
+                if args.record_golden:
+                    with open(golden_path, 'w', encoding='utf-8') as f:
+                        json.dump(actual, f, ensure_ascii=False, indent=1)
+                elif not os.path.exists(golden_path):
+                    failures.append(f"{page}: no golden output (run with --record-golden)")
+                else:
+                    with open(golden_path, encoding='utf-8') as f:
+                        changed = differences(json.load(f), actual)
+                    if changed:
+                        failures.append(f"{page}: output changed in {', '.join(changed)}")
+        elapsed = time.perf_counter() - start
+    server.shutdown()
+
+    games = len(game_seconds)
+    throughput = games / elapsed
+    current = {'parser': args.parser, 'format': args.format, 'games_per_second': throughput,
+               'stages': {name: {f"p{pct}_ms": percentile(values, pct) * 1000 for pct in PERCENTILES}
+                          for name, values in stage_seconds.items()}}
+    current['stages']['game'] = {f"p{pct}_ms": percentile(game_seconds, pct) * 1000 for pct in PERCENTILES}
+
+    print(f"{len(pages)} pages x {args.repeat} runs = {games} games in {elapsed:.2f}s "
+          f"({throughput:.1f} games/s, parser={args.parser}, format={args.format})")
+    print(f"{'stage':<24} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9}")
+    for name, stats in sorted(current['stages'].items(), key=lambda item: -item[1]['p50_ms']):
+        print(f"{name:<24} {stats['p50_ms']:9.2f} {stats['p90_ms']:9.2f} {stats['p99_ms']:9.2f}")
+
+    if args.record_golden:
+        print(f"Golden outputs written to {GOLDEN_DIR}")
+    if args.save_baseline:
+        with open(BASELINE_PATH, 'w', encoding='utf-8') as f:
+            json.dump(current, f, indent=1)
+        print(f"Baseline saved to {BASELINE_PATH}")
+    elif os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if (baseline.get('parser'), baseline.get('format')) != (args.parser, args.format):
+            print(f"Baseline is for parser={baseline.get('parser')}, format={baseline.get('format')}; "
+                  "timings not compared")
+        else:
+            limit = 1 + args.threshold
+            for name, stats in baseline['stages'].items():
+                now = current['stages'].get(name)
+                if now is None or stats['p50_ms'] < args.floor:
+                    continue
+                if now['p50_ms'] > stats['p50_ms'] * limit:
+                    failures.append(f"stage {name}: p50 {now['p50_ms']:.2f} ms vs baseline {stats['p50_ms']:.2f} ms")
+            if throughput * limit < baseline['games_per_second']:
+                failures.append(f"throughput {throughput:.1f} games/s vs baseline "
+                                f"{baseline['games_per_second']:.1f} games/s")
+            print(f"Compared with baseline ({args.threshold:.0%} threshold): "
+                  f"{baseline['games_per_second']:.1f} games/s -> {throughput:.1f} games/s")
+
+    if failures:
+        print("\nFAILED:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Benchmark: single-pass page model vs the original multi-pass soup traversal
+
+Usage:
+    python benchmarks/bench_extract.py PAGES_DIR [--repeat N]
+
+PAGES_DIR holds saved game pages (*.html). Both paths start from the same
+BeautifulSoup tree so only the traversal and text extraction are timed.
+"""
+
+import argparse
+import contextlib
+import glob
+import io
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup
+
+from src.extract import build_page_model
+from src.layout import BOX_SCORE, CLASSIFIER
+from src.scraper import NBAGameScraper
+
+
+def legacy_multi_pass(soup):
+    """The pre-page-model traversal: every parser re-queries the soup"""
+    # parse_game_info
+    date_element = soup.find('div', class_='date') or soup.find('span', class_='date')
+    if date_element:
+        date_element.text.strip()
+    for element in soup.find_all('div', class_='team-name') or soup.find_all('span', class_='team'):
+        element.text.strip()
+    for element in soup.find_all('div', class_='score') or soup.find_all('span', class_='score'):
+        element.text.strip()
+
+    # parse_quarter_scores
+    soup.find('table', class_='quarter-scores') or soup.find('div', class_='quarter-breakdown')
+
+    # parse_player_stats; tables passing the header check are kept only if classified as box scores
+    player_stats = []
+    for table in soup.find_all('table'):
+        headers = table.find_all('th')
+        if any('MIN' in h.text or '分鐘' in h.text or 'PTS' in h.text or '得分' in h.text for h in headers):
+            table_data = [row_data for row_data in ([col.text.strip() for col in row.find_all(['td', 'th'])]
+                                                    for row in table.find_all('tr')) if row_data]
+            if CLASSIFIER.classify(table_data) != BOX_SCORE:
+                continue
+            header_row = [th.text.strip() for th in headers]
+            for row in table.find_all('tr')[1:]:
+                cols = row.find_all(['td', 'th'])
+                if cols:
+                    player_stats.append({header_row[i]: col.text.strip()
+                                         for i, col in enumerate(cols) if i < len(header_row)})
+
+    # parse_team_stats
+    soup.find('div', class_='team-stats') or soup.find('table', class_='team-comparison')
+
+    # parse_all_data
+    tables = []
+    for i, table in enumerate(soup.find_all('table')):
+        table_data = []
+        for row in table.find_all('tr'):
+            row_data = [col.text.strip() for col in row.find_all(['td', 'th'])]
+            if row_data:
+                table_data.append(row_data)
+        if table_data:
+            tables.append({'table_index': i, 'data': table_data, 'role': CLASSIFIER.classify(table_data)})
+    divs = []
+    for div in soup.find_all('div', class_=re.compile('stat|score|point|player|team')):
+        text = div.text.strip()
+        if text and any(char.isdigit() for char in text):
+            divs.append(text)
+
+    return player_stats, tables, divs
+
+
+def single_pass(soup):
+    """The page-model path used by NBAGameScraper.scrape()"""
+    scraper = NBAGameScraper('benchmark')
+    page = build_page_model(soup)
+    with contextlib.redirect_stdout(io.StringIO()):
+        scraper.parse_game_info(page)
+        scraper.parse_quarter_scores(page)
+        scraper.parse_player_stats(page)
+        scraper.parse_team_stats(page)
+        all_data = scraper.parse_all_data(page)
+    return scraper.player_stats, all_data['tables'], all_data['divs_with_data']
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare multi-pass and single-pass extraction')
+    parser.add_argument('pages_dir', help='Directory of saved game pages (*.html)')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed runs per page (default: 5)')
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(os.path.join(args.pages_dir, '*.html')))
+    if not paths:
+        print(f"No .html pages found in {args.pages_dir}")
+        sys.exit(1)
+
+    totals = {'multi-pass': 0.0, 'single-pass': 0.0}
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            soup = BeautifulSoup(f.read(), 'lxml')
+
+        legacy = legacy_multi_pass(soup)
+        current = single_pass(soup)
+        if legacy != current:
+            print(f"Output mismatch on {path}")
+            sys.exit(1)
+
+        for name, func in (('multi-pass', legacy_multi_pass), ('single-pass', single_pass)):
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                func(soup)
+            totals[name] += (time.perf_counter() - start) / args.repeat
+
+    print(f"Pages: {len(paths)}")
+    for name, total in totals.items():
+        print(f"{name:<12} {total * 1000:9.2f} ms total  {total * 1000 / len(paths):7.2f} ms/page")
+    print(f"Speedup: {totals['multi-pass'] / totals['single-pass']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark: page fetches against a fault-injecting server, plain session vs. ResilientFetcher
+
+Usage:
+    python benchmarks/bench_fetcher.py PAGES_DIR [--requests 200] [--workers 8] [--rate 50]
+                                                 [--errors 0.2] [--throttle 0.1] [--resets 0.05]
+
+Starts benchmarks/fault_server.py in-process, fetches --requests pages with
+--workers threads through each client and reports how many pages arrived,
+the wall time, and the fetcher's attempts, retries, latency histogram and
+throttled time.
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import requests
+
+from fault_server import add_fault_arguments, fault_options, start_server
+from src.fetcher import CircuitBreaker, create_fetcher, create_session
+
+
+def fetch_all(client, urls, workers):
+    """(pages fetched, seconds) for GETs of every URL over one shared client"""
+    def fetch(url):
+        try:
+            response = client.get(url, timeout=10)
+            return response.status_code == 200
+        except requests.RequestException:
+            return False
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(workers) as pool:
+        ok = sum(pool.map(fetch, urls))
+    return ok, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the resilient fetch layer under injected faults')
+    parser.add_argument('pages_dir', help='Directory of saved game pages (*.html)')
+    parser.add_argument('--requests', type=int, default=200, help='Pages to fetch per client (default: 200)')
+    parser.add_argument('--workers', type=int, default=8, help='Concurrent fetch threads (default: 8)')
+    parser.add_argument('--retries', type=int, default=4, help='Fetcher retries per page (default: 4)')
+    parser.add_argument('--backoff', type=float, default=0.05, help='Fetcher backoff base in seconds (default: 0.05)')
+    parser.add_argument('--rate', type=float, default=None, help='Fetcher requests per second (default: unlimited)')
+    parser.add_argument('--breaker-cooldown', type=float, default=1.0,
+                        help='Fetcher circuit breaker cooldown in seconds (default: 1)')
+    add_fault_arguments(parser)
+    args = parser.parse_args()
+
+    names = sorted(os.path.basename(path) for path in glob.glob(os.path.join(args.pages_dir, '*.html')))
+    if not names:
+        print(f"No *.html pages in {args.pages_dir}")
+        sys.exit(1)
+
+    server = start_server(args.pages_dir, **fault_options(args))
+    urls = [server.url + names[i % len(names)] for i in range(args.requests)]
+    print(f"Fault server at {server.url}: {fault_options(args)}")
+
+    ok, elapsed = fetch_all(create_session(pool_size=args.workers), urls, args.workers)
+    print(f"plain session:     {ok}/{len(urls)} pages in {elapsed:.2f}s")
+
+    fetcher = create_fetcher(pool_size=args.workers, retries=args.retries, backoff=args.backoff,
+                             max_backoff=2.0, rate=args.rate,
+                             breaker=CircuitBreaker(threshold=0.8, cooldown=args.breaker_cooldown))
+    ok, elapsed = fetch_all(fetcher, urls, args.workers)
+    print(f"resilient fetcher: {ok}/{len(urls)} pages in {elapsed:.2f}s")
+    print(fetcher.summary_line())
+    print(json.dumps(fetcher.stats(), indent=2))
+    print(f"Server saw: {server.counts}")
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
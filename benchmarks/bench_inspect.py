@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark: inspecting a directory of workbooks, pandas vs openpyxl read-only with a metadata index
+
+Usage:
+    python benchmarks/bench_inspect.py PAGES_DIR [--workbooks 200] [--workers N]
+
+Writes --workbooks Excel files (cycling through the saved pages) into a
+temporary directory, then times reading every sheet's shape, columns and
+first rows with pd.read_excel (what check_excel_data/verify_sheets did),
+workbook_info() one file at a time, a cold WorkbookIndex scan over a process
+pool, and a warm scan served from the index.
+"""
+
+import argparse
+import contextlib
+import glob
+import io
+import itertools
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from src.scraper import NBAGameScraper
+from src.utils import WorkbookIndex, workbook_info
+from src.writers import ExcelOutput
+
+
+def pandas_inspect(path):
+    """The previous approach: every sheet loaded into a DataFrame"""
+    shapes = []
+    with pd.ExcelFile(path) as xls:
+        for sheet_name in xls.sheet_names:
+            df = pd.read_excel(xls, sheet_name=sheet_name)
+            shapes.append((sheet_name, df.shape, list(df.columns), df.head(3)))
+    return shapes
+
+
+def timed(label, function, count):
+    start = time.perf_counter()
+    result = function()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<32} {elapsed:7.2f}s  {count / elapsed:8.1f} workbooks/s")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark workbook inspection')
+    parser.add_argument('pages_dir', help='Directory of saved game pages (*.html)')
+    parser.add_argument('--workbooks', type=int, default=200, help='Workbooks to generate (default: 200)')
+    parser.add_argument('--workers', type=int, default=None, help='Scan processes (default: CPU count)')
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(os.path.join(args.pages_dir, '*.html')))
+    if not paths:
+        print(f"No *.html pages in {args.pages_dir}")
+        sys.exit(1)
+
+    with tempfile.TemporaryDirectory() as root:
+        writer = ExcelOutput(root)
+        for i, path in zip(range(args.workbooks), itertools.cycle(paths)):
+            with open(path, encoding='utf-8') as f:
+                html = f.read()
+            scraper = NBAGameScraper(path)
+            with contextlib.redirect_stdout(io.StringIO()):
+                scraper.parse(html)
+                writer.write(scraper, f"game_{i:05d}")
+        files = sorted(glob.glob(os.path.join(root, '*.xlsx')))
+        print(f"{len(files)} workbooks, {sum(os.path.getsize(f) for f in files) / 1e6:.1f} MB")
+
+        timed('pd.read_excel per sheet', lambda: [pandas_inspect(f) for f in files], len(files))
+        timed('workbook_info (serial)', lambda: [workbook_info(f) for f in files], len(files))
+        index = WorkbookIndex(root)
+        timed('index scan (cold, parallel)', lambda: index.scan(args.workers), len(files))
+        index = WorkbookIndex(root)
+        infos = timed('index scan (warm)', lambda: index.scan(args.workers), len(files))
+        print(f"Warm scan re-read {index.read} workbooks; {len(infos)} indexed")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark: ad hoc table role checks vs the memoized layout classifier
+
+Usage:
+    python benchmarks/bench_layout.py PAGES_DIR [--repeat N]
+
+Both sides decide the role of every table of the saved pages (*.html),
+starting from the same page models:
+
+- ad hoc:     the checks the parsers used to repeat per table: a scan of every
+              <th> for MIN/分鐘/PTS/得分, 先發/位置 in the first row, the
+              (1, 3, 3) season shape and table index 0 for quarter scores
+- classifier: one fingerprint and a dict lookup per table (src/layout.py)
+
+Also lists where the two disagree; those are the tables the ad hoc checks
+got wrong (season tables titled 得分 read as box scores, English box scores
+missed).
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.consolidate import is_season_table
+from src.layout import BOX_SCORE, QUARTER_SCORES, SEASON_STAT, UNKNOWN, TableClassifier
+from src.scraper import NBAGameScraper
+
+
+def ad_hoc_roles(tables):
+    """Roles as the parsers and exporters used to decide them, table by table"""
+    roles = []
+    for table in tables:
+        data = table.data()
+        if not data:
+            roles.append(None)
+            continue
+        # parse_player_stats read any table with these headers as player rows,
+        # build_sheets exported tables marked in their first row as team sheets
+        reads_players = any('MIN' in h or '分鐘' in h or 'PTS' in h or '得分' in h for h in table.headers)
+        player_sheet = table.index > 0 and any('先發' in str(row) or '位置' in str(row) for row in data[0] if row)
+        if reads_players or player_sheet:
+            roles.append(BOX_SCORE)
+        elif is_season_table(data):
+            roles.append(SEASON_STAT)
+        elif table.index == 0:
+            roles.append(QUARTER_SCORES)
+        else:
+            roles.append(UNKNOWN)
+    return roles
+
+
+def classified_roles(tables, classifier):
+    return [classifier.classify(data) if data else None for data in (table.data() for table in tables)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare ad hoc table checks with the layout classifier')
+    parser.add_argument('pages_dir', help='Directory of saved game pages (*.html)')
+    parser.add_argument('--repeat', type=int, default=200, help='Timed runs per page (default: 200)')
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(os.path.join(args.pages_dir, '*.html')))
+    if not paths:
+        print(f"No .html pages found in {args.pages_dir}")
+        sys.exit(1)
+
+    classifier = TableClassifier(review_path=None)
+    totals = {'ad hoc': 0.0, 'classifier': 0.0}
+    tables = 0
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            page = NBAGameScraper(path).build_page(f.read())
+        tables += len(page.tables)
+
+        for legacy, current, table in zip(ad_hoc_roles(page.tables), classified_roles(page.tables, classifier),
+                                          page.tables):
+            if legacy != current:
+                print(f"{os.path.basename(path)} table {table.index}: ad hoc {legacy}, classifier {current}")
+
+        for name, func in (('ad hoc', lambda: ad_hoc_roles(page.tables)),
+                           ('classifier', lambda: classified_roles(page.tables, classifier))):
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                func()
+            totals[name] += (time.perf_counter() - start) / args.repeat
+
+    stats = classifier.stats()
+    print(f"Pages: {len(paths)}  Tables: {tables}  Layouts: {stats['layouts']}  Unknown: {stats['unknown']}")
+    for name, total in totals.items():
+        print(f"{name:<12} {total * 1e6 / len(paths):9.1f} us/page")
+    print(f"Speedup: {totals['ad hoc'] / totals['classifier']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Scaling of page parsing over worker processes
+
+Usage:
+    python benchmarks/bench_parallel.py PAGES_DIR [--pages 200] [--workers 1,2,4,N] [--parser bs4|lxml]
+
+Parses --pages pages (cycling through the saved pages' raw bytes) with
+parse_html (src/parallel.py) in a ProcessPoolExecutor of each worker count
+(N is the machine's CPU count), unpacking every record in the parent as the
+streaming pipeline does, and reports pages/s and the speedup over one worker.
+The in-process line is the same work without a pool.
+
+Also compares the size of the packed records with pickling the parsed
+game's lists of dicts, which is what crosses the process boundary otherwise.
+"""
+
+import argparse
+import contextlib
+import glob
+import io
+import itertools
+import os
+import pickle
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.parallel import parse_html, unpack_game
+from src.scraper import NBAGameScraper
+
+
+def run_pool(pages, parser, workers):
+    """Seconds to parse and unpack every page with a pool of `workers` processes"""
+    with ProcessPoolExecutor(workers) as pool:
+        list(pool.map(abs, range(workers)))  # Start the workers before timing
+        start = time.perf_counter()
+        for record in pool.map(parse_html, pages, itertools.repeat(''), itertools.repeat(parser), chunksize=4):
+            unpack_game(record, parser)
+        return time.perf_counter() - start
+
+
+def run_in_process(pages, parser):
+    start = time.perf_counter()
+    for html in pages:
+        unpack_game(parse_html(html, '', parser), parser)
+    return time.perf_counter() - start
+
+
+def dict_payload(html, parser):
+    """Pickled size of the parsed game as plain lists of dicts"""
+    scraper = NBAGameScraper('', parser=parser)
+    with contextlib.redirect_stdout(io.StringIO()):
+        scraper.parse(html)
+    return len(pickle.dumps((scraper.game_data, scraper.team_stats, scraper.player_stats, scraper.all_data,
+                             scraper.team_names, scraper.team_names_chinese)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure parse throughput over worker processes')
+    parser.add_argument('pages_dir', help='Directory of saved game pages (*.html)')
+    parser.add_argument('--pages', type=int, default=200, help='Pages parsed per run (default: 200)')
+    parser.add_argument('--workers', default='1,2,4,N', help="Comma-separated worker counts, N for the CPU count "
+                                                             "(default: 1,2,4,N)")
+    parser.add_argument('--parser', choices=['bs4', 'lxml'], default='bs4', help='Parser backend (default: bs4)')
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(os.path.join(args.pages_dir, '*.html')))
+    if not paths:
+        print(f"No .html pages found in {args.pages_dir}")
+        sys.exit(1)
+    htmls = []
+    for path in paths:
+        with open(path, 'rb') as f:
+            htmls.append(f.read())
+    pages = list(itertools.islice(itertools.cycle(htmls), args.pages))
+
+    cpus = os.cpu_count() or 1
+    counts = []
+    for value in args.workers.split(','):
+        count = cpus if value.strip().upper() == 'N' else int(value)
+        if count not in counts:
+            counts.append(count)
+
+    records = sum(len(parse_html(html, '', args.parser)) for html in htmls)
+    pickled = sum(dict_payload(html, args.parser) for html in htmls)
+    print(f"{args.pages} pages, parser={args.parser}, {cpus} CPUs")
+    print(f"Result per page: packed record {records / len(htmls) / 1024:.1f} KB, "
+          f"pickled dicts {pickled / len(htmls) / 1024:.1f} KB")
+
+    elapsed = run_in_process(pages, args.parser)
+    print(f"{'workers':>10} {'pages/s':>9} {'speedup':>8}")
+    print(f"{'in-process':>10} {len(pages) / elapsed:9.1f}")
+    single = None
+    for count in counts:
+        elapsed = run_pool(pages, args.parser, count)
+        single = single or elapsed
+        note = '  (more workers than CPUs)' if count > cpus else ''
+        print(f"{count:10d} {len(pages) / elapsed:9.1f} {single / elapsed:7.2f}x{note}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Benchmark: BeautifulSoup vs lxml fast-path parser backends
+
+Usage:
+    python benchmarks/bench_parser.py PAGES_DIR [--repeat N]
+
+Times tree construction plus page-model extraction per page and checks that
+both backends produce identical player_stats, team_stats and all_data.
+"""
+
+import argparse
+import contextlib
+import glob
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.scraper import NBAGameScraper
+
+
+def parse(html_content, parser):
+    """Run every parser over the page and return the scraper"""
+    scraper = NBAGameScraper('benchmark', parser=parser)
+    with contextlib.redirect_stdout(io.StringIO()):
+        page = scraper.build_page(html_content)
+        scraper.parse_game_info(page)
+        scraper.parse_player_stats(page)
+        scraper.parse_team_stats(page)
+        scraper.all_data = scraper.parse_all_data(page)
+    return scraper
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the bs4 and lxml parser backends')
+    parser.add_argument('pages_dir', help='Directory of saved game pages (*.html)')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed runs per page (default: 5)')
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(os.path.join(args.pages_dir, '*.html')))
+    if not paths:
+        print(f"No .html pages found in {args.pages_dir}")
+        sys.exit(1)
+
+    totals = {'bs4': 0.0, 'lxml': 0.0}
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            html_content = f.read()
+
+        soup_result = parse(html_content, 'bs4')
+        lxml_result = parse(html_content, 'lxml')
+        for attr in ('player_stats', 'team_stats', 'all_data', 'game_data'):
+            if getattr(soup_result, attr) != getattr(lxml_result, attr):
+                print(f"Output mismatch in {attr} on {path}")
+                sys.exit(1)
+
+        for name in totals:
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                parse(html_content, name)
+            totals[name] += (time.perf_counter() - start) / args.repeat
+
+    print(f"Pages: {len(paths)}")
+    for name, total in totals.items():
+        print(f"{name:<5} {total * 1000:9.2f} ms total  {total * 1000 / len(paths):7.2f} ms/page")
+    print(f"Speedup: {totals['bs4'] / totals['lxml']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark: resident memory while streaming many games through the pipeline
+
+Usage:
+    python benchmarks/bench_pipeline.py PAGES_DIR [--games 500] [--hold]
+
+Streams --games pages (cycling through the saved pages) through parse,
+normalize and a CSV sink into a temporary directory, sampling RSS as it goes.
+RSS should level off after the first games. --hold also keeps every parsed
+scraper alive, as a driver collecting NBAGameScraper objects would, for contrast.
+"""
+
+import argparse
+import contextlib
+import gc
+import glob
+import io
+import itertools
+import os
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.pipeline import StreamingPipeline
+from src.scraper import NBAGameScraper
+from src.writers import CSVOutput
+
+
+def rss_mb():
+    """Current resident set size in MB (peak RSS where /proc is unavailable)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1e6
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3
+
+
+def held_games(paths, root):
+    """The pre-pipeline pattern: scrape every game and keep its scraper"""
+    scrapers = []
+    writer = CSVOutput(root)
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            html = f.read()
+        scraper = NBAGameScraper(path)
+        with contextlib.redirect_stdout(io.StringIO()):
+            scraper.scrape(html, writers=[writer], include_game_id=True)
+        scrapers.append(scraper)
+        yield {'success': bool(scraper.output_path)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure RSS while streaming games')
+    parser.add_argument('pages_dir', help='Directory of saved game pages (*.html)')
+    parser.add_argument('--games', type=int, default=500, help='Games to process (default: 500)')
+    parser.add_argument('--hold', action='store_true', help='Keep every scraper alive instead of streaming')
+    parser.add_argument('--every', type=int, default=50, help='Report RSS every N games (default: 50)')
+    args = parser.parse_args()
+
+    pages = sorted(glob.glob(os.path.join(args.pages_dir, '*.html')))
+    if not pages:
+        print(f"No .html pages found in {args.pages_dir}")
+        sys.exit(1)
+    paths = list(itertools.islice(itertools.cycle(pages), args.games))
+
+    gc.collect()
+    baseline = rss_mb()
+    print(f"Mode: {'hold every scraper' if args.hold else 'streaming pipeline'}  Games: {len(paths)}")
+    print(f"{'games':>6} {'RSS MB':>8} {'+MB':>7} {'games/s':>8}")
+    print(f"{0:6d} {baseline:8.1f} {0:7.1f} {'':>8}")
+
+    samples = []
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.hold:
+            results = held_games(paths, tmp)
+        else:
+            results = StreamingPipeline([CSVOutput(tmp)], buffer=8).run(paths)
+        start = time.perf_counter()
+        failed = 0
+        for count, result in enumerate(results, 1):
+            failed += not result['success']
+            if count % args.every == 0 or count == len(paths):
+                rss = rss_mb()
+                samples.append(rss)
+                print(f"{count:6d} {rss:8.1f} {rss - baseline:7.1f} {count / (time.perf_counter() - start):8.1f}")
+
+    half = samples[len(samples) // 2:]
+    print(f"Failed: {failed}  Peak RSS: {max(samples):.1f} MB  "
+          f"Growth over the second half: {half[-1] - half[0]:+.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark: decode and tree build of whole pages vs pre-parse trimmed pages
+
+Usage:
+    python benchmarks/bench_preparse.py PAGES_DIR [--repeat N] [--parser bs4|lxml]
+
+Both sides start from the raw bytes of the saved pages (*.html), as they come
+off the network:
+
+- full:     decode every byte, build the tree of the whole page
+- preparse: drop scripts, styles, comments and page chrome from the bytes
+            (src/preparse.py), decode and build the tree of what is left
+
+Reports bytes handed to the tree builder and time per page, and checks that
+parsing both gives the same game data, tables and divs.
+"""
+
+import argparse
+import contextlib
+import glob
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.preparse import decode_page, trim_page
+from src.scraper import NBAGameScraper
+
+
+def full(scraper, data):
+    return scraper.build_page(decode_page(data))
+
+
+def preparsed(scraper, data):
+    return scraper.build_page(decode_page(trim_page(data)))
+
+
+def parsed_output(path, data, parser, preparse):
+    scraper = NBAGameScraper(path, parser=parser, embedded=False, preparse=preparse)
+    with contextlib.redirect_stdout(io.StringIO()):
+        scraper.parse(data)
+    return scraper.game_data, scraper.player_stats, scraper.team_stats, scraper.all_data
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare tree building of whole and pre-parse trimmed pages')
+    parser.add_argument('pages_dir', help='Directory of saved game pages (*.html)')
+    parser.add_argument('--repeat', type=int, default=20, help='Timed runs per page (default: 20)')
+    parser.add_argument('--parser', choices=['bs4', 'lxml'], default='bs4', help='Parser backend (default: bs4)')
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(os.path.join(args.pages_dir, '*.html')))
+    if not paths:
+        print(f"No .html pages found in {args.pages_dir}")
+        sys.exit(1)
+
+    totals = {'full': 0.0, 'preparse': 0.0}
+    sizes = {'full': 0, 'preparse': 0}
+    mismatches = 0
+    for path in paths:
+        with open(path, 'rb') as f:
+            data = f.read()
+        sizes['full'] += len(data)
+        sizes['preparse'] += len(trim_page(data))
+
+        if parsed_output(path, data, args.parser, False) != parsed_output(path, data, args.parser, True):
+            mismatches += 1
+            print(f"{os.path.basename(path)}: output differs with pre-parse")
+
+        scraper = NBAGameScraper(path, parser=args.parser)
+        for name, func in (('full', full), ('preparse', preparsed)):
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                for _ in range(args.repeat):
+                    func(scraper, data)
+            totals[name] += (time.perf_counter() - start) / args.repeat
+
+    print(f"Pages: {len(paths)}  Parser: {args.parser}  Output mismatches: {mismatches}")
+    print(f"{'':<10} {'KB/page':>9} {'ms/page':>9}")
+    for name, total in totals.items():
+        print(f"{name:<10} {sizes[name] / len(paths) / 1024:9.1f} {total * 1000 / len(paths):9.2f}")
+    print(f"Bytes parsed: {sizes['preparse'] / sizes['full']:.0%} of the page  "
+          f"Speedup: {totals['full'] / totals['preparse']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Load test of the game query service (src/service.py)
+
+Usage:
+    python benchmarks/bench_service.py PAGES_DIR [--games 200] [--requests 20000] [--concurrency 32]
+                                                 [--cache 0,256]
+
+Stores --games copies of the saved pages (each with its own game id) in a
+temporary season store, starts `main.py --api` on it once per --cache size
+and drives it with --concurrency keep-alive connections. Requests mimic
+polling dashboards: 80% go to a hot tenth of the games (full game or one of
+its tables), the rest to team, date and list queries, and every other
+repeat of a path revalidates with If-None-Match.
+
+Reports requests/s, p50/p90/p99 latency, status counts and the service's
+hot-cache hit rate. Cache size 0 loads every game request from SQLite.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import glob
+import io
+import itertools
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from urllib.parse import quote
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.scraper import NBAGameScraper
+from src.service import GAME_TABLES
+from src.store import GameStore
+
+
+def build_store(path, pages, count):
+    """Store count games cycling through the pages; returns the game ids, teams and dates"""
+    htmls = []
+    for page in pages:
+        with open(page, encoding='utf-8') as f:
+            htmls.append(f.read())
+    game_ids = []
+    with GameStore(path) as store, contextlib.redirect_stdout(io.StringIO()):
+        for html in itertools.islice(itertools.cycle(htmls), count):
+            scraper = NBAGameScraper(f"http://bench/{uuid.uuid4()}")
+            scraper.parse(html)
+            store.write_game(scraper)
+            game_ids.append(scraper.game_id)
+        teams = [row[0] for row in store.conn.execute('SELECT DISTINCT team FROM game_teams')]
+        dates = [row[0] for row in store.conn.execute('SELECT DISTINCT date FROM games')]
+    return game_ids, teams, dates
+
+
+def request_paths(game_ids, teams, dates, count, seed=1):
+    """Request targets: mostly hot games and their tables, then team, date and list queries"""
+    rng = random.Random(seed)
+    hot = game_ids[:max(1, len(game_ids) // 10)]
+    paths = []
+    for _ in range(count):
+        roll = rng.random()
+        if roll < 0.8:
+            suffix = rng.choice(('',) + tuple(f'/{table}' for table in GAME_TABLES))
+            paths.append(f"/games/{rng.choice(hot)}{suffix}")
+        elif roll < 0.85:
+            paths.append(f"/games/{rng.choice(game_ids)}")
+        elif roll < 0.92:
+            paths.append(f"/teams/{quote(rng.choice(teams))}/{rng.choice(('games', 'season_stats'))}")
+        elif roll < 0.97:
+            paths.append(f"/games?date={rng.choice(dates)}")
+        else:
+            paths.append("/games?limit=20")
+    return paths
+
+
+async def client(port, paths, latencies, statuses):
+    """One keep-alive connection working through its share of the paths"""
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    etags, seen = {}, set()
+    try:
+        for path in paths:
+            headers = f"GET {path} HTTP/1.1\r\nHost: 127.0.0.1\r\n"
+            if path in seen and path in etags:
+                headers += f"If-None-Match: {etags[path]}\r\n"
+                seen.discard(path)  # Revalidate every other repeat
+            else:
+                seen.add(path)
+            start = time.perf_counter()
+            writer.write((headers + "\r\n").encode('latin-1'))
+            head = await reader.readuntil(b'\r\n\r\n')
+            lines = head.decode('latin-1').split('\r\n')
+            status = int(lines[0].split(' ', 2)[1])
+            fields = dict(line.split(': ', 1) for line in lines[1:] if ': ' in line)
+            await reader.readexactly(int(fields.get('Content-Length', 0)))
+            latencies.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+            if 'ETag' in fields:
+                etags[path] = fields['ETag']
+    finally:
+        writer.close()
+
+
+async def load(port, paths, concurrency):
+    latencies, statuses = [], {}
+    shares = [paths[i::concurrency] for i in range(concurrency)]
+    start = time.perf_counter()
+    await asyncio.gather(*(client(port, share, latencies, statuses) for share in shares))
+    return time.perf_counter() - start, latencies, statuses
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_service(store_path, cache_size):
+    """main.py --api on a free port, once it accepts connections"""
+    port = free_port()
+    process = subprocess.Popen([sys.executable, os.path.join(ROOT, 'main.py'), '--api', f"127.0.0.1:{port}",
+                                '--store', store_path, '--api-cache', str(cache_size)],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        with contextlib.suppress(OSError), socket.create_connection(('127.0.0.1', port), timeout=0.2):
+            return process, port
+        time.sleep(0.1)
+    process.kill()
+    raise RuntimeError('The service did not start')
+
+
+async def health(port):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(b"GET /health HTTP/1.1\r\nConnection: close\r\n\r\n")
+    response = await reader.read()
+    writer.close()
+    return json.loads(response.split(b'\r\n\r\n', 1)[1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load-test the game query service')
+    parser.add_argument('pages_dir', help='Directory of saved game pages (*.html)')
+    parser.add_argument('--games', type=int, default=200, help='Games in the store (default: 200)')
+    parser.add_argument('--requests', type=int, default=20000, help='Requests per run (default: 20000)')
+    parser.add_argument('--concurrency', type=int, default=32, help='Keep-alive connections (default: 32)')
+    parser.add_argument('--cache', default='0,256', help='Comma-separated hot-game cache sizes (default: 0,256)')
+    args = parser.parse_args()
+
+    pages = sorted(glob.glob(os.path.join(args.pages_dir, '*.html')))
+    if not pages:
+        print(f"No .html pages found in {args.pages_dir}")
+        sys.exit(1)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store_path = os.path.join(tmp, 'games.sqlite')
+        game_ids, teams, dates = build_store(store_path, pages, args.games)
+        paths = request_paths(game_ids, teams, dates, args.requests)
+        print(f"{args.games} games, {args.requests} requests over {args.concurrency} connections")
+        print(f"{'cache':>6} {'req/s':>9} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'hit rate':>9}  statuses")
+        for cache_size in [int(value) for value in args.cache.split(',')]:
+            process, port = start_service(store_path, cache_size)
+            try:
+                asyncio.run(load(port, paths[:200], args.concurrency))  # Warm-up
+                elapsed, latencies, statuses = asyncio.run(load(port, paths, args.concurrency))
+                stats = asyncio.run(health(port))
+            finally:
+                process.terminate()
+                process.wait()
+            lookups = stats['hits'] + stats['misses']
+            print(f"{cache_size:6d} {len(latencies) / elapsed:9.0f} "
+                  f"{percentile(latencies, 50) * 1000:8.2f} {percentile(latencies, 90) * 1000:8.2f} "
+                  f"{percentile(latencies, 99) * 1000:8.2f} {stats['hits'] / lookups if lookups else 0:9.1%}  "
+                  f"{dict(sorted(statuses.items()))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Benchmark: process startup for `main.py --help` and a cached single-game scrape
+
+Usage:
+    python benchmarks/bench_startup.py PAGES_DIR [--runs 5]
+
+Times fresh interpreters running `python main.py --help` and a scrape of one
+saved page that is already in the response cache (served over a local HTTP
+server, written as CSV), then the same scrape sent to a warm daemon
+(`main.py --serve`) through `python -m src.daemon`. Also lists which heavy
+libraries a `--help` run imports.
+"""
+
+import argparse
+import functools
+import glob
+import http.server
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ('pandas', 'numpy', 'openpyxl', 'bs4', 'requests', 'lxml')
+
+
+def timed_runs(command, runs, cwd, env=None):
+    """Median and min wall seconds of running command in fresh processes"""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=cwd, env=env, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), min(times)
+
+
+class QuietHandler(http.server.SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with socket.socket() as sock:
+            if sock.connect_ex(('127.0.0.1', port)) == 0:
+                return
+        time.sleep(0.05)
+    raise RuntimeError(f"Nothing listening on port {port}")
+
+
+def help_imports():
+    """Heavy libraries loaded while main.py builds its parser and prints --help"""
+    probe = ("import contextlib, io, runpy, sys; sys.argv = ['main.py', '--help']\n"
+             "with contextlib.redirect_stdout(io.StringIO()):\n"
+             "    try: runpy.run_path('main.py', run_name='__main__')\n"
+             "    except SystemExit: pass\n"
+             f"print(' '.join(m for m in {HEAVY!r} if m in sys.modules))")
+    result = subprocess.run([sys.executable, '-c', probe], cwd=ROOT, capture_output=True, text=True, check=True)
+    return result.stdout.split()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure CLI startup time')
+    parser.add_argument('pages_dir', help='Directory of saved game pages (*.html)')
+    parser.add_argument('--runs', type=int, default=5, help='Runs per measurement (default: 5)')
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(os.path.join(args.pages_dir, '*.html')))
+    if not paths:
+        print(f"No *.html pages in {args.pages_dir}")
+        sys.exit(1)
+
+    handler = functools.partial(QuietHandler, directory=args.pages_dir)
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/{os.path.basename(paths[0])}"
+
+    imports = [sys.executable, '-c', f"import time; t = time.perf_counter(); import {', '.join(HEAVY)}; "
+               "print(time.perf_counter() - t)"]
+    heavy = float(subprocess.run(imports, capture_output=True, text=True, check=True).stdout)
+    print(f"Importing {', '.join(HEAVY)} alone: {heavy * 1000:.0f} ms")
+    print(f"Heavy libraries imported by --help: {', '.join(help_imports()) or 'none'}")
+
+    median, best = timed_runs([sys.executable, 'main.py', '--help'], args.runs, ROOT)
+    print(f"main.py --help:              median {median * 1000:6.0f} ms   min {best * 1000:6.0f} ms")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = os.path.join(tmp, 'cache')
+        scrape = [url, '--cache', cache, '--format', 'csv']
+        main_py = os.path.join(ROOT, 'main.py')
+        subprocess.run([sys.executable, main_py] + scrape, cwd=tmp, check=True, stdout=subprocess.DEVNULL)
+
+        median, best = timed_runs([sys.executable, main_py] + scrape, args.runs, tmp)
+        print(f"cached scrape (cold):        median {median * 1000:6.0f} ms   min {best * 1000:6.0f} ms")
+
+        address = f"127.0.0.1:{free_port()}"
+        daemon = subprocess.Popen([sys.executable, main_py, '--serve', address], cwd=tmp,
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            wait_for_port(int(address.rsplit(':', 1)[1]))
+            client = [sys.executable, '-m', 'src.daemon', '--address', address, '--'] + scrape
+            env = dict(os.environ, PYTHONPATH=ROOT)  # Finds the src package while outputs go to tmp
+            subprocess.run(client, cwd=tmp, env=env, check=True, stdout=subprocess.DEVNULL)
+            median, best = timed_runs(client, args.runs, tmp, env)
+            print(f"cached scrape (warm daemon): median {median * 1000:6.0f} ms   min {best * 1000:6.0f} ms")
+        finally:
+            daemon.terminate()
+            daemon.wait()
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Benchmark: write time and output size per export format
+
+Usage:
+    python benchmarks/bench_writers.py PAGES_DIR
+
+Parses every page once, then writes all games with each writer into a
+temporary directory. Parquet and Arrow are skipped when pyarrow is missing.
+"""
+
+import argparse
+import contextlib
+import glob
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.scraper import NBAGameScraper
+from src.writers import ArrowOutput, CSVOutput, ExcelOutput, ParquetOutput
+
+
+def directory_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare export formats')
+    parser.add_argument('pages_dir', help='Directory of saved game pages (*.html)')
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(os.path.join(args.pages_dir, '*.html')))
+    if not paths:
+        print(f"No .html pages found in {args.pages_dir}")
+        sys.exit(1)
+
+    scrapers = []
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            scraper = NBAGameScraper(path)
+            with contextlib.redirect_stdout(io.StringIO()):
+                scraper.parse(f.read())
+        scrapers.append(scraper)
+
+    writers = {
+        'excel (openpyxl)': lambda root: ExcelOutput(root),
+        'excel (write-only)': lambda root: ExcelOutput(root, mode='write-only'),
+        'csv': CSVOutput,
+        'parquet': ParquetOutput,
+        'arrow': ArrowOutput,
+    }
+
+    print(f"Games: {len(scrapers)}")
+    print(f"{'format':<20} {'total ms':>10} {'ms/game':>9} {'KB/game':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for index, (name, make_writer) in enumerate(writers.items()):
+            root = os.path.join(tmp, f"writer_{index}")
+            writer = make_writer(root)
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                results = [writer.write(scraper, f"game_{i}") for i, scraper in enumerate(scrapers)]
+            elapsed = time.perf_counter() - start
+            if not all(results):
+                print(f"{name:<20} skipped (writer failed; is pyarrow installed?)")
+                continue
+            size = directory_size(root)
+            print(f"{name:<20} {elapsed * 1000:10.1f} {elapsed * 1000 / len(scrapers):9.2f} "
+                  f"{size / 1024 / len(scrapers):9.1f}")
+
+
+if __name__ == "__main__":
+    main()
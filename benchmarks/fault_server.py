@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Fault-injecting HTTP server for exercising the fetch layer
+
+Usage:
+    python benchmarks/fault_server.py PAGES_DIR [--port 8800] [--errors 0.2] [--throttle 0.1]
+                                                [--resets 0.05] [--slow 0.1] [--delay 2]
+
+Serves the saved pages in PAGES_DIR (GET /<name>.html). Each request
+independently fails with the given probabilities: --errors answers 502 or 503,
+--throttle answers 429 with Retry-After, --resets drops the connection without
+a response, --slow delays the response by --delay seconds. List
+http://127.0.0.1:PORT/<name>.html URLs in a batch file to run batch mode against it.
+"""
+
+import argparse
+import os
+import random
+import socket
+import struct
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FaultHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        server = self.server
+        roll = random.random()
+        server.count('requests')
+        if roll < server.resets:
+            server.count('resets')
+            # RST instead of FIN, so the client sees a connection reset
+            self.connection.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack('ii', 1, 0))
+            self.close_connection = True
+            return
+        roll -= server.resets
+        if roll < server.errors:
+            server.count('errors')
+            self.reply(random.choice((502, 503)), b'upstream error')
+            return
+        roll -= server.errors
+        if roll < server.throttle:
+            server.count('throttled')
+            self.reply(429, b'slow down', {'Retry-After': str(server.retry_after)})
+            return
+        roll -= server.throttle
+        if roll < server.slow:
+            server.count('slow')
+            time.sleep(server.delay)
+
+        path = os.path.join(server.pages_dir, os.path.basename(self.path.split('?')[0]))
+        if not os.path.isfile(path):
+            self.reply(404, b'not found')
+            return
+        with open(path, 'rb') as f:
+            self.reply(200, f.read(), {'Content-Type': 'text/html; charset=utf-8'})
+
+    def reply(self, status, body, headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FaultServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, pages_dir, port=0, errors=0.0, throttle=0.0, resets=0.0, slow=0.0, delay=2.0,
+                 retry_after=1):
+        super().__init__(('127.0.0.1', port), FaultHandler)
+        self.pages_dir = pages_dir
+        self.errors = errors
+        self.throttle = throttle
+        self.resets = resets
+        self.slow = slow
+        self.delay = delay
+        self.retry_after = retry_after
+        self.counts = {}
+        self._lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/"
+
+    def count(self, name):
+        with self._lock:
+            self.counts[name] = self.counts.get(name, 0) + 1
+
+
+def start_server(pages_dir, **faults):
+    """FaultServer on a free port, serving from a background thread"""
+    server = FaultServer(pages_dir, **faults)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def add_fault_arguments(parser):
+    parser.add_argument('--errors', type=float, default=0.2, help='Share of 502/503 responses (default: 0.2)')
+    parser.add_argument('--throttle', type=float, default=0.1, help='Share of 429 responses (default: 0.1)')
+    parser.add_argument('--resets', type=float, default=0.05, help='Share of dropped connections (default: 0.05)')
+    parser.add_argument('--slow', type=float, default=0.0, help='Share of delayed responses (default: 0)')
+    parser.add_argument('--delay', type=float, default=2.0, help='Delay of slow responses in seconds (default: 2)')
+    parser.add_argument('--retry-after', type=int, default=1, help='Retry-After of 429 responses (default: 1)')
+
+
+def fault_options(args):
+    return {'errors': args.errors, 'throttle': args.throttle, 'resets': args.resets, 'slow': args.slow,
+            'delay': args.delay, 'retry_after': args.retry_after}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve saved pages with injected faults')
+    parser.add_argument('pages_dir', help='Directory of saved game pages (*.html)')
+    parser.add_argument('--port', type=int, default=8800, help='Port to listen on (default: 8800)')
+    add_fault_arguments(parser)
+    args = parser.parse_args()
+
+    server = FaultServer(args.pages_dir, port=args.port, **fault_options(args))
+    print(f"Serving {args.pages_dir} at {server.url} with faults {fault_options(args)}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"Requests: {server.counts}")
+
+
+if __name__ == '__main__':
+    main()
@@ -5,17 +5,282 @@ NBA Game Data Scraper - Main Entry Point
 Usage:
     python main.py [URL]
     python main.py --url [URL]
+    python main.py --batch games.txt
+    python main.py --watch [URL]
+    python main.py --discover 2025-11-01 2025-11-30
+    python main.py --serve
+    python main.py --api [--store]
     python main.py --help
 """
 
+import contextlib
+import os
 import sys
+import time
 import argparse
-from src import NBAGameScraper
+# Only the defaults shown by --help; each mode imports what it runs, so --help and argument errors stay fast
+from src.analytics import DEFAULT_ANALYTICS_DIR, STATE_FILENAME
+from src.batch import BASE_URL
+from src.cache import DEFAULT_CACHE_DIR
+from src.daemon import DEFAULT_ADDRESS
+from src.discovery import SCHEDULE_URL, STATUSES
+from src.layout import DEFAULT_REVIEW_PATH
+from src.service import DEFAULT_API_ADDRESS, DEFAULT_CACHE_GAMES, DEFAULT_REFRESH
+from src.store import DEFAULT_STORE_PATH
+from src.watch import DEFAULT_ARTIFACT_DIR, DEFAULT_INTERVAL, MAX_INTERVAL, MIN_INTERVAL
+from src.writers import COMBINE_BY, EXCEL_MODES, WRITERS
 
 
-def main():
-    """Main function to run the scraper"""
-    # Set up argument parser
+def parse_formats(value):
+    """Comma-separated output formats for --format"""
+    formats = [name.strip() for name in value.split(',') if name.strip()]
+    unknown = [name for name in formats if name not in WRITERS]
+    if unknown or not formats:
+        raise argparse.ArgumentTypeError(
+            f"unknown format(s): {', '.join(unknown) or value} (choose from {', '.join(WRITERS)})")
+    return formats
+
+
+def open_cache(args):
+    """ResponseCache configured from the command line, or None when caching is off"""
+    if not args.cache:
+        return None
+    from src.cache import ResponseCache
+    return ResponseCache(args.cache, ttl=args.cache_ttl, max_bytes=int(args.cache_max_mb * 1024 * 1024))
+
+
+def open_fetcher(args, pool_size=None):
+    """One ResilientFetcher for the run, so every worker shares its rate limit and circuit breaker"""
+    from src.fetcher import CircuitBreaker, create_fetcher
+    breaker = CircuitBreaker(threshold=args.breaker_threshold, cooldown=args.breaker_cooldown)
+    return create_fetcher(pool_size, retries=args.retries, backoff=args.backoff, rate=args.rate,
+                          burst=args.burst, breaker=breaker)
+
+
+def print_cache_stats(cache):
+    if cache is not None:
+        stats = cache.stats()
+        print(f"Cache: {stats['hits']} hits, {stats['revalidated']} revalidated, {stats['misses']} misses, "
+              f"{stats['evictions']} evictions ({stats['entries']} entries, {stats['bytes'] / 1e6:.1f} MB)")
+
+
+def print_stages(summary):
+    """One line per pipeline stage, slowest first"""
+    stages = sorted(summary['stages'].items(), key=lambda item: item[1]['seconds'], reverse=True)
+    for name, stats in stages:
+        line = f"  {name:<22} {stats['seconds'] * 1000:10.1f} ms  {stats['calls']:5d} calls"
+        if stats['bytes']:
+            line += f"  {stats['bytes'] / 1e6:8.2f} MB"
+        if stats['alloc_peak_bytes']:
+            line += f"  peak alloc {stats['alloc_peak_bytes'] / 1e6:.2f} MB"
+        print(line)
+
+
+def output_writers(args):
+    """Writers for the requested formats, plus the game store when --store is given"""
+    from src.store import StoreOutput
+    from src.writers import create_writers
+    writers = create_writers(args.format, excel_mode=args.excel_mode, combine_by=args.combine_by,
+                             skip_raw_tables=args.skip_raw_tables)
+    if args.store:
+        writers.append(StoreOutput(args.store))
+    return writers
+
+
+def update_analytics(args):
+    """Bring the analytics in --analytics DIR up to date with the season store and export them"""
+    if not args.analytics:
+        return
+    if not args.store or not os.path.exists(args.store):
+        print("Analytics need a season store: add --store [PATH]")
+        return
+    from src.analytics import SeasonAnalytics
+    from src.store import GameStore
+    state_path = os.path.join(args.analytics, STATE_FILENAME)
+    start = time.perf_counter()
+    analytics = SeasonAnalytics.load(state_path, window=args.rolling_window)
+    with GameStore(args.store) as store:
+        added = analytics.sync(store)
+    if not added and not analytics.rewindowed:
+        print(f"Analytics in {args.analytics} are up to date")
+        return
+    os.makedirs(args.analytics, exist_ok=True)
+    analytics.export(args.analytics)
+    analytics.rewindowed = False
+    analytics.save(state_path)
+    if not added:
+        print(f"Analytics rolling averages rewritten for a {analytics.window}-game window "
+              f"in {time.perf_counter() - start:.2f}s -> {args.analytics}")
+        return
+    update = analytics.last_update
+    print(f"Analytics updated with {added} games ({update['players']} players, {update['teams']} teams "
+          f"recomputed) in {time.perf_counter() - start:.2f}s -> {args.analytics}")
+
+
+def parse_statuses(value):
+    """Comma-separated game statuses for --status, or 'all'"""
+    if value == 'all':
+        return None
+    statuses = [name.strip() for name in value.split(',') if name.strip()]
+    unknown = [name for name in statuses if name not in STATUSES]
+    if unknown or not statuses:
+        raise argparse.ArgumentTypeError(
+            f"unknown status(es): {', '.join(unknown) or value} (choose from {', '.join(STATUSES)} or all)")
+    return statuses
+
+
+def discover_games(args, cache=None, fetcher=None):
+    """Games listed between the --discover dates that match --status and haven't been scraped yet"""
+    from src.discovery import ScheduleCrawler, scraped_game_ids
+    from src.store import GameStore
+    from src.writers import create_writers
+    start, end = args.discover
+    roots = [writer.root for writer in create_writers(args.format, excel_mode=args.excel_mode)]
+    store = GameStore(args.store) if args.store and os.path.exists(args.store) else None
+    try:
+        scraped = scraped_game_ids(roots, store)
+    finally:
+        if store is not None:
+            store.close()
+
+    crawler = ScheduleCrawler(args.schedule_url, base_url=args.base_url, workers=args.fetch_workers,
+                              cache=cache, session=fetcher)
+    selected = crawler.discover(start, end, statuses=args.status, skip_ids=scraped)
+    games = crawler.found
+    print(f"Discovered {len(games)} games from {start} to {end}: {len(selected)} to scrape "
+          f"({sum(1 for game in games if game.game_id in scraped)} already scraped)", file=sys.stderr)
+    return selected
+
+
+def run_stream(args, urls, cache, fetcher):
+    """Scrape the batch through the streaming pipeline with bounded memory"""
+    from src.pipeline import StreamingPipeline
+    from src.writers import close_writers
+    writers = output_writers(args)
+    pipeline = StreamingPipeline(writers, parser=args.parser, fetch_workers=args.fetch_workers,
+                                 buffer=args.stream_buffer, session=fetcher, cache=cache,
+                                 parse_workers=args.parse_workers or 1)
+    start = time.perf_counter()
+    failed = []
+    for count, result in enumerate(pipeline.run(urls), 1):
+        status = 'OK  ' if result['success'] else 'FAIL'
+        detail = result['outputs'][0] if result['success'] else result['error']
+        print(f"[{count}/{len(urls)}] {status} {result['url']} -> {detail}")
+        if not result['success']:
+            failed.append(result)
+    close_writers(writers)
+    elapsed = time.perf_counter() - start
+
+    print("=" * 50)
+    print(f"Games: {len(urls)} (succeeded: {len(urls) - len(failed)}, failed: {len(failed)})")
+    print(f"Elapsed: {elapsed:.2f}s  Throughput: {len(urls) / elapsed if elapsed else 0.0:.2f} games/s")
+    print(fetcher.summary_line())
+    print_cache_stats(cache)
+    for result in failed:
+        print(f"  FAILED {result['url']}: {result['error']}")
+    update_analytics(args)
+    if failed:
+        sys.exit(1)
+
+
+def run_batch(args, urls=None, cache=None, fetcher=None):
+    """Scrape every game listed in the batch file (or the given URLs) and print a throughput summary"""
+    from src.batch import BatchScraper, read_game_list
+    from src.profiling import write_metrics
+    from src.writers import close_writers
+    if urls is None:
+        urls = read_game_list(args.batch, base_url=args.base_url)
+    if not urls:
+        print("Error: No game URLs found in batch input!")
+        sys.exit(1)
+
+    print(f"Starting batch of {len(urls)} games...")
+    print("=" * 50)
+
+    if cache is None:
+        cache = open_cache(args)
+    if fetcher is None:
+        fetcher = open_fetcher(args, pool_size=args.fetch_workers)
+    if args.stream:
+        run_stream(args, urls, cache, fetcher)
+        return
+    writers = output_writers(args)
+    batch = BatchScraper(urls, fetch_workers=args.fetch_workers, parse_workers=args.parse_workers,
+                         parser=args.parser, cache=cache, writers=writers,
+                         profile_dir=args.profile, session=fetcher)
+    summary = batch.run()
+    close_writers(writers)  # Workbooks combining several games are written once all games are in
+
+    print("=" * 50)
+    print(f"Games: {summary['games']} (succeeded: {summary['succeeded']}, failed: {summary['failed']})")
+    print(f"Elapsed: {summary['elapsed']:.2f}s  Throughput: {summary['games_per_second']:.2f} games/s  "
+          f"Downloaded: {summary['megabytes']:.2f} MB")
+    print(fetcher.summary_line())
+    print_cache_stats(cache)
+    if args.metrics or args.profile:
+        print("Stages (all games):")
+        print_stages(summary['stages'])
+    if args.metrics:
+        write_metrics(args.metrics, [{'url': r['url'], 'success': r['success'], 'metrics': r.get('metrics')}
+                                     for r in batch.results], summary['stages'], fetch=fetcher.stats())
+    if args.profile:
+        print(f"Per-game profiles saved to {args.profile}")
+    for result in batch.results:
+        if not result['success']:
+            print(f"  FAILED {result['url']}: {result['error']}")
+    update_analytics(args)
+
+    if summary['failed']:
+        sys.exit(1)
+
+
+def run_watch(url, args):
+    """Poll a live game, streaming changed rows until it is final, then export it once"""
+    from src.scraper import NBAGameScraper
+    from src.watch import GameWatcher, LiveArtifact
+    from src.writers import close_writers
+    cache = open_cache(args)
+    scraper = NBAGameScraper(url, parser=args.parser, session=open_fetcher(args), cache=cache)
+    artifact = LiveArtifact(args.watch_artifact or os.path.join(DEFAULT_ARTIFACT_DIR, f"{scraper.game_id}.sqlite"))
+    stream = open(args.watch_output, 'a', encoding='utf-8') if args.watch_output else sys.stdout
+
+    print(f"Watching {url} (live rows in {artifact.path})", file=sys.stderr)
+    watcher = GameWatcher(url, interval=args.interval, min_interval=args.min_interval,
+                          max_interval=args.max_interval, stream=stream, artifact=artifact,
+                          session=scraper.session, cache=cache)
+    try:
+        emitted = watcher.run(max_polls=args.max_polls)
+    except KeyboardInterrupt:
+        emitted = None
+    finally:
+        artifact.close()
+        if stream is not sys.stdout:
+            stream.close()
+
+    print(f"Watch ended after {watcher.polls} polls"
+          f"{f', {emitted} changed rows' if emitted is not None else ''}", file=sys.stderr)
+    if watcher.final and watcher.last_html:
+        # Full export only once the game is over
+        with contextlib.redirect_stdout(sys.stderr):
+            writers = output_writers(args)
+            scraper.scrape(html_content=watcher.last_html, writers=writers)
+            close_writers(writers)
+
+
+def run_api(args):
+    """Serve the store (or the workbook directory) over HTTP until interrupted"""
+    import asyncio
+    from src.service import GameService, open_source, serve
+    service = GameService(open_source(args.store, args.api_root), cache_size=args.api_cache,
+                          refresh=args.api_refresh)
+    try:
+        asyncio.run(serve(service, args.api))
+    except KeyboardInterrupt:
+        print("Stopped.")
+
+
+def build_parser():
+    """The command line parser of main()"""
     parser = argparse.ArgumentParser(
         description='NBA Game Data Scraper - Scrapes NBA game data from tw-nba.udn.com',
         usage='%(prog)s [URL] or %(prog)s --url [URL]'
@@ -25,18 +290,176 @@ def main():
     parser.add_argument('url', nargs='?', help='URL of the NBA game to scrape')
     parser.add_argument('--url', '-u', dest='url_flag', help='URL of the NBA game to scrape')
     parser.add_argument('--output', '-o', help='Output filename (default: nba_game_data_[timestamp].xlsx)')
+    parser.add_argument('--parser', choices=['bs4', 'lxml'], default='bs4',
+                        help='HTML parser backend; lxml falls back to bs4 on unknown layouts (default: bs4)')
+    parser.add_argument('--format', '-f', type=parse_formats, default=['excel'],
+                        help=f"Comma-separated output formats: {', '.join(WRITERS)} (default: excel)")
+    parser.add_argument('--excel-mode', choices=EXCEL_MODES, default='normal',
+                        help='Excel writer mode; write-only streams rows with less memory (default: normal)')
+    parser.add_argument('--combine-by', choices=COMBINE_BY, default='night',
+                        help="Workbooks of the 'combined' format: one per night, per team or one for all games "
+                             "(default: night)")
+    parser.add_argument('--skip-raw-tables', action='store_true',
+                        help="Leave unrecognized tables (Table_N sheets) out of 'combined' workbooks")
+    parser.add_argument('--store', nargs='?', const=DEFAULT_STORE_PATH, metavar='PATH',
+                        help=f'Also upsert each game into the season store (default: {DEFAULT_STORE_PATH})')
+    parser.add_argument('--analytics', nargs='?', const=DEFAULT_ANALYTICS_DIR, metavar='DIR',
+                        help='With --store, update advanced metrics (eFG%%, TS%%, usage, pace, rolling averages) '
+                             f'for newly stored games and export them as CSV (default: {DEFAULT_ANALYTICS_DIR})')
+    parser.add_argument('--rolling-window', type=int, default=5,
+                        help='Games in the rolling per-player averages of --analytics (default: 5)')
+    parser.add_argument('--batch', '-b', metavar='FILE',
+                        help="Scrape every game URL or UUID listed in FILE ('-' for stdin)")
+    parser.add_argument('--fetch-workers', type=int, default=8,
+                        help='Concurrent page fetches in batch mode (default: 8)')
+    parser.add_argument('--parse-workers', type=int, default=None,
+                        help='Parse/export processes in batch mode (default: CPU count); '
+                             'with --stream, parse processes (default: 1, parse in-process)')
+    parser.add_argument('--stream', action='store_true',
+                        help='Run the batch as a streaming pipeline with bounded memory, writing from one process')
+    parser.add_argument('--stream-buffer', type=int, default=8,
+                        help='Pages fetched ahead of the parser in streaming mode (default: 8)')
+    parser.add_argument('--base-url', default=BASE_URL,
+                        help=f'Base URL for bare game UUIDs in batch mode (default: {BASE_URL})')
+    parser.add_argument('--cache', nargs='?', const=DEFAULT_CACHE_DIR, metavar='DIR',
+                        help=f'Cache fetched pages on disk (default dir: {DEFAULT_CACHE_DIR})')
+    parser.add_argument('--cache-ttl', type=float, default=60,
+                        help='Seconds a cached live game is served before revalidation (default: 60)')
+    parser.add_argument('--cache-max-mb', type=float, default=500,
+                        help='Cache size cap in MB, least recently used pages evicted first (default: 500)')
+    parser.add_argument('--retries', type=int, default=3,
+                        help='Retries per page on connection errors, timeouts, 429 and 5xx responses (default: 3)')
+    parser.add_argument('--backoff', type=float, default=0.5,
+                        help='Base of the jittered exponential backoff between retries in seconds (default: 0.5)')
+    parser.add_argument('--rate', type=float, default=None,
+                        help='Maximum requests per second across all workers (default: unlimited)')
+    parser.add_argument('--burst', type=int, default=None,
+                        help='Requests allowed back to back before --rate applies (default: max(1, rate))')
+    parser.add_argument('--breaker-threshold', type=float, default=0.5,
+                        help='Share of failed recent requests that pauses all fetching (default: 0.5)')
+    parser.add_argument('--breaker-cooldown', type=float, default=30,
+                        help='Seconds fetching pauses once the circuit breaker opens (default: 30)')
+    parser.add_argument('--metrics', metavar='FILE',
+                        help='Write per-stage wall time, bytes and allocations as JSON (per game and aggregated; '
+                             'not with --stream)')
+    parser.add_argument('--profile', metavar='DIR',
+                        help='Run under cProfile and tracemalloc and save the profiles to DIR '
+                             '(per game in batch mode; not with --stream)')
+    parser.add_argument('--discover', nargs=2, metavar=('START', 'END'),
+                        help='Scrape every game listed between two dates (YYYY-MM-DD) not already scraped')
+    parser.add_argument('--discover-only', action='store_true',
+                        help='With --discover, print the discovered games instead of scraping them')
+    parser.add_argument('--schedule-url', default=SCHEDULE_URL,
+                        help='Listing page per day; {date} is YYYY-MM-DD, {compact} is YYYYMMDD, '
+                             f'paths without a scheme are read from disk (default: {SCHEDULE_URL})')
+    parser.add_argument('--status', type=parse_statuses, default=['final'],
+                        help=f"Comma-separated statuses of discovered games to scrape: {', '.join(STATUSES)} "
+                             "or all (default: final)")
+    parser.add_argument('--watch', '-w', action='store_true',
+                        help='Poll a live game and emit changed rows as JSON lines until it is final')
+    parser.add_argument('--watch-output', metavar='FILE',
+                        help='Append watch deltas to FILE instead of stdout')
+    parser.add_argument('--watch-artifact', metavar='PATH',
+                        help=f'SQLite file of live rows updated in place (default: {DEFAULT_ARTIFACT_DIR}/<game-id>.sqlite)')
+    parser.add_argument('--interval', type=float, default=DEFAULT_INTERVAL,
+                        help=f'Initial watch poll interval in seconds (default: {DEFAULT_INTERVAL})')
+    parser.add_argument('--min-interval', type=float, default=MIN_INTERVAL,
+                        help=f'Shortest watch poll interval while the game changes (default: {MIN_INTERVAL})')
+    parser.add_argument('--max-interval', type=float, default=MAX_INTERVAL,
+                        help=f'Longest watch poll interval while nothing changes (default: {MAX_INTERVAL})')
+    parser.add_argument('--max-polls', type=int, default=None,
+                        help='Stop watching after this many polls')
+    parser.add_argument('--serve', nargs='?', const=DEFAULT_ADDRESS, metavar='ADDRESS',
+                        help='Run as a warm daemon that accepts jobs from `python -m src.daemon ARGS` on a Unix '
+                             f'socket path (default: {DEFAULT_ADDRESS}) or a local host:port, which requires '
+                             'the job token the daemon writes to ~/.nba_scrape_daemon_PORT.token')
+    parser.add_argument('--api', nargs='?', const=DEFAULT_API_ADDRESS, metavar='ADDRESS',
+                        help='Serve scraped games as JSON over HTTP from the --store database, or else from the '
+                             f'Excel workbooks in --api-root (default: {DEFAULT_API_ADDRESS})')
+    parser.add_argument('--api-root', metavar='DIR',
+                        help='Workbook directory served by --api without --store (default: output_excel)')
+    parser.add_argument('--api-cache', type=int, default=DEFAULT_CACHE_GAMES,
+                        help=f'Hot games kept in memory by --api (default: {DEFAULT_CACHE_GAMES})')
+    parser.add_argument('--api-refresh', type=float, default=DEFAULT_REFRESH,
+                        help=f'Seconds between --api checks for new or rescraped games (default: {DEFAULT_REFRESH:g})')
+    parser.add_argument('--record-layouts', nargs='?', const=DEFAULT_REVIEW_PATH, metavar='FILE',
+                        help='Append tables of unknown layout to FILE (JSON lines) for review '
+                             f'(default: {DEFAULT_REVIEW_PATH}); off unless given')
+    parser.add_argument('--list-layouts', nargs='?', const=DEFAULT_REVIEW_PATH, metavar='FILE',
+                        help=f'List the unknown layouts recorded in FILE (default: {DEFAULT_REVIEW_PATH}) and exit')
+    return parser
 
-    args = parser.parse_args()
+
+def list_layouts(path):
+    """Print each unknown layout recorded with --record-layouts once, most often seen first"""
+    from src.layout import read_review
+    layouts = sorted(read_review(path), key=lambda entry: -entry['count'])
+    if not layouts:
+        print(f"No unknown layouts recorded in {path}")
+        return
+    for entry in layouts:
+        print(f"{entry['fingerprint']}  seen {entry['count']}x  shape {entry['shape']}  rows {entry['rows']}  "
+              f"header {entry['header'][:6]}  first seen in {entry['source']}")
+
+
+def main(argv=None):
+    """Main function to run the scraper"""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.stream and (args.metrics or args.profile):
+        # The pipeline keeps no per-game stage timings and runs parsing outside a profiled process
+        parser.error('--metrics and --profile are not supported with --stream; drop --stream to use them')
+
+    if args.list_layouts:
+        list_layouts(args.list_layouts)
+        return
+    if args.record_layouts:
+        from src.layout import record_layouts
+        record_layouts(args.record_layouts)
+
+    if args.serve:
+        from src.daemon import ScrapeDaemon
+        ScrapeDaemon(main, args.serve, parser).serve_forever()
+        return
+
+    if args.api:
+        run_api(args)
+        return
+
+    if args.discover:
+        cache = open_cache(args)
+        fetcher = open_fetcher(args, pool_size=args.fetch_workers)
+        games = discover_games(args, cache, fetcher)
+        if args.discover_only:
+            # One URL per line with a comment, ready for --batch
+            for game in games:
+                print(f"{game.url}  # {game.date} {game.status}")
+            return
+        if not games:
+            print("Nothing to scrape.")
+            return
+        run_batch(args, [game.url for game in games], cache, fetcher)
+        return
+
+    if args.batch:
+        run_batch(args)
+        return
 
     # Get URL from either positional or flag argument
     url = args.url or args.url_flag
 
+    if not url and args.analytics:
+        # Just catch the analytics up with the store
+        update_analytics(args)
+        return
+
     # If no URL provided, use default or show help
     if not url:
         print("Error: No URL provided!")
         print("\nUsage examples:")
         print("  python main.py https://tw-nba.udn.com/nba/standings_game/[game-id]")
         print("  python main.py --url https://tw-nba.udn.com/nba/standings_game/[game-id]")
+        print("  python main.py --discover 2025-11-01 2025-11-30")
         print("\nDefault URL for testing:")
         print("  https://tw-nba.udn.com/nba/standings_game/534867d1-8ef1-4929-b32c-4f766f159017")
 
@@ -47,12 +470,24 @@ def main():
         else:
             sys.exit(1)
 
+    if args.watch:
+        run_watch(url, args)
+        return
+
     print("Starting NBA Game Scraper...")
     print("=" * 50)
     print(f"URL: {url}")
 
-    scraper = NBAGameScraper(url)
-    success = scraper.scrape()
+    from src.profiling import profile_run, write_metrics
+    from src.scraper import NBAGameScraper
+    from src.writers import close_writers
+    cache = open_cache(args)
+    fetcher = open_fetcher(args)
+    scraper = NBAGameScraper(url, parser=args.parser, session=fetcher, cache=cache)
+    with profile_run(args.profile) if args.profile else contextlib.nullcontext():
+        writers = output_writers(args)
+        success = scraper.scrape(writers=writers)
+        close_writers(writers)
 
     if success:
         print("=" * 50)
@@ -61,9 +496,20 @@ def main():
         print(f"Total team stats collected: {len(scraper.team_stats)}")
         if hasattr(scraper, 'all_data'):
             print(f"Total tables found: {len(scraper.all_data.get('tables', []))}")
+        print_cache_stats(cache)
     else:
         print("Scraping failed. Please check the error messages above.")
 
+    if args.metrics or args.profile:
+        print("Stages:")
+        print_stages(scraper.profiler.summary())
+    if args.metrics:
+        write_metrics(args.metrics, [{'url': url, 'success': success, 'metrics': scraper.profiler.summary()}],
+                      fetch=fetcher.stats())
+    if args.profile:
+        print(f"Profile saved to {args.profile}")
+    update_analytics(args)
+
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -2,6 +2,15 @@
 NBA Game Spider Package
 """
 
-from .scraper import NBAGameScraper
+__all__ = ['NBAGameScraper', 'BatchScraper']
 
-__all__ = ['NBAGameScraper']
\ No newline at end of file
+
+def __getattr__(name):
+    # Imported on first use, so `import src` (and the CLI's --help) stays fast
+    if name == 'NBAGameScraper':
+        from .scraper import NBAGameScraper
+        return NBAGameScraper
+    if name == 'BatchScraper':
+        from .batch import BatchScraper
+        return BatchScraper
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
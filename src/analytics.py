@@ -0,0 +1,299 @@
+"""
+Derived analytics
+Advanced per-game metrics (eFG%, TS%, usage, possessions, pace, ratings) and season/rolling aggregates
+over every scraped box score, updated incrementally as games arrive
+"""
+
+import os
+
+# Counting stats summed into team and season totals (store / typed box-score column names)
+COUNTING = ('seconds', 'fgm', 'fga', 'fg3m', 'fg3a', 'ftm', 'fta', 'oreb', 'dreb', 'reb',
+            'ast', 'stl', 'blk', 'tov', 'pf', 'pts', 'plus_minus')
+
+# Free throws per possession-ending shot in the possession estimate
+FT_FACTOR = 0.44
+
+# Averaged per game in the rolling window, next to the window's eFG% and TS%
+ROLLING_STATS = ('pts', 'reb', 'ast', 'stl', 'blk', 'tov', 'minutes')
+
+DEFAULT_WINDOW = 5
+DEFAULT_ANALYTICS_DIR = 'analytics'
+STATE_FILENAME = 'analytics_state.pkl'
+
+PLAYER_KEY = ['player', 'team']
+TEAM_GAME_KEY = ['game_id', 'team']
+
+
+def _ratio(numerator, denominator):
+    """Element-wise division with NaN where the denominator is zero or missing"""
+    return numerator / denominator.where(denominator > 0)
+
+
+def shooting(frame):
+    """eFG% and TS% (0-100) from made/attempted and points columns"""
+    efg = 100 * _ratio(frame['fgm'] + 0.5 * frame['fg3m'], frame['fga'])
+    ts = 100 * _ratio(frame['pts'], 2 * (frame['fga'] + FT_FACTOR * frame['fta']))
+    return efg, ts
+
+
+def team_games(players):
+    """
+    One row per team per game: box-score totals, opponent totals and derived metrics
+
+    Possessions average both teams' FGA + 0.44*FTA - OREB + TOV estimates
+    (the team's own when the opponent's box score is missing); pace is
+    possessions per 48 minutes, ratings are points per 100 possessions.
+    """
+    import numpy as np
+    import pandas as pd
+    totals = players.groupby(['game_id', 'date', 'team'], observed=True, sort=False, dropna=False)[list(COUNTING)] \
+        .sum(min_count=1).reset_index()
+    opponents = totals[['game_id', 'team'] + list(COUNTING)].rename(
+        columns={column: f'opp_{column}' for column in ('team',) + COUNTING})
+    paired = totals.merge(opponents, on='game_id')
+    paired = paired[paired['team'] != paired['opp_team']]
+    # Teams whose opponent has no box score keep a row with empty opponent columns
+    lone = totals[~totals.set_index(TEAM_GAME_KEY).index.isin(paired.set_index(TEAM_GAME_KEY).index)]
+    games = pd.concat([paired, lone], ignore_index=True) if len(lone) else paired.reset_index(drop=True)
+
+    estimate = games['fga'] + FT_FACTOR * games['fta'] - games['oreb'] + games['tov']
+    opponent_estimate = games['opp_fga'] + FT_FACTOR * games['opp_fta'] - games['opp_oreb'] + games['opp_tov']
+    games['possessions'] = np.where(opponent_estimate.notna(), 0.5 * (estimate + opponent_estimate), estimate)
+    team_minutes = games['seconds'] / 60 / 5
+    games['pace'] = 48 * _ratio(games['possessions'], team_minutes)
+    games['off_rating'] = 100 * _ratio(games['pts'], games['possessions'])
+    games['def_rating'] = 100 * _ratio(games['opp_pts'], games['possessions'])
+    games['efg_pct'], games['ts_pct'] = shooting(games)
+    return games.reset_index(drop=True)
+
+
+def player_games(players, teams):
+    """Per-player-game rows with minutes, eFG%, TS% and usage rate (needs the team_games rows)"""
+    frame = players.copy()
+    frame['minutes'] = frame['seconds'] / 60
+    frame['efg_pct'], frame['ts_pct'] = shooting(frame)
+
+    team_columns = teams[TEAM_GAME_KEY + ['seconds', 'fga', 'fta', 'tov']].rename(
+        columns={'seconds': 'team_seconds', 'fga': 'team_fga', 'fta': 'team_fta', 'tov': 'team_tov'})
+    frame = frame.merge(team_columns, on=TEAM_GAME_KEY, how='left')
+    # USG% = share of team plays (FGA + 0.44*FTA + TOV) used while on the floor
+    plays = frame['fga'] + FT_FACTOR * frame['fta'] + frame['tov']
+    team_plays = frame['team_fga'] + FT_FACTOR * frame['team_fta'] + frame['team_tov']
+    frame['usg_pct'] = 100 * _ratio(plays * (frame['team_seconds'] / 5), frame['seconds'] * team_plays)
+    return frame.drop(columns=['team_seconds', 'team_fga', 'team_fta', 'team_tov'])
+
+
+def season_totals(games, key):
+    """Season sums per key with per-game averages and rates recomputed from the sums"""
+    grouped = games.groupby(key, observed=True, sort=False)
+    totals = grouped[list(COUNTING)].sum(min_count=1)
+    totals.insert(0, 'games', grouped['game_id'].nunique())
+    totals.insert(1, 'last_date', grouped['date'].max())
+    totals['efg_pct'], totals['ts_pct'] = shooting(totals)
+    for column in ('pts', 'reb', 'ast', 'stl', 'blk', 'tov'):
+        totals[f'{column}_per_game'] = totals[column] / totals['games']
+    totals['minutes_per_game'] = totals['seconds'] / 60 / totals['games']
+    if 'possessions' in games:
+        totals['possessions'] = grouped['possessions'].sum()
+        totals['pace'] = 48 * _ratio(totals['possessions'], totals['seconds'] / 60 / 5)
+        totals['off_rating'] = 100 * _ratio(totals['pts'], totals['possessions'])
+        totals['def_rating'] = 100 * _ratio(grouped['opp_pts'].sum(min_count=1), totals['possessions'])
+    return totals.reset_index()
+
+
+def rolling_averages(games, window=DEFAULT_WINDOW):
+    """
+    Each player's averages over their last `window` games, one row per player game
+
+    Window sums come from one cumulative sum over all rows sorted by player
+    and date, minus the cumulative sum just before each window, instead of a
+    per-player rolling loop. Missing stats (DNP) count as zero in a game that
+    still counts towards the window. Shooting percentages come from the
+    window's summed makes and attempts, not from averaging per-game values.
+    """
+    import numpy as np
+    import pandas as pd
+    games = games.sort_values(PLAYER_KEY + ['date', 'game_id'], na_position='first')  # Undated games first
+    position = games.groupby(PLAYER_KEY, observed=True, sort=False).cumcount().to_numpy()
+    columns = list(ROLLING_STATS) + ['fgm', 'fg3m', 'fga', 'fta']
+    cumulative = games[columns].fillna(0).to_numpy(dtype='float64').cumsum(axis=0)
+
+    counts = np.minimum(position + 1, window)
+    before = np.arange(len(games)) - counts  # Last row before the window, -1 at the very start
+    sums = cumulative - np.where((before >= 0)[:, None], cumulative[np.maximum(before, 0)], 0.0)
+    sums = pd.DataFrame(sums, columns=columns, index=games.index)
+
+    rolling = games[PLAYER_KEY + ['game_id', 'date']].copy()
+    for column in ROLLING_STATS:
+        rolling[f'{column}_avg'] = sums[column] / counts
+    rolling['efg_pct'], rolling['ts_pct'] = shooting(sums)
+    rolling['window_games'] = counts
+    return rolling
+
+
+def _key_mask(frame, keys):
+    """
+    Boolean mask of the frame rows whose key columns match a row of keys
+
+    Keys always include the team, so rows are narrowed by team first and the
+    (slower) multi-column match only runs over those teams' rows.
+    """
+    import pandas as pd
+    mask = frame['team'].isin(keys['team'].unique()).to_numpy()
+    if list(keys.columns) != ['team']:
+        candidates = pd.MultiIndex.from_frame(frame.loc[mask, list(keys.columns)])
+        mask[mask] = candidates.isin(pd.MultiIndex.from_frame(keys.drop_duplicates()))
+    return mask
+
+
+def _replace(current, updated, key):
+    """current with every row of the keys present in updated swapped for updated's rows"""
+    import pandas as pd
+    if current is None:
+        return updated.reset_index(drop=True)
+    return pd.concat([current[~_key_mask(current, updated[key])], updated], ignore_index=True)
+
+
+class SeasonAnalytics:
+    """
+    Advanced metrics over every game seen so far, updated one batch of games at a time
+
+    add_games() computes per-game metrics for the new games only and then
+    recomputes the season totals and rolling averages of just the players
+    and teams that played in them. Re-adding a game replaces it.
+    """
+
+    def __init__(self, window=DEFAULT_WINDOW):
+        self.window = window
+        self.players = None        # One row per player per game, with per-game metrics
+        self.teams = None          # One row per team per game, with possessions, pace and ratings
+        self.player_season = None  # Per (player, team) season totals and rates
+        self.team_season = None    # Per team season totals, pace and ratings
+        self.rolling = None        # Per player game, averages over the player's last `window` games
+        self.synced_at = 0.0       # scraped_at of the newest store game included
+        self.last_update = {}      # Games, players and teams touched by the last update
+        self.rewindowed = False    # Rolling averages recomputed by load() for a new window, not yet saved
+
+    def add_games(self, players):
+        """
+        Add (or replace) the games in a player box-score frame
+
+        players needs game_id, date, team and player columns plus the
+        COUNTING columns, as stored by GameStore or built by player_rows().
+        """
+        import pandas as pd
+        if players.empty:
+            self.last_update = {'games': 0, 'players': 0, 'teams': 0}
+            return self
+        players = players.copy()
+        players[list(COUNTING)] = players[list(COUNTING)].astype('float64')
+        players['team'] = players['team'].fillna('').astype(str)
+        players['date'] = pd.to_datetime(players['date'])  # Native max/sort instead of string comparisons
+
+        new_teams = team_games(players)
+        new_players = player_games(players, new_teams)
+        game_ids = set(players['game_id'])
+
+        affected_players = new_players[PLAYER_KEY]
+        affected_teams = set(new_teams['team'])
+        if self.players is not None:
+            # Players and teams of a replaced game are affected too
+            replaced = self.players['game_id'].isin(game_ids)
+            affected_players = pd.concat([affected_players, self.players.loc[replaced, PLAYER_KEY]])
+            affected_teams |= set(self.teams.loc[self.teams['game_id'].isin(game_ids), 'team'])
+            self.players = pd.concat([self.players[~replaced], new_players], ignore_index=True)
+            self.teams = pd.concat([self.teams[~self.teams['game_id'].isin(game_ids)], new_teams],
+                                   ignore_index=True)
+        else:
+            self.players, self.teams = new_players, new_teams
+        affected_players = affected_players.drop_duplicates()
+
+        # Only the affected players' and teams' rows are regrouped
+        player_history = self.players[_key_mask(self.players, affected_players)]
+        team_history = self.teams[self.teams['team'].isin(affected_teams)]
+        self.player_season = _replace(self.player_season, season_totals(player_history, PLAYER_KEY), PLAYER_KEY)
+        self.team_season = _replace(self.team_season, season_totals(team_history, ['team']), ['team'])
+        self.rolling = _replace(self.rolling, rolling_averages(player_history, self.window), PLAYER_KEY)
+
+        self.last_update = {'games': len(game_ids), 'players': len(affected_players), 'teams': len(affected_teams)}
+        return self
+
+    def add_scrapers(self, scrapers):
+        """Add games straight from parsed NBAGameScraper objects"""
+        import pandas as pd
+        frames = [player_rows(scraper) for scraper in scrapers]
+        return self.add_games(pd.concat(frames, ignore_index=True) if frames else pd.DataFrame())
+
+    def sync(self, store):
+        """Add every game stored (or re-stored) since the last sync; returns the number of games added"""
+        games = store.games_scraped_since(self.synced_at)
+        if not games:
+            self.last_update = {'games': 0, 'players': 0, 'teams': 0}
+            return 0
+        self.add_games(store.players_frame([game['game_id'] for game in games]))
+        self.synced_at = max(game['scraped_at'] for game in games)
+        return len(games)
+
+    def tables(self):
+        """The analytics tables by name (empty until games are added)"""
+        return {
+            'player_games': self.players,
+            'team_games': self.teams,
+            'player_season': self.player_season,
+            'team_season': self.team_season,
+            'player_rolling': self.rolling,
+        }
+
+    def export(self, directory=DEFAULT_ANALYTICS_DIR):
+        """Write every analytics table as CSV under directory; returns the written paths"""
+        os.makedirs(directory, exist_ok=True)
+        paths = []
+        for name, frame in self.tables().items():
+            if frame is None:
+                continue
+            path = os.path.join(directory, f"{name}.csv")
+            frame.sort_values([column for column in ('date', 'team', 'player') if column in frame]) \
+                .round(3).to_csv(path, index=False)
+            paths.append(path)
+        return paths
+
+    def save(self, path):
+        import pandas as pd
+        pd.to_pickle(self, path)
+
+    @classmethod
+    def load(cls, path, window=DEFAULT_WINDOW):
+        """
+        Saved analytics state, or a new empty one when path does not exist
+
+        A state saved with another rolling window has its rolling averages
+        recomputed over every stored player game with the requested window,
+        and rewindowed set so the caller exports and saves it.
+        """
+        import pandas as pd
+        if not os.path.exists(path):
+            return cls(window)
+        analytics = pd.read_pickle(path)
+        analytics.rewindowed = analytics.window != window
+        if analytics.rewindowed:
+            print(f"Rolling window changed from {analytics.window} to {window} games, recomputing rolling averages")
+            analytics.window = window
+            if analytics.players is not None:
+                analytics.rolling = rolling_averages(analytics.players, window)
+        return analytics
+
+
+def player_rows(scraper):
+    """A parsed game's typed box score with game_id and date, in the shape add_games() expects"""
+    from .store import canonical_team
+    from .writers import game_date
+    frame = scraper.player_frame()
+    if frame.empty:
+        return frame
+    frame['team'] = [canonical_team(team, scraper.team_name_mapping) for team in frame['team'].astype(str)]
+    frame.insert(0, 'date', game_date(scraper))
+    frame.insert(0, 'game_id', scraper.game_id)
+    for column in COUNTING:
+        if column not in frame:
+            frame[column] = float('nan')
+    return frame
@@ -0,0 +1,177 @@
+"""
+Batch scraping of many NBA games
+Fetches pages concurrently over a shared session and parses/exports them in a process pool
+"""
+
+import contextlib
+import io
+import os
+import re
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+from .fetcher import create_fetcher
+from .profiling import aggregate, merge, profile_run
+
+
+BASE_URL = 'https://tw-nba.udn.com/nba/standings_game/'
+GAME_UUID_PATTERN = re.compile(r'^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$')
+
+
+def read_game_list(source, base_url=BASE_URL):
+    """
+    Read game URLs from a file, one per line ('-' reads stdin)
+
+    Bare game UUIDs are expanded with base_url; blank lines and '#' comments
+    are skipped and duplicates are dropped.
+    """
+    if source == '-':
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(source, encoding='utf-8') as f:
+            lines = f.read().splitlines()
+
+    urls = []
+    for line in lines:
+        entry = line.split('#', 1)[0].strip()
+        if not entry:
+            continue
+        if GAME_UUID_PATTERN.match(entry):
+            entry = base_url.rstrip('/') + '/' + entry
+        if entry not in urls:
+            urls.append(entry)
+    return urls
+
+
+def process_game(url, html_content, parser='bs4', output_dir='output_excel', writers=None, profile_dir=None):
+    """
+    Parse and export one fetched game; runs in a worker process
+
+    With profile_dir, the game runs under cProfile/tracemalloc and its profile
+    is written there, named after the game id.
+    """
+    from .scraper import NBAGameScraper
+
+    start = time.perf_counter()
+    log = io.StringIO()
+    scraper = NBAGameScraper(url, parser=parser)
+    error = None
+    profiling = profile_run(profile_dir, scraper.game_id) if profile_dir else contextlib.nullcontext()
+    try:
+        with profiling, contextlib.redirect_stdout(log):
+            success = scraper.scrape(html_content, output_dir=output_dir, include_game_id=True,
+                                     writers=writers)
+        if not success:
+            # The scraper reports failures by printing; surface the last message
+            lines = log.getvalue().strip().splitlines()
+            error = lines[-1] if lines else 'Export failed'
+    except Exception as e:
+        success, error = False, f"{type(e).__name__}: {e}"
+
+    return {
+        'success': success,
+        'error': error,
+        'players': len(scraper.player_stats),
+        'tables': len(getattr(scraper, 'all_data', {}).get('tables', [])),
+        'output': scraper.output_path,
+        'process_time': time.perf_counter() - start,
+        'metrics': scraper.profiler.summary(),
+    }
+
+
+class BatchScraper:
+    """Scrape many games: bounded concurrent fetches feeding a parse/export process pool"""
+
+    def __init__(self, urls, fetch_workers=8, parse_workers=None, parser='bs4', output_dir='output_excel',
+                 cache=None, writers=None, profile_dir=None, session=None):
+        self.urls = list(urls)
+        self.fetch_workers = fetch_workers
+        self.parse_workers = parse_workers or os.cpu_count() or 1
+        self.parser = parser
+        self.output_dir = output_dir
+        self.session = session or create_fetcher(pool_size=fetch_workers)  # Retries, rate limit and metrics
+        self.cache = cache
+        self.writers = writers  # Output writers passed to every game; None means one Excel workbook
+        self.profile_dir = profile_dir  # Per-game cProfile/tracemalloc output, or None
+        self.results = []
+
+    def fetch(self, url):
+        """Fetch one game page over the shared session"""
+        from .scraper import NBAGameScraper
+
+        start = time.perf_counter()
+        scraper = NBAGameScraper(url, session=self.session, cache=self.cache)
+        html_content = scraper.fetch_page()
+        return html_content, scraper.last_error, time.perf_counter() - start, scraper.profiler.summary()
+
+    def record(self, result):
+        """Store a per-game result and report it"""
+        self.results.append(result)
+        status = 'OK  ' if result['success'] else 'FAIL'
+        detail = result['output'] if result['success'] else result['error']
+        print(f"[{len(self.results)}/{len(self.urls)}] {status} {result['url']} -> {detail}")
+
+    def run(self):
+        """Scrape every URL; returns the aggregate summary"""
+        start = time.perf_counter()
+        pending_urls = iter(self.urls)
+        fetches, parses = {}, {}
+        # Bound fetched-but-unparsed pages so fast fetching can't outrun the parse pool
+        max_backlog = self.parse_workers * 2
+
+        with ThreadPoolExecutor(self.fetch_workers) as fetch_pool, \
+                ProcessPoolExecutor(self.parse_workers) as parse_pool:
+
+            def fill_fetches():
+                while len(fetches) < self.fetch_workers and len(parses) < max_backlog:
+                    url = next(pending_urls, None)
+                    if url is None:
+                        return
+                    fetches[fetch_pool.submit(self.fetch, url)] = url
+
+            fill_fetches()
+            while fetches or parses:
+                done, _ = wait(list(fetches) + list(parses), return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future in fetches:
+                        url = fetches.pop(future)
+                        html_content, error, fetch_time, fetch_metrics = future.result()
+                        if html_content is None:
+                            self.record({'url': url, 'success': False, 'error': f"Fetch failed: {error}",
+                                         'bytes': 0, 'fetch_time': fetch_time, 'process_time': 0.0,
+                                         'players': 0, 'tables': 0, 'output': None, 'metrics': fetch_metrics})
+                            continue
+                        parse_future = parse_pool.submit(process_game, url, html_content, self.parser,
+                                                         self.output_dir, self.writers, self.profile_dir)
+                        size = len(html_content if isinstance(html_content, bytes) else html_content.encode('utf-8'))
+                        parses[parse_future] = (url, size, fetch_time, fetch_metrics)
+                    else:
+                        url, size, fetch_time, fetch_metrics = parses.pop(future)
+                        try:
+                            result = future.result()
+                        except Exception as e:
+                            result = {'success': False, 'error': f"{type(e).__name__}: {e}",
+                                      'players': 0, 'tables': 0, 'output': None, 'process_time': 0.0}
+                        result.update(url=url, bytes=size, fetch_time=fetch_time,
+                                      metrics=merge(fetch_metrics, result.get('metrics')))
+                        self.record(result)
+                fill_fetches()
+
+        return self.summary(time.perf_counter() - start)
+
+    def summary(self, elapsed):
+        """Aggregate success counts and throughput"""
+        succeeded = sum(1 for r in self.results if r['success'])
+        total_bytes = sum(r['bytes'] for r in self.results)
+        return {
+            'games': len(self.results),
+            'succeeded': succeeded,
+            'failed': len(self.results) - succeeded,
+            'elapsed': elapsed,
+            'games_per_second': len(self.results) / elapsed if elapsed else 0.0,
+            'megabytes': total_bytes / 1e6,
+            'fetch_time': sum(r['fetch_time'] for r in self.results),
+            'process_time': sum(r['process_time'] for r in self.results),
+            'stages': aggregate([r.get('metrics') for r in self.results]),
+        }
@@ -0,0 +1,227 @@
+"""
+Typed, columnar box-score model
+Player rows are converted while parsing into typed column buffers and exposed as a pandas DataFrame
+"""
+
+import re
+from array import array
+
+
+# Column kinds
+TEXT = 'text'          # Categorical (dictionary-encoded) strings
+SECONDS = 'seconds'    # "34:12" -> 2052
+SPLIT = 'split'        # "8-15" -> made 8, attempted 15
+PERCENT = 'percent'    # "53.3" / "53.3%" -> 53.3
+INTEGER = 'integer'
+
+# Box-score headers (Chinese and English) -> (canonical column name, kind)
+HEADER_COLUMNS = {
+    '先發': ('player', TEXT), '球員': ('player', TEXT), 'PLAYER': ('player', TEXT),
+    '位置': ('position', TEXT), 'POS': ('position', TEXT),
+    '時間': ('seconds', SECONDS), '分鐘': ('seconds', SECONDS), 'MIN': ('seconds', SECONDS),
+    '投籃': ('fg', SPLIT), 'FG': ('fg', SPLIT), 'FGM-A': ('fg', SPLIT),
+    '三分': ('fg3', SPLIT), '3PT': ('fg3', SPLIT), '3PM-A': ('fg3', SPLIT),
+    '罰球': ('ft', SPLIT), 'FT': ('ft', SPLIT), 'FTM-A': ('ft', SPLIT),
+    '投籃%': ('fg_pct', PERCENT), 'FG%': ('fg_pct', PERCENT),
+    '3分%': ('fg3_pct', PERCENT), '3P%': ('fg3_pct', PERCENT),
+    '罰球%': ('ft_pct', PERCENT), 'FT%': ('ft_pct', PERCENT),
+    '進攻籃板': ('oreb', INTEGER), 'OREB': ('oreb', INTEGER),
+    '防守籃板': ('dreb', INTEGER), 'DREB': ('dreb', INTEGER),
+    '籃板': ('reb', INTEGER), 'REB': ('reb', INTEGER),
+    '助攻': ('ast', INTEGER), 'AST': ('ast', INTEGER),
+    '抄截': ('stl', INTEGER), 'STL': ('stl', INTEGER),
+    '阻攻': ('blk', INTEGER), 'BLK': ('blk', INTEGER),
+    '失誤': ('tov', INTEGER), 'TO': ('tov', INTEGER), 'TOV': ('tov', INTEGER),
+    '犯規': ('pf', INTEGER), 'PF': ('pf', INTEGER),
+    '得分': ('pts', INTEGER), 'PTS': ('pts', INTEGER),
+    '+/-': ('plus_minus', INTEGER),
+}
+
+# First-cell text of the row separating starters from the bench
+BENCH_MARKERS = ('替補', 'BENCH', 'Bench')
+
+_SECONDS_PATTERN = re.compile(r'^(\d+):(\d{1,2})$')
+_SPLIT_PATTERN = re.compile(r'^(\d+)\s*-\s*(\d+)$')
+_NUMBER_PATTERN = re.compile(r'^[+-]?\d+(\.\d+)?%?$')
+_PLAIN_NUMBER_PATTERN = re.compile(r'^[+-]?\d+(\.\d+)?$')  # No '%': invalid in minutes and count columns
+
+
+def column_for_header(header):
+    """(column name, kind) for a box-score header; unknown headers become numeric or text columns"""
+    column = HEADER_COLUMNS.get(header) or HEADER_COLUMNS.get(header.upper())
+    if column:
+        return column
+    if '%' in header:
+        return header, PERCENT
+    return header, None  # Kind decided by the first non-empty value
+
+
+def _infer_kind(value):
+    if _SECONDS_PATTERN.match(value):
+        return SECONDS
+    if _SPLIT_PATTERN.match(value):
+        return SPLIT
+    if _NUMBER_PATTERN.match(value):
+        return PERCENT if ('.' in value or value.endswith('%')) else INTEGER
+    return TEXT
+
+
+class _Column:
+    """Typed buffer for one logical column, with a validity mask for missing values"""
+
+    def __init__(self, name, kind):
+        self.name = name
+        self.kind = kind
+        self.valid = array('b')
+        if kind == TEXT:
+            self.codes = array('i')
+            self.categories = {}
+        elif kind == SPLIT:
+            self.made = array('i')
+            self.attempted = array('i')
+        elif kind == PERCENT:
+            self.values = array('d')
+        else:
+            self.values = array('i')
+
+    def append(self, value):
+        """Convert and append one cell; unparseable or empty cells are stored as missing"""
+        if self.kind == TEXT:
+            if value:
+                code = self.categories.setdefault(value, len(self.categories))
+                self.codes.append(code)
+                self.valid.append(1)
+            else:
+                self.codes.append(-1)
+                self.valid.append(0)
+            return
+
+        ok = True
+        if self.kind == SECONDS:
+            match = _SECONDS_PATTERN.match(value)
+            if match:
+                self.values.append(int(match.group(1)) * 60 + int(match.group(2)))
+            else:
+                ok = _PLAIN_NUMBER_PATTERN.match(value) is not None  # Plain minutes, e.g. "34"
+                self.values.append(int(float(value)) * 60 if ok else 0)
+        elif self.kind == SPLIT:
+            match = _SPLIT_PATTERN.match(value)
+            ok = match is not None
+            self.made.append(int(match.group(1)) if ok else 0)
+            self.attempted.append(int(match.group(2)) if ok else 0)
+        elif self.kind == PERCENT:
+            ok = _NUMBER_PATTERN.match(value) is not None
+            self.values.append(float(value.rstrip('%')) if ok else 0.0)
+        else:
+            ok = _PLAIN_NUMBER_PATTERN.match(value) is not None
+            self.values.append(int(float(value)) if ok else 0)
+        self.valid.append(1 if ok else 0)
+
+    def pad(self, count):
+        """Append missing values until the column holds count rows"""
+        while len(self.valid) < count:
+            self.append('')
+
+    def to_series(self):
+        """Column(s) as (name, pandas array) pairs"""
+        import numpy as np
+        import pandas as pd
+        mask = np.frombuffer(self.valid, dtype=np.int8) == 0 if len(self.valid) else np.zeros(0, bool)
+        if self.kind == TEXT:
+            categories = list(self.categories)
+            return [(self.name, pd.Categorical.from_codes(np.frombuffer(self.codes, dtype=np.int32)
+                                                          if len(self.codes) else [], categories))]
+        if self.kind == SPLIT:
+            return [(f'{self.name}m', _int_array(self.made, mask)),
+                    (f'{self.name}a', _int_array(self.attempted, mask))]
+        if self.kind == PERCENT:
+            values = np.frombuffer(self.values, dtype=np.float64).copy() if len(self.values) else np.zeros(0)
+            values[mask] = np.nan
+            return [(self.name, values)]
+        return [(self.name, _int_array(self.values, mask))]
+
+
+def _int_array(values, mask):
+    import numpy as np
+    import pandas as pd
+    data = np.frombuffer(values, dtype=np.int32).copy() if len(values) else np.zeros(0, np.int32)
+    return pd.arrays.IntegerArray(data, mask.copy())
+
+
+class BoxScoreBuilder:
+    """
+    Collects player rows from box-score tables straight into typed columns
+
+    Each table is one team's box score; rows carry the table's ordinal so the
+    team column can be filled in once team names are known.
+    """
+
+    def __init__(self):
+        self.columns = {}
+        self.table_codes = array('b')
+        self.starter = array('b')
+        self.rows = 0
+        self._layout = None
+        self._table = -1
+        self._starters = True
+
+    def start_table(self, headers):
+        """
+        Begin a new table with the given header texts
+
+        Tables without a player column (e.g. the one-header season-stat tables
+        that also match the MIN/PTS check) are ignored until the next table.
+        """
+        self._starters = True
+        self._layout = [list(column_for_header(header)) for header in headers]
+        if not any(name == 'player' for name, _ in self._layout):
+            self._layout = None
+            return
+        self._table += 1
+
+    def add_row(self, cells):
+        """Convert and append one row of cell texts from the current table"""
+        if self._layout is None:
+            return
+        if len(cells) <= 1:
+            # Section rows such as the 替補 (bench) separator carry no stats
+            if cells and cells[0] in BENCH_MARKERS:
+                self._starters = False
+            return
+
+        for slot, value in zip(self._layout, cells):
+            name, kind = slot
+            column = self.columns.get(name)
+            if column is None:
+                if kind is None:
+                    if not value:
+                        continue
+                    kind = slot[1] = _infer_kind(value)
+                column = self.columns[name] = _Column(name, kind)
+            column.pad(self.rows)
+            column.append(value)
+
+        self.rows += 1
+        self.table_codes.append(self._table)
+        self.starter.append(1 if self._starters else 0)
+
+    def to_frame(self, team_names=None):
+        """
+        Build the typed DataFrame
+
+        Args:
+            team_names: Team name per box-score table, in table order
+        """
+        import numpy as np
+        import pandas as pd
+        data = {}
+        if self.rows:
+            codes = np.frombuffer(self.table_codes, dtype=np.int8).astype(np.int32)
+            teams = list(team_names or [])
+            teams += [f'Team {i + 1}' for i in range(len(teams), int(codes.max()) + 1)]
+            data['team'] = pd.Categorical.from_codes(codes, teams[:int(codes.max()) + 1])
+            data['starter'] = np.frombuffer(self.starter, dtype=np.int8).astype(bool)
+        for column in self.columns.values():
+            column.pad(self.rows)
+            data.update(column.to_series())
+        return pd.DataFrame(data)
@@ -0,0 +1,170 @@
+"""
+On-disk HTTP response cache for game pages
+Stores compressed bodies with their validators in SQLite and revalidates with conditional GETs
+"""
+
+import os
+import threading
+import time
+import zlib
+
+
+DEFAULT_CACHE_DIR = '.nba_cache'
+
+# Game status text that marks a finished game; finished pages are served from cache without revalidation
+FINAL_MARKERS = ('終場',)
+
+
+def is_final(status):
+    """True when a game status (see lxml_parser.game_status) says the game has ended"""
+    return bool(status) and any(marker in status for marker in FINAL_MARKERS)
+
+
+class CacheEntry:
+    """A cached response body with its validators"""
+
+    __slots__ = ('url', 'text', 'etag', 'last_modified', 'fetched_at', 'final')
+
+    def __init__(self, url, text, etag, last_modified, fetched_at, final):
+        self.url = url
+        self.text = text
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = fetched_at
+        self.final = final
+
+    def is_fresh(self, ttl):
+        """Finished games never expire; live games are fresh for ttl seconds"""
+        return self.final or time.time() - self.fetched_at < ttl
+
+    def conditional_headers(self):
+        """If-None-Match / If-Modified-Since headers for revalidating this entry"""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """
+    Persistent response cache keyed by game URL
+
+    Bodies are zlib-compressed; once the compressed total exceeds max_bytes the
+    least recently used entries are evicted. Safe to share between threads.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, ttl=60, max_bytes=500 * 1024 * 1024):
+        import sqlite3
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self.path = os.path.join(cache_dir, 'responses.sqlite')
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0          # Served from cache without a request
+        self.revalidated = 0   # Served from cache after a 304 Not Modified
+        self.misses = 0        # Full download stored in the cache
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                body BLOB NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                final INTEGER NOT NULL,
+                size INTEGER NOT NULL
+            )''')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)')
+        self._conn.commit()
+
+    @staticmethod
+    def key(url):
+        """Cache key for a URL: fragment and trailing slash dropped"""
+        return url.split('#', 1)[0].rstrip('/')
+
+    def lookup(self, url):
+        """Cached entry for url, or None"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT body, etag, last_modified, fetched_at, final FROM responses WHERE url = ?',
+                (self.key(url),)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute('UPDATE responses SET accessed_at = ? WHERE url = ?', (time.time(), self.key(url)))
+            self._conn.commit()
+
+        body, etag, last_modified, fetched_at, final = row
+        return CacheEntry(url, zlib.decompress(body).decode('utf-8'), etag, last_modified, fetched_at, bool(final))
+
+    def record_hit(self):
+        """Count a response served from cache without a request"""
+        with self._lock:
+            self.hits += 1
+
+    def mark_revalidated(self, url):
+        """Record a 304 Not Modified: restart the entry's TTL"""
+        with self._lock:
+            now = time.time()
+            self._conn.execute('UPDATE responses SET fetched_at = ?, accessed_at = ? WHERE url = ?',
+                               (now, now, self.key(url)))
+            self._conn.commit()
+            self.revalidated += 1
+
+    def store(self, url, text, headers, final=None):
+        """
+        Store a downloaded page with its ETag/Last-Modified validators
+
+        The page is kept without expiry when final is true. Callers that know
+        (a past day's listing, a watcher that parsed the page) pass it; by
+        default a game page is final when its own game status says the game
+        has ended, and 終場 elsewhere on the page (tickers, other games) doesn't count.
+        """
+        body = zlib.compress(text.encode('utf-8'))
+        if final is None:
+            from .lxml_parser import game_status
+            final = is_final(game_status(text))
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (self.key(url), body, headers.get('ETag'), headers.get('Last-Modified'),
+                 now, now, int(final), len(body)))
+            self._evict()
+            self._conn.commit()
+            self.misses += 1
+
+    def _evict(self):
+        """Drop least recently used entries until the cache fits in max_bytes"""
+        total = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute('SELECT url, size FROM responses ORDER BY accessed_at').fetchall()
+        for url, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._conn.execute('DELETE FROM responses WHERE url = ?', (url,))
+            total -= size
+            self.evictions += 1
+
+    def stats(self):
+        """Hit/miss counters plus current size"""
+        with self._lock:
+            entries, size = self._conn.execute(
+                'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses').fetchone()
+        return {
+            'hits': self.hits,
+            'revalidated': self.revalidated,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'entries': entries,
+            'bytes': size,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,115 @@
+"""
+Team season statistics consolidation
+Collects the three-row season-stat tables into one long frame and reshapes it once, per game or league-wide
+"""
+
+from .teams import TEAM_RESOLVER
+from .writers import game_date
+
+
+# Season-stat table titles -> statistic names
+STAT_MAPPING = {
+    '得分': 'Points per Game',
+    '助攻': 'Assists per Game',
+    '籃板': 'Rebounds per Game',
+    '阻攻': 'Blocks per Game',
+    '抄截': 'Steals per Game',
+    '投籃%': 'Field Goal %',
+    '3分%': '3-Point %',
+    '罰球%': 'Free Throw %',
+    '失誤': 'Turnovers per Game'
+}
+
+LONG_COLUMNS = ['Team', 'Statistic', 'Value', 'League Rank']
+
+
+def is_season_table(data):
+    """Season-stat tables have 3 rows: the stat name alone, then [team, value, rank] per team"""
+    return len(data) == 3 and len(data[0]) == 1 and len(data[1]) == 3 and len(data[2]) == 3
+
+
+def season_stats_long(tables, team_name_mapping):
+    """
+    Long-format frame (Team, Statistic, Value, League Rank) from season-stat tables
+
+    Args:
+        tables: Cell grids of the tables classified as season-stat tables
+        team_name_mapping: Chinese -> English team names, for 'Chinese(English)' labels
+    """
+    import pandas as pd
+    teams, statistics, values, ranks = [], [], [], []
+    for data in tables:
+        statistic = STAT_MAPPING.get(data[0][0])
+        if statistic is None:
+            continue
+        for team, value, rank in data[1:]:
+            teams.append(team)
+            statistics.append(statistic)
+            values.append(value)
+            ranks.append(rank)
+
+    frame = pd.DataFrame({'Team': teams, 'Statistic': statistics, 'Value': values, 'League Rank': ranks},
+                         columns=LONG_COLUMNS)
+    if len(frame):
+        labels = {team: f"{team}({TEAM_RESOLVER.english(team, team_name_mapping)})"
+                  for team in frame['Team'].unique()}
+        frame['Team'] = frame['Team'].map(labels)
+    return frame
+
+
+def season_stats_wide(long):
+    """
+    'Team Season Statistics' sheet: one row per statistic, '<team> Value' and
+    '<team> Rank' columns per team
+
+    Statistics and teams are factorized (sorted) and every value and rank is
+    scattered into one grid in a single step; the first entry wins on duplicates.
+    """
+    import numpy as np
+    import pandas as pd
+    if long.empty:
+        return pd.DataFrame()
+    stat_codes, statistics = pd.factorize(long['Statistic'], sort=True)
+    team_codes, teams = pd.factorize(long['Team'], sort=True)
+
+    grid = np.full((len(statistics), 2 * len(teams)), np.nan, dtype=object)
+    # Reversed so the first occurrence of a (statistic, team) pair is written last
+    rows, columns = stat_codes[::-1], 2 * team_codes[::-1]
+    grid[rows, columns] = long['Value'].to_numpy(dtype=object)[::-1]
+    grid[rows, columns + 1] = long['League Rank'].to_numpy(dtype=object)[::-1]
+
+    wide = pd.DataFrame(grid, columns=[f"{team} {field}" for team in teams for field in ('Value', 'Rank')])
+    wide.insert(0, 'Statistic', statistics)
+    return wide
+
+
+def league_stats_long(scrapers):
+    """Long frame of every game's season stats, with game_id and date columns"""
+    import pandas as pd
+    frames = []
+    for scraper in scrapers:
+        long = scraper.season_stats_frame()
+        if len(long):
+            frames.append(long.assign(game_id=scraper.game_id, date=game_date(scraper)))
+    if not frames:
+        return pd.DataFrame(columns=['game_id', 'date'] + LONG_COLUMNS)
+    return pd.concat(frames, ignore_index=True)
+
+
+def league_matrix(long, field='Value'):
+    """
+    League-wide team x statistic matrix from a multi-game long frame
+
+    Season stats are cumulative, so each team's latest game (by date) wins;
+    games without a date lose to dated ones.
+    Values are numeric; field='League Rank' gives the rank matrix instead.
+    """
+    import pandas as pd
+    if long.empty:
+        return pd.DataFrame()
+    latest = (long.sort_values('date', kind='stable', na_position='first')
+                  .drop_duplicates(['Team', 'Statistic'], keep='last'))
+    matrix = latest.pivot(index='Team', columns='Statistic', values=field)
+    matrix = matrix.apply(pd.to_numeric, errors='coerce')
+    matrix.columns.name = None
+    return matrix.reindex(columns=[name for name in STAT_MAPPING.values() if name in matrix.columns])
@@ -0,0 +1,264 @@
+"""
+Warm scrape daemon
+Keeps one interpreter with the heavy libraries loaded and runs main.py command lines sent over a local socket
+
+Start it with `python main.py --serve [ADDRESS]`, then send jobs with
+`python -m src.daemon [--address ADDRESS] -- <main.py arguments>`.
+
+Jobs run as the daemon's user, so only that user may send them: the Unix
+socket is created with 0600 permissions, and on TCP every job must carry the
+token the daemon writes to a 0600 file in the user's home directory.
+"""
+
+import contextlib
+import hmac
+import io
+import json
+import os
+import secrets
+import signal
+import socket
+import socketserver
+import sys
+import tempfile
+import time
+import traceback
+
+
+# 'host:port' for TCP on the loopback interface, anything else is a Unix socket path
+if hasattr(socket, 'AF_UNIX') and hasattr(os, 'getuid'):
+    DEFAULT_ADDRESS = os.path.join(tempfile.gettempdir(), f'nba-scrape-daemon-{os.getuid()}.sock')
+else:
+    DEFAULT_ADDRESS = '127.0.0.1:8790'
+
+# Options (argparse dest -> flag) that never finish or poll for hours; they would block the one-job-at-a-time daemon
+REFUSED_OPTIONS = {'serve': '--serve', 'api': '--api', 'watch': '--watch'}
+
+# Imported once at startup so no job pays for them
+PRELOAD = ('pandas', 'openpyxl', 'bs4', 'requests', 'lxml.etree')
+
+
+def parse_address(address):
+    """(socket family, address) for 'host:port' or a Unix socket path"""
+    host, sep, port = address.rpartition(':')
+    if sep and port.isdigit():
+        return socket.AF_INET, (host or '127.0.0.1', int(port))
+    if not hasattr(socket, 'AF_UNIX'):
+        raise ValueError(f"Unix sockets are not available here; use host:port instead of {address!r}")
+    return socket.AF_UNIX, address
+
+
+def token_path(address):
+    """File holding the job token of the TCP daemon at address"""
+    port = address.rpartition(':')[2]
+    return os.path.join(os.path.expanduser('~'), f'.nba_scrape_daemon_{port}.token')
+
+
+def write_token(path):
+    """Write a new random token readable only by this user; returns it"""
+    token = secrets.token_hex(32)
+    with contextlib.suppress(FileNotFoundError):
+        os.unlink(path)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, 'w') as f:
+        f.write(token)
+    return token
+
+
+def read_token(address):
+    """Token of the TCP daemon at address, or None when there is no token file"""
+    try:
+        with open(token_path(address)) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def refused_option(argv, parser):
+    """
+    The long-running option argv sets (in any spelling main's parser accepts), or None
+
+    argv is parsed with main's own parser, so abbreviations, short flags and
+    clusters such as -wu are caught. Command lines the parser rejects are left
+    to the job itself, which reports the error.
+    """
+    try:
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            args, _ = parser.parse_known_args(argv)
+    except SystemExit:
+        return None
+    return next((option for dest, option in REFUSED_OPTIONS.items() if getattr(args, dest, None)), None)
+
+
+def _review_path(path=...):
+    """The shared layout classifier's review path; sets it when path is given"""
+    from .layout import CLASSIFIER
+    if path is not ...:
+        CLASSIFIER.review_path = path
+    return CLASSIFIER.review_path
+
+
+class _JobHandler(socketserver.StreamRequestHandler):
+    """One JSON line in ({'argv': [...], 'cwd': ...}), one JSON line out"""
+
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            return
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            response = {'exit': 2, 'stdout': '', 'stderr': f"Bad request: {e}\n"}
+        else:
+            token = self.server.daemon.token
+            if token is not None and not hmac.compare_digest(str(request.get('token', '')), token):
+                response = {'exit': 2, 'stdout': '', 'stderr': "Rejected: missing or wrong daemon token\n"}
+            else:
+                response = self.server.daemon.run_job(request)
+        self.wfile.write(json.dumps(response, ensure_ascii=False).encode('utf-8') + b'\n')
+
+
+class _TCPServer(socketserver.TCPServer):
+    allow_reuse_address = True
+
+
+class ScrapeDaemon:
+    """
+    Runs command lines through an entry point (main.main) in this process
+
+    Jobs run one at a time, since each one redirects the process-wide stdout
+    and changes into the client's working directory so relative output paths
+    land where the client expects them.
+    """
+
+    def __init__(self, entry_point, address=DEFAULT_ADDRESS, parser=None):
+        self.entry_point = entry_point
+        self.parser = parser  # entry_point's argparse parser, to refuse long-running jobs before they start
+        self.address = address
+        self.jobs = 0
+        self.token = None  # Required from TCP clients, see token_path()
+
+    def preload(self):
+        """Import the heavy libraries now rather than in the first job"""
+        start = time.perf_counter()
+        for name in PRELOAD:
+            try:
+                __import__(name)
+            except ImportError:
+                pass
+        return time.perf_counter() - start
+
+    def run_job(self, request):
+        """Run one command line; returns its exit code and captured output"""
+        argv = [str(arg) for arg in request.get('argv', [])]
+        refused = refused_option(argv, self.parser) if self.parser is not None else None
+        if refused:
+            return {'exit': 2, 'stdout': '',
+                    'stderr': f"Error: {refused} runs indefinitely and is not accepted as a daemon job; "
+                              f"run it directly with python main.py\n"}
+        stdout, stderr = io.StringIO(), io.StringIO()
+        previous_dir = os.getcwd()
+        environ = dict(os.environ)  # Jobs may set variables (e.g. --record-layouts); later jobs must not inherit them
+        review_path = _review_path()
+        code = 0
+        start = time.perf_counter()
+        try:
+            os.chdir(request.get('cwd') or previous_dir)
+            with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+                stdin, sys.stdin = sys.stdin, io.StringIO()  # Jobs can't prompt
+                try:
+                    self.entry_point(argv)
+                finally:
+                    sys.stdin = stdin
+        except SystemExit as e:
+            code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+            if e.code is not None and not isinstance(e.code, int):
+                stderr.write(f"{e.code}\n")
+        except Exception:
+            code = 1
+            stderr.write(traceback.format_exc())
+        finally:
+            os.chdir(previous_dir)
+            os.environ.clear()
+            os.environ.update(environ)
+            _review_path(review_path)
+        self.jobs += 1
+        print(f"[job {self.jobs}] exit {code} in {time.perf_counter() - start:.2f}s: {' '.join(argv)}")
+        return {'exit': code, 'stdout': stdout.getvalue(), 'stderr': stderr.getvalue()}
+
+    def serve_forever(self):
+        family, address = parse_address(self.address)
+        if family == socket.AF_UNIX:
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(address)
+            umask = os.umask(0o177)  # Socket file is created 0600: only this user can connect
+            try:
+                server = socketserver.UnixStreamServer(address, _JobHandler)
+            finally:
+                os.umask(umask)
+            os.chmod(address, 0o600)
+        else:
+            server = _TCPServer(address, _JobHandler)
+            self.token = write_token(token_path(self.address))
+            print(f"Job token written to {token_path(self.address)}")
+        server.daemon = self
+        signal.signal(signal.SIGTERM, _interrupt)  # `kill` stops it as cleanly as Ctrl+C
+        print(f"Preloaded libraries in {self.preload():.2f}s")
+        print(f"Scrape daemon listening on {self.address} (Ctrl+C to stop)")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(address if family == socket.AF_UNIX else token_path(self.address))
+        print(f"Scrape daemon stopped after {self.jobs} jobs")
+
+
+def _interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+def send_job(argv, address=DEFAULT_ADDRESS, cwd=None, timeout=None):
+    """
+    Run a main.py command line in the daemon at address
+
+    Returns {'exit', 'stdout', 'stderr'}; raises OSError when no daemon is listening.
+    """
+    family, target = parse_address(address)
+    with socket.socket(family, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(target)
+        request = {'argv': list(argv), 'cwd': cwd or os.getcwd()}
+        if family != socket.AF_UNIX:
+            request['token'] = read_token(address)
+        sock.sendall(json.dumps(request, ensure_ascii=False).encode('utf-8') + b'\n')
+        with sock.makefile('rb') as reply:
+            line = reply.readline()
+    if not line:
+        raise ConnectionError(f"Daemon at {address} closed the connection without a reply")
+    return json.loads(line)
+
+
+def main():
+    """Thin client: forward the arguments to a running daemon and relay its output"""
+    args = sys.argv[1:]
+    address = DEFAULT_ADDRESS
+    if args[:1] == ['--address'] and len(args) > 1:
+        address, args = args[1], args[2:]
+    if args[:1] == ['--']:
+        args = args[1:]
+    try:
+        response = send_job(args, address)
+    except OSError as e:
+        print(f"Error: No scrape daemon at {address} ({e}); start one with: python main.py --serve {address}",
+              file=sys.stderr)
+        sys.exit(2)
+    sys.stdout.write(response['stdout'])
+    sys.stderr.write(response['stderr'])
+    sys.exit(response['exit'])
+
+
+if __name__ == '__main__':
+    main()
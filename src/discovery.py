@@ -0,0 +1,179 @@
+"""
+Game discovery
+Crawls schedule/scoreboard listing pages for a date range and collects game UUIDs with their status
+"""
+
+import os
+import re
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+from .batch import BASE_URL
+from .fetcher import create_fetcher
+from .lxml_parser import xpath
+from .writers import DEFAULT_ROOTS
+
+
+# Listing page per day; {date} is YYYY-MM-DD and {compact} is YYYYMMDD.
+# Paths without a scheme are read from disk, e.g. 'fixtures/schedule/{date}.html'
+SCHEDULE_URL = 'https://tw-nba.udn.com/nba/schedule?date={date}'
+
+GAME_LINK_PATTERN = re.compile(
+    r'/nba/standings_game/([0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12})')
+GAME_ID_PATTERN = re.compile(r'[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}')
+
+# Status labels checked in order against the text around a game link
+STATUS_PATTERNS = (
+    ('final', re.compile('終場|FINAL|Final')),
+    ('postponed', re.compile('延賽|取消|Postponed|PPD')),
+    ('live', re.compile(r'第[一二三四1-4]節|半場|延長賽|進行中|LIVE|Live|\bQ[1-4]\b|\bOT\d?\b')),
+    ('scheduled', re.compile(r'\b\d{1,2}:\d{2}\b')),
+)
+STATUSES = ('final', 'postponed', 'live', 'scheduled', 'unknown')
+
+# Ancestor levels searched for a game link's status text, never past the game's own card
+STATUS_DEPTH = 4
+
+# Listing XPaths, compiled by lxml_parser.xpath() on first use
+_GAME_LINKS = "//a[contains(@href, 'standings_game/')]"
+_CARD_LINKS = ".//a[contains(@href, 'standings_game/')]/@href"
+_TEXT = 'string()'
+
+DiscoveredGame = namedtuple('DiscoveredGame', ['game_id', 'url', 'date', 'status'])
+
+
+def date_range(start, end):
+    """Every date from start to end inclusive (YYYY-MM-DD strings or date objects)"""
+    start = date.fromisoformat(start) if isinstance(start, str) else start
+    end = date.fromisoformat(end) if isinstance(end, str) else end
+    return [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+
+
+def game_status(text):
+    """Status label for the text of a game's listing entry"""
+    for status, pattern in STATUS_PATTERNS:
+        if pattern.search(text):
+            return status
+    return 'unknown'
+
+
+def _links_other_game(element, game_id):
+    """Whether element holds a link to a game other than game_id, i.e. is wider than game_id's card"""
+    for href in xpath(_CARD_LINKS, False)(element):
+        match = GAME_LINK_PATTERN.search(href)
+        if match and match.group(1).lower() != game_id:
+            return True
+    return False
+
+
+def parse_listing(html_content):
+    """
+    (game_id, status) pairs for every game on a listing page, in page order
+
+    A game's status comes from the text of the closest enclosing element that
+    mentions one, up to the game's card: an element that also links to another
+    game is not searched, so a card without its own status stays 'unknown'
+    instead of taking a neighbour's. Game ids that only appear outside links
+    (e.g. in inline scripts) are still returned, with status 'unknown'.
+    """
+    from lxml import etree
+
+    games = {}
+    root = etree.fromstring(html_content, etree.HTMLParser()) if html_content.strip() else None
+    if root is not None:
+        for link in xpath(_GAME_LINKS)(root):
+            match = GAME_LINK_PATTERN.search(link.get('href', ''))
+            if not match:
+                continue
+            game_id = match.group(1).lower()
+            status = 'unknown'
+            element = link
+            for _ in range(STATUS_DEPTH):
+                status = game_status(xpath(_TEXT, False)(element))
+                parent = element.getparent()
+                if status != 'unknown' or parent is None or _links_other_game(parent, game_id):
+                    break
+                element = parent
+            if games.get(game_id, 'unknown') == 'unknown':
+                games[game_id] = status
+
+    for match in GAME_LINK_PATTERN.finditer(html_content):
+        games.setdefault(match.group(1).lower(), 'unknown')
+    return list(games.items())
+
+
+def scraped_game_ids(output_dirs=None, store=None):
+    """
+    Ids of games already scraped: every game UUID in a filename under the output
+    directories (batch outputs carry the game id), plus every game in the store
+    """
+    found = set()
+    for directory in output_dirs if output_dirs is not None else DEFAULT_ROOTS.values():
+        for _, dirnames, filenames in os.walk(directory):
+            for name in dirnames + filenames:
+                found.update(game_id.lower() for game_id in GAME_ID_PATTERN.findall(name))
+    if store is not None:
+        found.update(row[0] for row in store.conn.execute('SELECT game_id FROM games'))
+    return found
+
+
+class ScheduleCrawler:
+    """
+    Fetches the listing page of each day in a date range in parallel and
+    collects the games they link to, deduplicated across days
+    """
+
+    def __init__(self, schedule_url=SCHEDULE_URL, base_url=BASE_URL, workers=8, cache=None, session=None):
+        self.schedule_url = schedule_url
+        self.base_url = base_url
+        self.workers = workers
+        self.session = session or create_fetcher(pool_size=workers)
+        self.cache = cache  # Optional ResponseCache; past days are stored as final and served without a request
+        self.errors = []
+        self.found = []  # Every game of the last crawl, before discover() filters it
+
+    def listing_url(self, day):
+        return self.schedule_url.format(date=day.isoformat(), compact=day.strftime('%Y%m%d'))
+
+    def fetch_listing(self, day):
+        """Listing page text for one day, or None when it can't be fetched"""
+        import requests
+        from .scraper import fetch_text
+        url = self.listing_url(day)
+        try:
+            if '://' not in url:
+                with open(url, encoding='utf-8') as f:
+                    return f.read()
+            # A past day's listing no longer changes; today's and later ones expire with the cache TTL
+            return fetch_text(self.session, url, self.cache, final=day < date.today())[0]
+        except (requests.RequestException, OSError) as e:
+            self.errors.append((url, str(e)))
+            print(f"Error fetching listing {url}: {e}")
+            return None
+
+    def crawl(self, start, end):
+        """DiscoveredGame for every game listed between start and end, in date order"""
+        days = date_range(start, end)
+        games = {}
+        with ThreadPoolExecutor(self.workers) as pool:
+            for day, html_content in zip(days, pool.map(self.fetch_listing, days)):
+                if html_content is None:
+                    continue
+                for game_id, status in parse_listing(html_content):
+                    known = games.get(game_id)
+                    if known is None or (known.status == 'unknown' and status != 'unknown'):
+                        url = self.base_url.rstrip('/') + '/' + game_id
+                        games[game_id] = DiscoveredGame(game_id, url, day.isoformat(), status)
+        self.found = list(games.values())
+        return self.found
+
+    def discover(self, start, end, statuses=('final',), skip_ids=()):
+        """
+        Games to scrape: crawled games with one of the given statuses that are not in skip_ids
+
+        statuses=None keeps every status.
+        """
+        skip_ids = set(skip_ids)
+        return [game for game in self.crawl(start, end)
+                if (statuses is None or game.status in statuses) and game.game_id not in skip_ids]
@@ -0,0 +1,222 @@
+"""
+Embedded game data extractor
+Decodes game data a page embeds as JSON (hydration state in a <script>, or a JSON/XHR response body)
+and maps it straight into the tables the HTML parsers produce, without building a DOM
+
+The game object may sit anywhere in the decoded payload; it is the first dict
+carrying a box score:
+
+    {
+      "date": "2025-11-21 08:30",
+      "teams": [{"name": "湖人", "score": 110, "lineScore": [28, 30, 25, 27]},   # Home team first
+                {"name": "塞爾蒂克", "score": 104, "lineScore": [26, 24, 30, 24]}],
+      "periods": ["1", "2", "3", "4"],                          # Optional, OT1.. after the fourth
+      "boxScore": [{"columns": ["先發", "位置", "時間", ...],    # One entry per team
+                    "players": [["Player 1", "G", "34:12", ...], ...]}],  # Lists, or dicts keyed by column
+      "teamStats": [{"statistic": "籃板", "home": 44, "away": 39}],
+      "seasonStats": [{"statistic": "得分", "home": [115.2, 6], "away": [111.9, 14]}]
+    }
+
+camelCase and snake_case keys are both accepted. Pages without such a payload
+return None and go through the HTML parsers.
+"""
+
+import json
+import re
+from collections import namedtuple
+
+from .extract import PageModel
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# Script bodies holding page state: Next.js/Nuxt data blocks, JSON script tags and window.__*STATE__ assignments
+_SCRIPT_JSON = re.compile(
+    r'<script\b[^>]*?(?:id=["\']__NEXT_DATA__["\']|type=["\']application/json["\'])[^>]*>(.*?)</script>',
+    re.S | re.I)
+_STATE_ASSIGNMENT = re.compile(
+    r'window\.__(?:INITIAL_STATE|PRELOADED_STATE|NUXT|APOLLO_STATE|GAME_DATA)__\s*=\s*(\{.*?\})\s*;?\s*</script>',
+    re.S)
+# Substrings of everything the two patterns above can match, for a cheap check on raw response bytes
+_PAYLOAD_MARKERS = (b'__next_data__', b'application/json', b'window.__')
+
+# Keys under which the game object keeps its box score; finding one marks the game object
+BOX_SCORE_KEYS = ('boxScore', 'box_score', 'boxscore')
+
+# Quarter score table header cells around the period labels, as on the rendered page
+QUARTER_HEADER = ('', '球隊')
+QUARTER_TOTAL = '總分'
+
+# Decoded game: game_data fields, (headers, rows) tables in page order, team_stats rows
+EmbeddedGame = namedtuple('EmbeddedGame', ['info', 'tables', 'team_stats'])
+
+
+def loads(text):
+    """Decode JSON with orjson when it is installed, the standard library otherwise"""
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+def _get(mapping, *keys, default=None):
+    """Value of the first key present (for camelCase / snake_case variants)"""
+    for key in keys:
+        if key in mapping:
+            return mapping[key]
+    return default
+
+
+def _cell(value):
+    """Cell text as the HTML parsers would read it"""
+    if value is None:
+        return ''
+    return str(value).strip()
+
+
+def may_embed(data):
+    """False when raw page bytes cannot hold a payload, so they need not be decoded for the JSON check"""
+    if data.lstrip()[:1] in (b'{', b'['):
+        return True
+    lowered = data.lower()
+    return any(marker in lowered for marker in _PAYLOAD_MARKERS)
+
+
+def payloads(text):
+    """Decoded JSON candidates in text: the whole body if it is JSON, else each embedded state block"""
+    stripped = text.lstrip()
+    if stripped[:1] in ('{', '['):
+        try:
+            yield loads(stripped)
+        except ValueError:
+            pass
+        return
+
+    for pattern in (_SCRIPT_JSON, _STATE_ASSIGNMENT):
+        for match in pattern.finditer(text):
+            try:
+                yield loads(match.group(1))
+            except ValueError:
+                continue
+
+
+def find_game(payload):
+    """First dict in payload (depth first) that has a box score, or None"""
+    stack = [payload]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            if any(key in node for key in BOX_SCORE_KEYS):
+                return node
+            stack.extend(reversed(list(node.values())))
+        elif isinstance(node, list):
+            stack.extend(reversed(node))
+    return None
+
+
+def period_labels(count, labels=None):
+    """Quarter score column labels: 1-4, then OT1, OT2, ..."""
+    if labels:
+        return [_cell(label) for label in labels]
+    return [str(i + 1) if i < 4 else f"OT{i - 3}" for i in range(count)]
+
+
+def _team_name(team):
+    return _cell(_get(team, 'name', 'teamName', 'team_name'))
+
+
+def quarter_table(teams, labels=None):
+    """Quarter score table: header row, then logo cell, team, period scores and total per team"""
+    scores = [[_cell(score) for score in _get(team, 'lineScore', 'line_score', 'periods', default=[])]
+              for team in teams]
+    header = list(QUARTER_HEADER) + period_labels(max(map(len, scores)), labels) + [QUARTER_TOTAL]
+    rows = [header]
+    for team, team_scores in zip(teams, scores):
+        total = _get(team, 'score', 'points')
+        if total is None:
+            total = sum(int(score) for score in team_scores if score.isdigit())
+        rows.append(['', _team_name(team)] + team_scores + [_cell(total)])
+    return header, rows
+
+
+def box_score_table(entry):
+    columns = [_cell(column) for column in _get(entry, 'columns', 'headers', default=[])]
+    rows = [columns]
+    for player in _get(entry, 'players', 'rows', default=[]):
+        if isinstance(player, dict):
+            # Up to the last column the player has, like a row whose trailing cells are missing
+            width = max((i + 1 for i, column in enumerate(columns) if column in player), default=0)
+            player = [player.get(column, '') for column in columns[:width]]
+        rows.append([_cell(value) for value in player])
+    return columns, rows
+
+
+def season_table(entry, teams):
+    """Three-row season table: statistic name, then team, value, league rank per team"""
+    rows = [[_cell(_get(entry, 'statistic', 'name', 'label'))]]
+    for team, side in zip(teams, ('home', 'away')):
+        value = _get(entry, side, default=[])
+        value = value if isinstance(value, list) else [value]
+        rows.append([_team_name(team)] + [_cell(item) for item in value])
+    return [rows[0][0]], rows
+
+
+def game_from_json(game):
+    """EmbeddedGame from a decoded game object"""
+    teams = _get(game, 'teams', default=[])[:2]
+    info = {}
+    if _get(game, 'date', 'gameDate', 'game_date') is not None:
+        info['date'] = _cell(_get(game, 'date', 'gameDate', 'game_date'))
+    for team, side in zip(teams, ('home', 'away')):
+        info[f'{side}_team'] = _team_name(team)
+    for team, side in zip(teams, ('home', 'away')):
+        if _get(team, 'score', 'points') is not None:
+            info[f'{side}_score'] = _cell(_get(team, 'score', 'points'))
+
+    tables = []
+    if teams and any(_get(team, 'lineScore', 'line_score', 'periods') for team in teams):
+        tables.append(quarter_table(teams, _get(game, 'periods', 'periodLabels', 'period_labels')))
+    for entry in _get(game, *BOX_SCORE_KEYS, default=[]):
+        tables.append(box_score_table(entry))
+    for entry in _get(game, 'seasonStats', 'season_stats', default=[]):
+        tables.append(season_table(entry, teams))
+
+    team_stats = [{'statistic': _cell(_get(entry, 'statistic', 'name', 'label')),
+                   'home_team': _cell(entry.get('home')),
+                   'away_team': _cell(entry.get('away'))}
+                  for entry in _get(game, 'teamStats', 'team_stats', default=[])]
+    return EmbeddedGame(info, tables, team_stats)
+
+
+def extract_embedded_game(text):
+    """EmbeddedGame decoded from the JSON a page embeds (or a JSON body), or None when there is none"""
+    for payload in payloads(text):
+        game = find_game(payload)
+        if game is not None:
+            try:
+                return game_from_json(game)
+            except (AttributeError, TypeError, ValueError):
+                return None  # Not the shape we know; the HTML parsers take over
+    return None
+
+
+def embedded_status(text):
+    """Status field (e.g. 終場) of the game object in a page's embedded JSON, or None"""
+    for payload in payloads(text):
+        game = find_game(payload)
+        if game is not None:
+            status = _cell(_get(game, 'status', 'gameStatus', 'game_status'))
+            return status or None
+    return None
+
+
+def page_model(game):
+    """PageModel over an EmbeddedGame's tables, for the table-reading parse_* methods"""
+    page = PageModel()
+    for headers, rows in game.tables:
+        table = page.add_table(None)
+        table.headers = headers
+        table.rows = rows
+    return page
@@ -0,0 +1,140 @@
+"""
+Single-pass page extraction
+Walks a parsed document once and builds the page model shared by the parse_* methods
+"""
+
+from collections import defaultdict
+
+
+# Elements indexed by class so the parsers can look them up without re-walking the tree
+INDEXED_TAGS = ('div', 'span', 'table')
+
+
+def _soup_text(element):
+    return element.text
+
+
+class TableModel:
+    """Rows, cell texts and header texts of a single <table>"""
+
+    __slots__ = ('index', 'element', 'rows', 'headers', 'role')
+
+    def __init__(self, index, element):
+        self.index = index
+        self.element = element
+        self.rows = []      # One list of stripped cell texts per <tr>, including empty rows
+        self.headers = []   # Stripped text of every <th> in the table
+        self.role = None    # Layout role once classified (see src.layout), None for empty tables
+
+    def data(self):
+        """Non-empty rows, in the same shape parse_all_data stores them"""
+        return [row for row in self.rows if row]
+
+
+class PageModel:
+    """Intermediate model of a game page: tables, rows, cells and classified elements"""
+
+    def __init__(self, text_of=None):
+        self.text_of = text_of or _soup_text
+        self.tables = []
+        self.classified = []  # (tag name, class list, element) in document order
+        self._by_class = defaultdict(list)
+        self._tables_by_element = {}
+        self._text_cache = {}
+
+    def find_all(self, name, class_):
+        """Elements with the given tag name carrying the given class, in document order"""
+        return self._by_class.get((name, class_), [])
+
+    def find(self, name, class_):
+        """First element with the given tag name carrying the given class, or None"""
+        elements = self.find_all(name, class_)
+        return elements[0] if elements else None
+
+    def find_first(self, *candidates):
+        """First match of the first (tag name, class) candidate that has one, or None"""
+        for name, class_ in candidates:
+            element = self.find(name, class_)
+            if element is not None:
+                return element
+        return None
+
+    def find_matching(self, name, pattern):
+        """Elements with the given tag name whose class matches a compiled regex"""
+        return [element for tag, classes, element in self.classified
+                if tag == name and pattern.search(' '.join(classes))]
+
+    def table_for(self, element):
+        """TableModel built for a <table> element, or None for other elements"""
+        return self._tables_by_element.get(id(element))
+
+    def rows_of(self, element):
+        """Cell texts of every row below an element, reusing the table model when possible"""
+        table = self.table_for(element)
+        if table is not None:
+            return table.rows
+        return [[self.text(col) for col in row.find_all(['td', 'th'])]
+                for row in element.find_all('tr')]
+
+    def text(self, element):
+        """Stripped text of an element, computed once per element"""
+        key = id(element)
+        text = self._text_cache.get(key)
+        if text is None:
+            text = self.text_of(element).strip()
+            self._text_cache[key] = text
+        return text
+
+    def add_table(self, element):
+        table = TableModel(len(self.tables), element)
+        self.tables.append(table)
+        if element is not None:
+            self._tables_by_element[id(element)] = table
+        return table
+
+    def add_classified(self, name, classes, element):
+        self.classified.append((name, classes, element))
+        for class_name in classes:
+            self._by_class[(name, class_name)].append(element)
+
+
+def build_page_model(soup):
+    """
+    Walk a BeautifulSoup document once and build its PageModel
+
+    Rows belong to every enclosing table and cells to every enclosing row,
+    matching what find_all('tr') / find_all(['td', 'th']) returns per table.
+    """
+    page = PageModel()
+    # Each stack entry: (element, open tables, open rows) for the subtree below it
+    stack = [(soup, (), ())]
+
+    while stack:
+        element, tables, rows = stack.pop()
+        name = element.name
+
+        if name == 'table':
+            tables = tables + (page.add_table(element),)
+        elif name == 'tr':
+            row = []
+            for table in tables:
+                table.rows.append(row)
+            rows = rows + (row,)
+        elif name in ('td', 'th'):
+            text = page.text(element)
+            for row in rows:
+                row.append(text)
+            if name == 'th':
+                for table in tables:
+                    table.headers.append(text)
+
+        if name in INDEXED_TAGS:
+            classes = element.get('class')
+            if classes:
+                page.add_classified(name, classes, element)
+
+        children = [child for child in element.contents if child.name is not None]
+        for child in reversed(children):
+            stack.append((child, tables, rows))
+
+    return page
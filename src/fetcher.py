@@ -0,0 +1,315 @@
+"""
+Resilient fetch layer
+Wraps a requests.Session with retries, jittered exponential backoff, a shared token-bucket rate limit,
+per-host connection pools and a circuit breaker, and records fetch metrics
+"""
+
+import bisect
+import random
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+
+
+# Browser headers sent with every request to tw-nba.udn.com
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'zh-TW,zh;q=0.9,en;q=0.8',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1'
+}
+
+# Responses worth retrying: rate limited or a transient server/gateway error
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Upper bounds (seconds) of the latency histogram buckets; the last bucket is open-ended
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def create_session(pool_size=None):
+    """
+    Create a requests.Session with the default headers, optionally sized for concurrent use
+
+    pool_size is the number of connections kept per host; workers beyond it
+    wait for a free connection instead of opening (and dropping) extra ones.
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    session.headers.update(DEFAULT_HEADERS)
+    if pool_size:
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, pool_block=True)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+    return session
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` requests per second on average, bursts of up to `burst`"""
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.capacity = burst or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take one token, sleeping until one is available; returns the seconds spent waiting"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class CircuitBreaker:
+    """
+    Pauses all requests when the recent error rate spikes
+
+    Over the last `window` requests, once at least `min_requests` were made and
+    the failure share reaches `threshold`, the breaker opens: requests wait
+    `cooldown` seconds, then the next one is let through as a probe while the
+    others keep waiting. A successful probe closes the breaker, a failed one
+    opens it again.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half-open'
+
+    def __init__(self, window=20, threshold=0.5, min_requests=5, cooldown=30.0):
+        self.window = deque(maxlen=window)
+        self.threshold = threshold
+        self.min_requests = min_requests
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self.opened_at = 0.0
+        self.opens = 0
+        self.probe = None  # Thread sending the one half-open probe request
+        self._changed = threading.Condition()
+
+    def wait(self):
+        """Block while the breaker is open or another request is probing; returns the seconds spent waiting"""
+        start = waited_until = time.monotonic()
+        with self._changed:
+            while True:
+                if self.state == self.CLOSED:
+                    break
+                if self.state == self.OPEN:
+                    remaining = self.opened_at + self.cooldown - time.monotonic()
+                    if remaining > 0:
+                        self._changed.wait(remaining)
+                        waited_until = time.monotonic()
+                        continue
+                    self.state = self.HALF_OPEN
+                if self.probe is None:
+                    self.probe = threading.get_ident()  # This request is the probe
+                    break
+                self._changed.wait()  # Until record() closes or re-opens the breaker
+                waited_until = time.monotonic()
+        return waited_until - start
+
+    def record(self, success):
+        with self._changed:
+            if self.state == self.HALF_OPEN and self.probe == threading.get_ident():
+                self.probe = None
+                if success:
+                    self.state = self.CLOSED
+                    self.window.clear()
+                else:
+                    self._open()
+                self._changed.notify_all()
+                return
+            self.window.append(success)
+            failures = self.window.count(False)
+            if (self.state == self.CLOSED and len(self.window) >= self.min_requests and
+                    failures / len(self.window) >= self.threshold):
+                self._open()
+
+    def abandon(self):
+        """Give up the probe without a result (the request failed before reaching the host)"""
+        with self._changed:
+            if self.probe == threading.get_ident():
+                self.probe = None
+                self._changed.notify_all()
+
+    def _open(self):
+        self.state = self.OPEN
+        self.opened_at = time.monotonic()
+        self.opens += 1
+        self.window.clear()
+
+
+class FetchMetrics:
+    """Thread-safe counters and a latency histogram for every attempt"""
+
+    def __init__(self):
+        self.attempts = 0
+        self.successes = 0
+        self.failures = 0       # Requests that still failed after all retries
+        self.retries = 0
+        self.errors = {}        # Exception class or HTTP status -> count, per failed attempt
+        self.throttled_seconds = 0.0
+        self.backoff_seconds = 0.0
+        self.breaker_seconds = 0.0
+        self.latency_counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.latency_total = 0.0
+        self._lock = threading.Lock()
+
+    def attempt(self, latency, error=None):
+        with self._lock:
+            self.attempts += 1
+            self.latency_total += latency
+            self.latency_counts[bisect.bisect_left(LATENCY_BUCKETS, latency)] += 1
+            if error is not None:
+                self.errors[error] = self.errors.get(error, 0) + 1
+
+    def add(self, name, value):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + value)
+
+    def percentile(self, fraction):
+        """Upper bound of the histogram bucket holding the given latency percentile"""
+        target = fraction * self.attempts
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS + (float('inf'),), self.latency_counts):
+            seen += count
+            if count and seen >= target:
+                return bound
+        return 0.0
+
+    def snapshot(self):
+        with self._lock:
+            histogram = {f"<={bound}s": count for bound, count in zip(LATENCY_BUCKETS, self.latency_counts)}
+            histogram[f">{LATENCY_BUCKETS[-1]}s"] = self.latency_counts[-1]
+            return {
+                'attempts': self.attempts,
+                'successes': self.successes,
+                'failures': self.failures,
+                'retries': self.retries,
+                'errors': {str(key): value for key, value in self.errors.items()},
+                'throttled_seconds': self.throttled_seconds,
+                'backoff_seconds': self.backoff_seconds,
+                'breaker_seconds': self.breaker_seconds,
+                'mean_latency': self.latency_total / self.attempts if self.attempts else 0.0,
+                'p50_latency': self.percentile(0.5),
+                'p95_latency': self.percentile(0.95),
+                'latency_histogram': histogram,
+            }
+
+
+class ResilientFetcher:
+    """
+    Drop-in replacement for a requests.Session's get() with retries and throttling
+
+    Share one fetcher between all workers so they share its rate limit,
+    circuit breaker, connection pools and metrics. Retryable statuses are
+    retried; once retries run out the last response is returned, so callers'
+    raise_for_status() still reports it. Network errors are raised.
+    """
+
+    def __init__(self, session=None, retries=3, backoff=0.5, max_backoff=30.0, rate=None, burst=None,
+                 pool_size=None, breaker=None, timeout=30):
+        self.session = session or create_session(pool_size)
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.bucket = TokenBucket(rate, burst) if rate else None
+        self.breaker = breaker if breaker is not None else CircuitBreaker()
+        self.timeout = timeout
+        self.metrics = FetchMetrics()
+
+    @property
+    def headers(self):
+        return self.session.headers
+
+    def backoff_delay(self, attempt, retry_after=None):
+        """Full-jitter exponential backoff, or the server's Retry-After when it asks for longer"""
+        delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+        if retry_after is not None:
+            delay = max(delay, min(self.max_backoff, retry_after))
+        return delay
+
+    def get(self, url, timeout=None, **kwargs):
+        import requests
+        timeout = timeout or self.timeout
+        for attempt in range(self.retries + 1):
+            self.metrics.add('breaker_seconds', self.breaker.wait())
+            if self.bucket is not None:
+                self.metrics.add('throttled_seconds', self.bucket.acquire())
+
+            start = time.perf_counter()
+            try:
+                response = self.session.get(url, timeout=timeout, **kwargs)
+            # Connection dropped or reset before or while the body was read
+            except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError,
+                    requests.exceptions.ContentDecodingError) as e:
+                self.metrics.attempt(time.perf_counter() - start, type(e).__name__)
+                self.breaker.record(False)
+                if attempt == self.retries:
+                    self.metrics.add('failures', 1)
+                    raise
+                retry_after = None
+            except Exception:
+                self.breaker.abandon()  # Says nothing about the host; let another request probe
+                raise
+            else:
+                retryable = response.status_code in RETRY_STATUSES
+                self.metrics.attempt(time.perf_counter() - start, response.status_code if retryable else None)
+                self.breaker.record(not retryable)
+                if not retryable:
+                    self.metrics.add('successes', 1)
+                    return response
+                if attempt == self.retries:
+                    self.metrics.add('failures', 1)
+                    return response
+                retry_after = _retry_after(response)
+                response.close()
+
+            delay = self.backoff_delay(attempt, retry_after)
+            self.metrics.add('retries', 1)
+            self.metrics.add('backoff_seconds', delay)
+            time.sleep(delay)
+
+    def stats(self):
+        """Metrics snapshot plus the circuit breaker's state"""
+        stats = self.metrics.snapshot()
+        stats['breaker_state'] = self.breaker.state
+        stats['breaker_opens'] = self.breaker.opens
+        return stats
+
+    def summary_line(self):
+        stats = self.stats()
+        return (f"Fetch: {stats['attempts']} attempts, {stats['retries']} retries, "
+                f"{stats['failures']} failed, p50 <= {stats['p50_latency']}s, p95 <= {stats['p95_latency']}s, "
+                f"throttled {stats['throttled_seconds']:.1f}s, breaker opened {stats['breaker_opens']}x")
+
+
+def _retry_after(response):
+    """Seconds from a Retry-After header (delta seconds or an HTTP date), or None"""
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def create_fetcher(pool_size=None, **options):
+    """ResilientFetcher over a new default session; options as for ResilientFetcher"""
+    return ResilientFetcher(create_session(pool_size), **options)
@@ -0,0 +1,169 @@
+"""
+Table layout classifier
+Fingerprints each table by its header row and shape and maps the fingerprint to a role
+(quarter scores, box score, season stat), deciding each layout once and recording unknown ones for review
+"""
+
+import hashlib
+import json
+import os
+import time
+
+from .boxscore import column_for_header
+from .consolidate import is_season_table
+
+
+# Table roles
+QUARTER_SCORES = 'quarter_scores'
+BOX_SCORE = 'box_score'        # One per team, home first
+SEASON_STAT = 'season_stat'    # Stat name row, then [team, value, rank] per team
+UNKNOWN = 'unknown'
+
+# Period labels every quarter score header carries (overtime adds OT1, OT2, ...)
+PERIOD_LABELS = ('1', '2', '3', '4')
+
+# Canonical box-score columns (see src.boxscore) a header row needs: the player and minutes or points
+PLAYER_COLUMN = 'player'
+BOX_SCORE_COLUMNS = ('seconds', 'pts')
+
+# Rows whose widths are part of the fingerprint; longer tables only record that they are longer
+SHAPE_ROWS = 3
+
+# Review file written with --record-layouts; recording is off unless a path is set
+DEFAULT_REVIEW_PATH = 'unknown_layouts.jsonl'
+# Carries the review path to parse worker processes, however they are started
+REVIEW_PATH_ENV = 'NBA_LAYOUT_REVIEW'
+
+
+def fingerprint(data):
+    """
+    Layout key of a table's non-empty rows: its header cells, the widths of its first rows and whether it is longer
+
+    Single-cell header rows are titles (a season table's stat name), so only
+    their width counts. Box scores of any length share one fingerprint.
+    """
+    header = data[0]
+    return (tuple(header) if len(header) > 1 else len(header),
+            tuple(len(row) for row in data[:SHAPE_ROWS]),
+            len(data) if len(data) <= SHAPE_ROWS else None)
+
+
+def fingerprint_id(key):
+    """Short stable id of a fingerprint, for the review file and messages"""
+    return hashlib.blake2b(json.dumps(key, ensure_ascii=False).encode('utf-8'), digest_size=6).hexdigest()
+
+
+def is_quarter_table(data):
+    """Quarter score tables have a header with the four period labels and a row per team"""
+    return len(data) >= 3 and all(label in data[0] for label in PERIOD_LABELS)
+
+
+def is_box_score(data):
+    """Box scores have a header naming the player column and minutes or points (Chinese or English)"""
+    columns = {column_for_header(cell)[0] for cell in data[0] if cell}
+    return PLAYER_COLUMN in columns and any(column in columns for column in BOX_SCORE_COLUMNS)
+
+
+# Checked in order; the first match decides the role
+RULES = (
+    (SEASON_STAT, is_season_table),
+    (QUARTER_SCORES, is_quarter_table),
+    (BOX_SCORE, is_box_score),
+)
+
+
+class TableClassifier:
+    """
+    Role of each table, memoized by fingerprint
+
+    The rules run only for the first table of each layout; later tables with
+    the same fingerprint are one dict lookup. Tables no rule matches are
+    UNKNOWN: each new unknown fingerprint is printed and, when review_path
+    is set, appended to it (JSON lines) with a sample of the table.
+    """
+
+    def __init__(self, rules=RULES, review_path=None):
+        self.rules = rules
+        self.review_path = review_path
+        self.roles = {}  # fingerprint -> role
+        self.unknown = {}  # fingerprint id -> review record
+        self.lookups = 0
+
+    def classify(self, data, source=None):
+        """Role of a table given its non-empty rows; source (the page URL) goes into review records"""
+        self.lookups += 1
+        key = fingerprint(data)
+        role = self.roles.get(key)
+        if role is None:
+            role = next((name for name, rule in self.rules if rule(data)), UNKNOWN)
+            self.roles[key] = role
+            if role == UNKNOWN:
+                self.record_unknown(key, data, source)
+        return role
+
+    def classify_tables(self, tables, source=None):
+        """Roles of a list of row grids, None for empty ones"""
+        return [self.classify(data, source) if data else None for data in tables]
+
+    def record_unknown(self, key, data, source=None):
+        record = {
+            'fingerprint': fingerprint_id(key),
+            'header': data[0],
+            'shape': [len(row) for row in data[:SHAPE_ROWS]],
+            'rows': len(data),
+            'sample': data[:SHAPE_ROWS],
+            'source': source,
+            'seen_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        }
+        self.unknown[record['fingerprint']] = record
+        print(f"Unknown table layout {record['fingerprint']} (header {data[0][:4]}, shape {record['shape']})")
+        if self.review_path:
+            try:
+                directory = os.path.dirname(self.review_path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                # One short line per append, so worker processes can share the file
+                with open(self.review_path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(record, ensure_ascii=False) + '\n')
+            except OSError as e:
+                print(f"Could not record unknown layout: {e}")
+
+    def stats(self):
+        """Lookups, distinct layouts classified and unknown layouts seen by this process"""
+        return {'lookups': self.lookups, 'layouts': len(self.roles), 'unknown': len(self.unknown)}
+
+
+def read_review(path=DEFAULT_REVIEW_PATH):
+    """Unknown layouts recorded in a review file, one entry per fingerprint with how often it was recorded"""
+    layouts = {}
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            entry = layouts.setdefault(record['fingerprint'], dict(record, count=0))
+            entry['count'] += 1
+    return list(layouts.values())
+
+
+def record_layouts(path=DEFAULT_REVIEW_PATH):
+    """Append unknown layouts to path from now on, in this process and the worker processes it starts"""
+    CLASSIFIER.review_path = path
+    os.environ[REVIEW_PATH_ENV] = path
+
+
+# Shared by every scraper in the process, so each layout is classified once per process
+CLASSIFIER = TableClassifier(review_path=os.environ.get(REVIEW_PATH_ENV) or None)
+
+
+def classify_page(page, source=None, classifier=None):
+    """Set the role of every non-empty table of a PageModel that has none yet; returns the page"""
+    classifier = classifier or CLASSIFIER
+    for table in page.tables:
+        if table.role is None:
+            data = table.data()
+            if data:
+                table.role = classifier.classify(data, source)
+    return page
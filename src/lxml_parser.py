@@ -0,0 +1,147 @@
+"""
+lxml fast-path parser
+Builds the page model straight from lxml with compiled XPath, skipping BeautifulSoup,
+for pages matching the known tw-nba.udn.com game layout
+"""
+
+import functools
+
+from .embedded import embedded_status
+from .extract import INDEXED_TAGS, PageModel
+from .layout import BOX_SCORE, QUARTER_SCORES, classify_page
+
+
+# XPath expressions, compiled by xpath() on first use so importing this module doesn't load lxml
+_TABLES = '//table'
+_ROWS = './/tr'
+_CELLS = './/td | .//th'
+_HEADERS = './/th'
+_CLASSIFIED = ' | '.join(f'//{name}[@class]' for name in INDEXED_TAGS)
+_TEXT = 'string()'
+_BLANK_TEXT = "//text()[normalize-space()='']"
+
+# Sections only the BeautifulSoup parsers know how to read; their presence means fallback
+_SOUP_ONLY_SECTIONS = (
+    "//div[contains(concat(' ', normalize-space(@class), ' '), ' team-stats ')]"
+    " | //table[contains(concat(' ', normalize-space(@class), ' '), ' team-comparison ')]"
+    " | //div[contains(concat(' ', normalize-space(@class), ' '), ' quarter-breakdown ')]"
+    " | //template"
+)
+
+# Status element of the page's own game, inside its game header (not tickers or other games' cards)
+_GAME_STATUS = (
+    "(//div[contains(concat(' ', normalize-space(@class), ' '), ' game-header ')]"
+    "//*[self::span or self::div][contains(concat(' ', normalize-space(@class), ' '), ' status ')])[1]")
+
+# BeautifulSoup collapses whitespace-only strings outside these tags to a space or newline
+ASCII_SPACES = str.maketrans('', '', '\x20\x0a\x09\x0c\x0d')
+PRESERVE_WHITESPACE_TAGS = ('pre', 'textarea')
+
+
+@functools.lru_cache(maxsize=None)
+def xpath(expression, smart_strings=True):
+    """Compiled XPath for expression, compiled once per process"""
+    from lxml import etree
+    return etree.XPath(expression, smart_strings=smart_strings)
+
+
+def _element_text(element):
+    return xpath(_TEXT, False)(element)
+
+
+def _collapse_blank_strings(root):
+    """Collapse whitespace-only text nodes the way BeautifulSoup's tree builder does"""
+    for text in xpath(_BLANK_TEXT)(root):
+        if text.translate(ASCII_SPACES):
+            continue
+        owner = text.getparent()
+        context = owner if text.is_text else owner.getparent()
+        if context is not None and (context.tag in PRESERVE_WHITESPACE_TAGS or any(
+                ancestor.tag in PRESERVE_WHITESPACE_TAGS for ancestor in context.iterancestors())):
+            continue
+        collapsed = '\n' if '\n' in text else ' '
+        if text.is_text:
+            owner.text = collapsed
+        else:
+            owner.tail = collapsed
+
+
+def matches_known_layout(page):
+    """Layout signature: quarter score table first, then at least two box-score tables"""
+    roles = [table.role for table in classify_page(page).tables]
+    return bool(roles) and roles[0] == QUARTER_SCORES and roles.count(BOX_SCORE) >= 2
+
+
+def game_status(html_content, root=None):
+    """
+    Status text of the page's own game (終場, 第三節 05:12, ...), or None when it shows none
+
+    Read from the status element of the game header; pages without one
+    (JSON bodies) fall back to the embedded game data's status field.
+    root is the already parsed document, when the caller has it.
+    """
+    if root is None:
+        root = parse_document(html_content)
+    if root is not None:
+        found = xpath(_GAME_STATUS)(root)
+        if found:
+            return xpath(_TEXT, False)(found[0]).strip() or None
+    return embedded_status(html_content)
+
+
+def parse_document(html_content):
+    """
+    Parse html_content with lxml into a root whose text matches BeautifulSoup's
+
+    Blank runs are collapsed and script/style text is dropped. Returns None
+    when the page can't be parsed.
+    """
+    from lxml import etree
+
+    try:
+        # Fed in one call like BeautifulSoup's lxml builder, so both see the same tree
+        parser = etree.HTMLParser(strip_cdata=False, recover=True)
+        parser.feed(html_content)
+        root = parser.close()
+    except (etree.ParserError, ValueError):
+        return None
+    if root is None:
+        return None
+
+    _collapse_blank_strings(root)
+    etree.strip_elements(root, 'script', 'style', with_tail=False)
+    return root
+
+
+def table_rows(element):
+    """Stripped cell texts of every row in a table element"""
+    text, cells = xpath(_TEXT, False), xpath(_CELLS)
+    return [[text(col).strip() for col in cells(row)] for row in xpath(_ROWS)(element)]
+
+
+def build_page_model_lxml(html_content):
+    """
+    Parse html_content with lxml and build its PageModel
+
+    Returns None when the page can't be parsed or doesn't match the known
+    layout, so the caller can fall back to the BeautifulSoup path.
+    """
+    root = parse_document(html_content)
+    if root is None or xpath(_SOUP_ONLY_SECTIONS)(root):
+        return None
+
+    page = PageModel(text_of=_element_text)
+    text, headers = xpath(_TEXT, False), xpath(_HEADERS)
+    for element in xpath(_TABLES)(root):
+        table = page.add_table(element)
+        table.headers = [text(th).strip() for th in headers(element)]
+        table.rows = table_rows(element)
+
+    for element in xpath(_CLASSIFIED)(root):
+        classes = element.get('class').split()
+        if classes:
+            page.add_classified(element.tag, classes, element)
+
+    if not matches_known_layout(page):
+        return None
+    return page
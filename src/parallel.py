@@ -0,0 +1,195 @@
+"""
+Multi-core page parsing
+Parses pages in worker processes and sends each game back as one packed record instead of pickled lists of dicts
+
+A record is a string table plus one stream of integer codes, as bytes:
+
+    header   4 x uint32: format version, string count, code count, code width
+    lengths  uint32 per string (in characters)
+    codes    uint16 (uint32 if any value needs it) stream: counts, and string indexes into the table
+    strings  every distinct string, joined and UTF-8 encoded once
+
+Cell texts repeat a lot within a game (team names, headers, small numbers),
+so each distinct string is sent once and the structure costs 2 bytes per
+cell. Box-score rows point at the stored table they came from instead of
+repeating it. Records are native byte order, for passing between processes
+on one machine rather than for storage.
+"""
+
+import contextlib
+import io
+from array import array
+
+from .scraper import NBAGameScraper
+
+
+RECORD_VERSION = 1
+_HEADER = 4  # uint32 fields before the string lengths
+_CODE_TYPES = {2: 'H', 4: 'I'}
+
+
+class _Packer:
+    def __init__(self):
+        self.strings = {}  # text -> index
+        self.codes = array('I')
+
+    def count(self, value):
+        self.codes.append(value)
+
+    def text(self, value):
+        self.codes.append(self.strings.setdefault(value, len(self.strings)))
+
+    def texts(self, values):
+        self.count(len(values))
+        for value in values:
+            self.text(value)
+
+    def mapping(self, mapping):
+        self.count(len(mapping))
+        for key, value in mapping.items():
+            self.text(key)
+            self.text(value)
+
+    def to_bytes(self):
+        codes = self.codes
+        if not codes or max(codes) < 1 << 16:
+            codes = array('H', codes)
+        header = array('I', [RECORD_VERSION, len(self.strings), len(codes), codes.itemsize])
+        lengths = array('I', map(len, self.strings))
+        return b''.join((header.tobytes(), lengths.tobytes(), codes.tobytes(),
+                         ''.join(self.strings).encode('utf-8')))
+
+
+class _Reader:
+    def __init__(self, record):
+        header = array('I')
+        header.frombytes(record[:_HEADER * 4])
+        version, string_count, code_count, code_size = header
+        if version != RECORD_VERSION:
+            raise ValueError(f"Unsupported game record version {version}")
+
+        lengths = array('I')
+        start = _HEADER * 4
+        lengths.frombytes(record[start:start + string_count * 4])
+        self.codes = array(_CODE_TYPES[code_size])
+        start += string_count * 4
+        self.codes.frombytes(record[start:start + code_count * code_size])
+        blob = record[start + code_count * code_size:].decode('utf-8')
+
+        self.strings = []
+        offset = 0
+        for length in lengths:
+            self.strings.append(blob[offset:offset + length])
+            offset += length
+        self.position = 0
+
+    def count(self):
+        value = self.codes[self.position]
+        self.position += 1
+        return value
+
+    def text(self):
+        return self.strings[self.count()]
+
+    def texts(self):
+        return [self.text() for _ in range(self.count())]
+
+    def mapping(self):
+        return {self.text(): self.text() for _ in range(self.count())}
+
+
+class _RecordingScraper(NBAGameScraper):
+    """Scraper that keeps the box-score rows it reads, so the consumer can rebuild players and box score"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.box_tables = []
+
+    def add_box_score(self, headers, rows):
+        rows = [cols for cols in rows if cols]
+        self.box_tables.append((headers, rows))
+        super().add_box_score(headers, rows)
+
+
+def pack_game(scraper):
+    """Packed record of a parsed game (see the module docstring)"""
+    packer = _Packer()
+    packer.text(scraper.url)
+    packer.text(scraper.source or '')
+    packer.mapping(scraper.game_data)
+    packer.count(len(scraper.team_stats))
+    for stat in scraper.team_stats:
+        packer.mapping(stat)
+    packer.texts(scraper.team_names)
+    packer.texts(scraper.team_names_chinese)
+
+    all_data = getattr(scraper, 'all_data', {})
+    tables = all_data.get('tables', [])
+
+    # Box-score rows are normally a stored table minus its header row: 1 + that table's position
+    packer.count(len(scraper.box_tables))
+    for headers, rows in scraper.box_tables:
+        packer.texts(headers)
+        source = next((position for position, table_info in enumerate(tables)
+                       if table_info['data'][1:] == rows), None)
+        if source is not None:
+            packer.count(source + 1)
+            continue
+        packer.count(0)
+        packer.count(len(rows))
+        for cols in rows:
+            packer.texts(cols)
+
+    packer.count(len(tables))
+    for table_info in tables:
+        packer.count(table_info['table_index'])
+        packer.text(table_info.get('role') or '')
+        packer.count(len(table_info['data']))
+        for row in table_info['data']:
+            packer.texts(row)
+    packer.texts(all_data.get('divs_with_data', []))
+    packer.texts(all_data.get('lists', []))
+    return packer.to_bytes()
+
+
+def unpack_game(record, parser='bs4'):
+    """NBAGameScraper holding the parsed game of a packed record, ready for build_sheets() and the writers"""
+    reader = _Reader(record)
+    scraper = NBAGameScraper(reader.text(), parser=parser)
+    scraper.source = reader.text() or None
+    scraper.game_data = reader.mapping()
+    scraper.team_stats = [reader.mapping() for _ in range(reader.count())]
+    scraper.team_names = reader.texts()
+    scraper.team_names_chinese = reader.texts()
+
+    box_tables = []
+    for _ in range(reader.count()):
+        headers = reader.texts()
+        source = reader.count()
+        box_tables.append((headers, source - 1 if source else [reader.texts() for _ in range(reader.count())]))
+
+    tables = []
+    for _ in range(reader.count()):
+        index = reader.count()
+        role = reader.text() or None
+        tables.append({'table_index': index, 'data': [reader.texts() for _ in range(reader.count())],
+                       'role': role})
+    scraper.all_data = {'tables': tables, 'divs_with_data': reader.texts(), 'lists': reader.texts()}
+
+    # Players and the typed box score come from replaying the box-score rows
+    for headers, rows in box_tables:
+        scraper.add_box_score(headers, tables[rows]['data'][1:] if isinstance(rows, int) else rows)
+    return scraper
+
+
+def parse_html(html, url='', parser='bs4'):
+    """
+    Parse one page (raw bytes or text) into a packed game record
+
+    Module-level and free of shared state, so it can be sent to a
+    ProcessPoolExecutor; the scraper's progress messages are discarded.
+    """
+    scraper = _RecordingScraper(url, parser=parser)
+    with contextlib.redirect_stdout(io.StringIO()):
+        scraper.parse(html)
+    return pack_game(scraper)
@@ -0,0 +1,171 @@
+"""
+Streaming scrape pipeline
+Generator stages fetch -> parse -> normalize -> sink with bounded buffers, so memory stays flat over a season
+"""
+
+import contextlib
+import io
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from .fetcher import create_fetcher
+from .parallel import parse_html, unpack_game
+from .scraper import NBAGameScraper, fetch_text
+from .writers import ExcelOutput
+
+
+def load_page(source, session, cache=None):
+    """
+    (page, error) for a URL, or for a saved page when source has no scheme
+
+    page is the raw bytes (text when served from the response cache) and
+    error None, or page is None and error the fetcher's message.
+    """
+    import requests
+    try:
+        if '://' not in source:
+            with open(source, 'rb') as f:
+                return f.read(), None
+        return fetch_text(session, source, cache, raw=True)[0], None
+    except (requests.RequestException, OSError) as e:
+        return None, str(e)
+
+
+def fetch_stage(urls, session=None, cache=None, workers=4, buffer=8):
+    """
+    (url, html, error) for each URL or saved page, loaded by a thread pool in input order
+
+    At most `buffer` pages are loaded ahead of the consumer; when downstream
+    stages are slow no new requests are started until it catches up.
+    Failed fetches yield (url, None, error message).
+    """
+    session = session or create_fetcher(pool_size=workers)
+
+    def fetch(url):
+        return load_page(url, session, cache)
+
+    urls = iter(urls)
+    with ThreadPoolExecutor(workers) as pool:
+        pending = deque()
+        for url in urls:
+            pending.append((url, pool.submit(fetch, url)))
+            if len(pending) >= buffer:
+                break
+        while pending:
+            url, future = pending.popleft()
+            html, error = future.result()
+            yield url, html, error
+            html = None  # Don't hold the page while waiting for the consumer
+            next_url = next(urls, None)
+            if next_url is not None:
+                pending.append((next_url, pool.submit(fetch, next_url)))
+
+
+def parse_stage(pages, parser='bs4'):
+    """
+    (scraper, error) per page, parsed; error is None on success
+
+    The raw text and parse tree are dropped before the game is yielded.
+    """
+    for source, html, error in pages:
+        scraper = NBAGameScraper(source, parser=parser)
+        if not html:
+            error = f"Fetch failed: {error or 'empty page'}"
+        else:
+            try:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    scraper.parse(html)
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+        html = None
+        yield scraper, error
+
+
+def pool_parse_stage(pages, parser='bs4', workers=2):
+    """
+    parse_stage over a process pool: (scraper, error) per page, in input order
+
+    Pages are parsed by parse_html in `workers` processes and come back as
+    packed records (see src/parallel.py); at most twice as many pages as
+    workers are in flight, so the fetch stage's bound still holds.
+    """
+    with ProcessPoolExecutor(workers) as pool:
+        pending = deque()
+
+        def collect():
+            source, future, error = pending.popleft()
+            if future is None:
+                return NBAGameScraper(source, parser=parser), f"Fetch failed: {error or 'empty page'}"
+            try:
+                return unpack_game(future.result(), parser), None
+            except Exception as e:
+                return NBAGameScraper(source, parser=parser), f"{type(e).__name__}: {e}"
+
+        for source, html, error in pages:
+            pending.append((source, pool.submit(parse_html, html, source, parser) if html else None, error))
+            html = None
+            if len(pending) >= workers * 2:
+                yield collect()
+        while pending:
+            yield collect()
+
+
+def normalize_stage(games):
+    """Build each parsed game's output tables once and release everything else"""
+    for scraper, error in games:
+        if error is None:
+            try:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    scraper.compact()
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+        yield scraper, error
+
+
+def sink_stage(games, writers, include_game_id=True):
+    """Write each game with every writer, yielding a small result dict and letting the game go"""
+    for scraper, error in games:
+        outputs = []
+        if error is None:
+            basename = scraper.output_basename(include_game_id)
+            log = io.StringIO()
+            with contextlib.redirect_stdout(log):
+                outputs = [writer.write(scraper, basename) for writer in writers]
+            if not all(outputs):
+                # Writers report failures by printing; surface the last message
+                lines = log.getvalue().strip().splitlines()
+                error = lines[-1] if lines else 'Export failed'
+        result = {'url': scraper.url, 'game_id': scraper.game_id, 'success': error is None,
+                  'error': error, 'outputs': outputs, 'players': len(scraper.player_stats)}
+        scraper = None
+        yield result
+
+
+class StreamingPipeline:
+    """
+    Scrape games as a chain of generator stages
+
+    Only a bounded number of games exist at once: up to `buffer` pages fetched
+    ahead, plus the one game moving through parse, normalize and sink (or up to
+    twice parse_workers games being parsed in worker processes). Results are
+    small dicts, so the caller can keep all of them.
+    """
+
+    def __init__(self, writers=None, parser='bs4', fetch_workers=4, buffer=8, session=None, cache=None,
+                 parse_workers=1):
+        self.writers = writers if writers is not None else [ExcelOutput()]
+        self.parser = parser
+        self.fetch_workers = fetch_workers
+        self.parse_workers = parse_workers  # Above 1, pages are parsed in a process pool
+        self.buffer = buffer
+        self.session = session
+        self.cache = cache
+
+    def run(self, sources):
+        """Yield one result per game (URL or saved page path) as it is written"""
+        pages = fetch_stage(sources, self.session, self.cache, self.fetch_workers, self.buffer)
+        if self.parse_workers > 1:
+            games = pool_parse_stage(pages, self.parser, self.parse_workers)
+        else:
+            games = parse_stage(pages, self.parser)
+        return sink_stage(normalize_stage(games), self.writers)
@@ -0,0 +1,80 @@
+"""
+Pre-parse page trimming
+Cuts what the parsers never read out of the raw page bytes before decoding and tree construction:
+script and style bodies, comments, and top-level page chrome (header, nav, aside, footer) that holds
+no div, span or table
+
+Removed elements are left behind empty (`<script></script>`, `<!---->`, `<nav></nav>`) so text nodes
+around them stay split exactly as before, and text of every div/span/table the parsers read is
+unchanged: BeautifulSoup and the lxml backend both leave script, style and comment text out of
+element text, and chrome is only dropped outside any div, span or table.
+"""
+
+import re
+
+
+# Blocks whose content is emptied wherever they appear
+_COMMENT = r'<!--.*?-->'
+_RAW_TEXT = r'<(script|style)\b[^>]*>.*?</\1\s*>'
+# RCDATA elements: '<!--' or '<script' inside them is text, so they are skipped over whole
+_RCDATA = r'<(textarea|title)\b[^>]*>.*?</\2\s*>'
+# Opening and closing tags of the elements the page model indexes, for the nesting depth
+_INDEXED = r'<(/?)(div|span|table)\b'
+# Page chrome dropped when it is outside every indexed element and holds none itself
+_CHROME = r'<(header|nav|aside|footer)\b[^>]*>'
+
+_PATTERN = '|'.join((_COMMENT, _RAW_TEXT, _RCDATA, _INDEXED, _CHROME))
+_INDEXED_TAG = r'<(?:div|span|table|header|nav|aside|footer)\b'
+
+# Compiled for bytes (raw responses) and str (cached or already decoded pages)
+_TOKENS = {bytes: re.compile(_PATTERN.encode(), re.S | re.I), str: re.compile(_PATTERN, re.S | re.I)}
+_INNER_INDEXED = {bytes: re.compile(_INDEXED_TAG.encode(), re.I), str: re.compile(_INDEXED_TAG, re.I)}
+_CLOSE = {bytes: lambda tag: re.compile(rb'</' + tag + rb'\s*>', re.I),
+          str: lambda tag: re.compile(r'</' + tag + r'\s*>', re.I)}
+
+
+def trim_page(document):
+    """
+    document (bytes or str) without script/style bodies, comments and empty-of-data chrome
+
+    Returns the same type it is given. Every cut is at an ASCII '<' or '>',
+    so trimmed UTF-8 bytes decode to the trimmed text.
+    """
+    kind = type(document)
+    empty = kind()
+    tokens, inner_indexed, close = _TOKENS[kind], _INNER_INDEXED[kind], _CLOSE[kind]
+    as_kind = (lambda text: text.encode('ascii')) if kind is bytes else (lambda text: text)
+
+    pieces = []
+    position = kept_from = 0
+    depth = 0
+    while True:
+        match = tokens.search(document, position)
+        if match is None:
+            break
+        position = match.end()
+        raw_tag, _, closing, indexed_tag, chrome_tag = match.groups()
+        if match.lastindex is None:  # Comment
+            pieces.append(document[kept_from:match.start()])
+            pieces.append(as_kind('<!---->'))
+            kept_from = position
+        elif raw_tag:
+            pieces.append(document[kept_from:match.start()])
+            pieces.append(as_kind('<') + raw_tag + as_kind('></') + raw_tag + as_kind('>'))
+            kept_from = position
+        elif indexed_tag:
+            depth = max(0, depth + (-1 if closing else 1))
+        elif chrome_tag and depth == 0:
+            end = close(chrome_tag).search(document, position)
+            if end is None or inner_indexed.search(document, position, end.start()):
+                continue  # Unclosed, or holds elements the parsers may read
+            pieces.append(document[kept_from:position])  # Keep the opening tag
+            pieces.append(as_kind('</') + chrome_tag + as_kind('>'))
+            position = kept_from = end.end()
+    pieces.append(document[kept_from:])
+    return empty.join(pieces)
+
+
+def decode_page(data):
+    """Page text from (trimmed) response bytes, decoded as UTF-8 like the fetch layer does"""
+    return data.decode('utf-8', errors='replace') if isinstance(data, bytes) else data
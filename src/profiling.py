@@ -0,0 +1,169 @@
+"""
+Pipeline instrumentation
+Per-stage wall time, bytes and allocations for each scraped game, plus optional cProfile/tracemalloc dumps
+"""
+
+import contextlib
+import cProfile
+import importlib
+import json
+import os
+import pstats
+import sys
+import time
+import tracemalloc
+
+
+# Allocation sites listed in a tracemalloc report
+TOP_ALLOCATIONS = 25
+
+# Libraries the parse and export stages import lazily; preload() times them as their own stage
+STAGE_IMPORTS = ('pandas',)
+
+
+class StageProfiler:
+    """
+    Records wall time, bytes processed and memory allocated per pipeline stage
+
+    Stages may nest (e.g. pivot inside an export); each records its own totals.
+    Allocations are only measured while tracemalloc is tracing, since tracing
+    slows everything down.
+    """
+
+    def __init__(self):
+        self.stages = {}
+        self.seconds = 0.0  # Wall time in top-level stages
+        self._stack = []  # [start memory, peak memory seen so far] per open stage
+
+    @contextlib.contextmanager
+    def stage(self, name, nbytes=None):
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            if self._stack:
+                self._stack[-1][1] = max(self._stack[-1][1], peak)
+            tracemalloc.reset_peak()
+            frame = [current, current]
+        else:
+            frame = None
+        self._stack.append(frame)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self._stack.pop()
+            if not self._stack:
+                self.seconds += elapsed
+            stats = self._stats(name)
+            stats['calls'] += 1
+            stats['seconds'] += elapsed
+            if nbytes:
+                stats['bytes'] += nbytes
+            if frame is not None:
+                current, peak = tracemalloc.get_traced_memory()
+                peak = max(frame[1], peak)
+                stats['alloc_peak_bytes'] = max(stats['alloc_peak_bytes'], peak - frame[0])
+                stats['alloc_net_bytes'] += current - frame[0]
+                if self._stack and self._stack[-1] is not None:
+                    self._stack[-1][1] = max(self._stack[-1][1], peak)
+
+    def preload(self, modules=STAGE_IMPORTS):
+        """Import modules not loaded yet in an 'import' stage, so the first stage using them isn't charged for it"""
+        missing = [name for name in modules if name not in sys.modules]
+        if missing:
+            with self.stage('import'):
+                for name in missing:
+                    importlib.import_module(name)
+
+    def add_bytes(self, name, nbytes):
+        """Count bytes against a stage after the fact (e.g. the size of a written file)"""
+        self._stats(name)['bytes'] += nbytes
+
+    def _stats(self, name):
+        stats = self.stages.get(name)
+        if stats is None:
+            stats = self.stages[name] = {'calls': 0, 'seconds': 0.0, 'bytes': 0,
+                                         'alloc_peak_bytes': 0, 'alloc_net_bytes': 0}
+        return stats
+
+    def summary(self):
+        """Plain-dict summary (JSON-serializable and picklable)"""
+        return {'stages': {name: dict(stats) for name, stats in self.stages.items()},
+                'seconds': self.seconds}
+
+
+def merge(*summaries):
+    """Combine summaries of one game recorded in different places (e.g. fetch thread and parse process)"""
+    profiler = StageProfiler()
+    for summary in summaries:
+        profiler.seconds += (summary or {}).get('seconds', 0.0)
+        for name, stats in (summary or {}).get('stages', {}).items():
+            total = profiler._stats(name)
+            for key, value in stats.items():
+                total[key] = max(total[key], value) if key == 'alloc_peak_bytes' else total[key] + value
+    return profiler.summary()
+
+
+def aggregate(summaries):
+    """
+    Batch-wide totals per stage, plus mean and max seconds per game
+
+    Args:
+        summaries: Per-game summaries from StageProfiler.summary()
+    """
+    summaries = [summary for summary in summaries if summary]
+    total = merge(*summaries)
+    for name, stats in total['stages'].items():
+        per_game = [summary['stages'][name]['seconds'] for summary in summaries if name in summary['stages']]
+        stats['games'] = len(per_game)
+        stats['mean_seconds'] = sum(per_game) / len(per_game)
+        stats['max_seconds'] = max(per_game)
+    total['games'] = len(summaries)
+    return total
+
+
+def write_metrics(path, games, batch=None, fetch=None):
+    """Write per-game summaries, the batch aggregate and optional fetch-layer metrics as one JSON document"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    document = {'games': games, 'aggregate': batch if batch is not None else aggregate(
+        [game.get('metrics') for game in games])}
+    if fetch is not None:
+        document['fetch'] = fetch
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(document, f, ensure_ascii=False, indent=2)
+    print(f"Metrics saved to {path}")
+
+
+@contextlib.contextmanager
+def profile_run(directory, name='scrape'):
+    """
+    Run the enclosed code under cProfile and tracemalloc
+
+    Writes DIR/NAME.prof (load with pstats or snakeviz), DIR/NAME.txt (functions
+    by cumulative time) and DIR/NAME.alloc.txt (top allocation sites). Stage
+    metrics recorded meanwhile include allocations.
+    """
+    os.makedirs(directory, exist_ok=True)
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        snapshot = tracemalloc.take_snapshot()
+        if started_tracing:
+            tracemalloc.stop()
+
+        profile_path = os.path.join(directory, f"{name}.prof")
+        profiler.dump_stats(profile_path)
+        with open(os.path.join(directory, f"{name}.alloc.txt"), 'w', encoding='utf-8') as f:
+            for stat in snapshot.statistics('lineno')[:TOP_ALLOCATIONS]:
+                f.write(f"{stat}\n")
+        with open(os.path.join(directory, f"{name}.txt"), 'w', encoding='utf-8') as f:
+            pstats.Stats(profile_path, stream=f).sort_stats('cumulative').print_stats(40)
@@ -3,118 +3,183 @@ NBA Game Data Scraper
 Scrapes NBA game data from tw-nba.udn.com and saves to Excel
 """
 
-import requests
-from bs4 import BeautifulSoup
-import pandas as pd
 from datetime import datetime
 import re
 import os
+from collections import namedtuple
+
+from .boxscore import BoxScoreBuilder
+from .consolidate import season_stats_long, season_stats_wide
+from .embedded import extract_embedded_game, may_embed, page_model
+from .extract import build_page_model
+from .fetcher import DEFAULT_HEADERS, create_fetcher, create_session  # noqa: F401 (re-exported)
+from .layout import BOX_SCORE, CLASSIFIER, QUARTER_SCORES, SEASON_STAT, classify_page
+from .lxml_parser import build_page_model_lxml
+from .preparse import decode_page, trim_page
+from .profiling import StageProfiler
+from .teams import TEAM_NAME_MAPPING, TEAM_RESOLVER
+from .writers import ExcelOutput
+
+
+# One exported table: Excel sheet name, DataFrame, header flag, logical table name, team (per-team tables)
+Sheet = namedtuple('Sheet', ['name', 'frame', 'header', 'table', 'team'])
+
+# Classes of the divs collected into all_data['divs_with_data']
+DATA_DIV_PATTERN = re.compile('stat|score|point|player|team')
+
+
+def fetch_text(session, url, cache=None, profiler=None, raw=False, final=None):
+    """
+    GET url as UTF-8 text, through the response cache when one is given
+
+    Returns (text, source) with source 'cache', 'revalidated' (304 Not Modified)
+    or 'network'. Raises requests.RequestException on failure. Timings go to
+    the profiler's fetch and decode stages when one is given. With raw, a
+    network response that is not cached is returned as its undecoded bytes.
+    final is passed on to ResponseCache.store (None: decided from the page).
+    """
+    profiler = profiler or StageProfiler()
+    with profiler.stage('fetch'):
+        entry = None
+        if cache is not None:
+            entry = cache.lookup(url)
+            if entry is not None and entry.is_fresh(cache.ttl):
+                cache.record_hit()
+                return entry.text, 'cache'
+
+        headers = entry.conditional_headers() if entry is not None else None
+        response = session.get(url, timeout=30, headers=headers)
+        if entry is not None and response.status_code == 304:
+            cache.mark_revalidated(url)
+            return entry.text, 'revalidated'
+
+        response.raise_for_status()
+    profiler.add_bytes('fetch', len(response.content))
+    if raw and cache is None:
+        return response.content, 'network'  # Decoded after pre-parse trimming
+
+    with profiler.stage('decode', len(response.content)):
+        response.encoding = 'utf-8'
+        text = response.text
+    if cache is not None:
+        with profiler.stage('cache_store'):
+            cache.store(url, text, response.headers, final)
+    return text, 'network'
+
+
+def table_role(table_info):
+    """Layout role of an all_data table, classifying it when it was stored without one"""
+    return table_info.get('role') or CLASSIFIER.classify(table_info['data'])
+
+
+def output_size(path):
+    """Size in bytes of a written file, or of every file under a written directory"""
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, files in os.walk(path) for name in files)
 
 
 class NBAGameScraper:
-    def __init__(self, url):
+    def __init__(self, url, parser='bs4', session=None, cache=None, profiler=None, embedded=True, preparse=True):
         self.url = url
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'zh-TW,zh;q=0.9,en;q=0.8',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1'
-        })
+        self.parser = parser  # 'bs4', or 'lxml' for the fast path with BeautifulSoup fallback
+        self.embedded = embedded  # Read embedded JSON game data when the page has it, skipping the HTML parsers
+        self.preparse = preparse  # Trim scripts, comments and page chrome before decoding and tree building
+        self.source = None  # 'json' or 'html' once parsed
+        self._session = session  # Session or ResilientFetcher, may be shared between scrapers; see session
+        self.cache = cache  # Optional ResponseCache shared between scrapers
+        self.profiler = profiler or StageProfiler()  # Per-stage timings of this game
+        self.last_error = None
+        self.output_path = None
+        self.output_paths = []
         self.game_data = {}
         self.team_stats = []
         self.player_stats = []
+        self.box_score = BoxScoreBuilder()  # Typed columnar copy of player_stats
         self.team_names = []  # Store team names [home, away] with format Chinese(English)
         self.team_names_chinese = []  # Store Chinese-only team names for filename
 
-        # NBA Team name mapping (Chinese to English)
-        self.team_name_mapping = {
-            '塞爾蒂克': 'Celtics', '塞爾提克': 'Celtics', '凱爾特人': 'Celtics',
-            '籃網': 'Nets', '布魯克林籃網': 'Nets',
-            '尼克': 'Knicks', '紐約尼克': 'Knicks',
-            '76人': '76ers', '七六人': '76ers',
-            '暴龍': 'Raptors', '速龍': 'Raptors',
-            '公牛': 'Bulls', '芝加哥公牛': 'Bulls',
-            '騎士': 'Cavaliers', '克里夫蘭騎士': 'Cavaliers',
-            '活塞': 'Pistons', '底特律活塞': 'Pistons',
-            '溜馬': 'Pacers', '印第安納溜馬': 'Pacers',
-            '公鹿': 'Bucks', '密爾瓦基公鹿': 'Bucks',
-            '老鷹': 'Hawks', '亞特蘭大老鷹': 'Hawks',
-            '黃蜂': 'Hornets', '夏洛特黃蜂': 'Hornets',
-            '熱火': 'Heat', '邁阿密熱火': 'Heat',
-            '魔術': 'Magic', '奧蘭多魔術': 'Magic',
-            '巫師': 'Wizards', '華盛頓巫師': 'Wizards',
-            '金塊': 'Nuggets', '丹佛金塊': 'Nuggets',
-            '灰狼': 'Timberwolves', '明尼蘇達灰狼': 'Timberwolves',
-            '雷霆': 'Thunder', '俄克拉荷馬雷霆': 'Thunder',
-            '拓荒者': 'Trail Blazers', '波特蘭拓荒者': 'Trail Blazers',
-            '爵士': 'Jazz', '猶他爵士': 'Jazz',
-            '勇士': 'Warriors', '金州勇士': 'Warriors',
-            '快艇': 'Clippers', '洛杉磯快艇': 'Clippers',
-            '湖人': 'Lakers', '洛杉磯湖人': 'Lakers',
-            '太陽': 'Suns', '鳳凰城太陽': 'Suns',
-            '國王': 'Kings', '沙加緬度國王': 'Kings',
-            '小牛': 'Mavericks', '獨行俠': 'Mavericks', '達拉斯獨行俠': 'Mavericks',
-            '火箭': 'Rockets', '休士頓火箭': 'Rockets',
-            '灰熊': 'Grizzlies', '曼菲斯灰熊': 'Grizzlies',
-            '鵜鶘': 'Pelicans', '紐奧良鵜鶘': 'Pelicans',
-            '馬刺': 'Spurs', '聖安東尼奧馬刺': 'Spurs'
-        }
+        # NBA Team name mapping (Chinese to English), shared by every scraper; see src.teams
+        self.team_name_mapping = TEAM_NAME_MAPPING
+        self._sheets = None  # Output sheets, kept once built until the parsed data changes
+
+    @property
+    def session(self):
+        """The fetcher, created on first use so parse-only scrapers never build a requests Session"""
+        if self._session is None:
+            self._session = create_fetcher()
+        return self._session
+
+    @session.setter
+    def session(self, session):
+        self._session = session
 
     def fetch_page(self):
-        """Fetch the webpage content"""
+        """Fetch the webpage content, through the response cache when one is set"""
+        import requests
         try:
             print(f"Fetching data from: {self.url}")
-            response = self.session.get(self.url, timeout=30)
-            response.raise_for_status()
-            response.encoding = 'utf-8'
-            return response.text
+            text, source = fetch_text(self.session, self.url, self.cache, self.profiler, raw=self.preparse)
+            if source == 'cache':
+                print("Served from cache")
+            elif source == 'revalidated':
+                print("Not modified, served from cache")
+            return text
         except requests.RequestException as e:
             print(f"Error fetching page: {e}")
+            self.last_error = str(e)
             return None
 
-    def parse_game_info(self, soup):
+    def build_page(self, html_content):
+        """Build the page model with the configured parser backend"""
+        if self.parser == 'lxml':
+            page = build_page_model_lxml(html_content)
+            if page is not None:
+                return page
+            print("Page layout not recognized by the lxml parser, falling back to BeautifulSoup")
+
+        from bs4 import BeautifulSoup
+        soup = BeautifulSoup(html_content, 'lxml')
+        return build_page_model(soup)
+
+    def parse_game_info(self, page):
         """Parse basic game information"""
         try:
             # Try to find game date
-            date_element = soup.find('div', class_='date') or soup.find('span', class_='date')
-            if date_element:
-                self.game_data['date'] = date_element.text.strip()
+            date_element = page.find_first(('div', 'date'), ('span', 'date'))
+            if date_element is not None:
+                self.game_data['date'] = page.text(date_element)
 
             # Find team names and scores
-            team_elements = soup.find_all('div', class_='team-name') or soup.find_all('span', class_='team')
-            score_elements = soup.find_all('div', class_='score') or soup.find_all('span', class_='score')
+            team_elements = page.find_all('div', 'team-name') or page.find_all('span', 'team')
+            score_elements = page.find_all('div', 'score') or page.find_all('span', 'score')
 
             if len(team_elements) >= 2:
-                self.game_data['home_team'] = team_elements[0].text.strip()
-                self.game_data['away_team'] = team_elements[1].text.strip()
+                self.game_data['home_team'] = page.text(team_elements[0])
+                self.game_data['away_team'] = page.text(team_elements[1])
 
             if len(score_elements) >= 2:
-                self.game_data['home_score'] = score_elements[0].text.strip()
-                self.game_data['away_score'] = score_elements[1].text.strip()
+                self.game_data['home_score'] = page.text(score_elements[0])
+                self.game_data['away_score'] = page.text(score_elements[1])
 
             print(f"Game info parsed: {self.game_data}")
 
         except Exception as e:
             print(f"Error parsing game info: {e}")
 
-    def parse_quarter_scores(self, soup):
+    def parse_quarter_scores(self, page):
         """Parse quarter by quarter scores"""
+        import pandas as pd
         try:
             quarter_data = []
 
             # Look for quarter scores in various possible formats
-            quarter_table = soup.find('table', class_='quarter-scores') or \
-                           soup.find('div', class_='quarter-breakdown')
+            quarter_table = page.find_first(('table', 'quarter-scores'), ('div', 'quarter-breakdown'))
 
-            if quarter_table:
-                rows = quarter_table.find_all('tr')
-                for row in rows:
-                    cols = row.find_all(['td', 'th'])
+            if quarter_table is not None:
+                for cols in page.rows_of(quarter_table):
                     if cols:
-                        quarter_data.append([col.text.strip() for col in cols])
+                        quarter_data.append(cols)
 
             if quarter_data:
                 df_quarters = pd.DataFrame(quarter_data)
@@ -125,45 +190,47 @@ class NBAGameScraper:
 
         return pd.DataFrame()
 
-    def parse_player_stats(self, soup):
+    def parse_player_stats(self, page):
         """Parse player statistics"""
         try:
-            # Find all tables that might contain player stats
-            tables = soup.find_all('table')
-
-            for table in tables:
-                # Check if this is a player stats table
-                headers = table.find_all('th')
-                if any('MIN' in h.text or '分鐘' in h.text or 'PTS' in h.text or '得分' in h.text for h in headers):
-                    # Parse headers
-                    header_row = [th.text.strip() for th in headers]
-
-                    # Parse player data
-                    rows = table.find_all('tr')[1:]  # Skip header row
-                    for row in rows:
-                        cols = row.find_all(['td', 'th'])
-                        if cols:
-                            player_data = {}
-                            for i, col in enumerate(cols):
-                                if i < len(header_row):
-                                    player_data[header_row[i]] = col.text.strip()
-
-                            if player_data:
-                                self.player_stats.append(player_data)
+            # Box-score tables, as classified by their header row and shape
+            for table in classify_page(page, self.url).tables:
+                if table.role == BOX_SCORE:
+                    self.add_box_score(table.headers, table.rows[1:])  # Skip header row
 
             print(f"Found {len(self.player_stats)} player statistics")
 
         except Exception as e:
             print(f"Error parsing player stats: {e}")
 
-    def parse_team_stats(self, soup):
+    def add_box_score(self, headers, rows):
+        """Add the player rows of one box-score table to player_stats and the typed box score"""
+        self._sheets = None
+        self.box_score.start_table(headers)
+
+        # Parse player data
+        for cols in rows:
+            if cols:
+                self.box_score.add_row(cols)
+                player_data = {}
+                for i, col in enumerate(cols):
+                    if i < len(headers):
+                        player_data[headers[i]] = col
+
+                if player_data:
+                    self.player_stats.append(player_data)
+
+    def player_frame(self):
+        """Player stats as a typed DataFrame (seconds, made/attempted ints, float %, categoricals)"""
+        return self.box_score.to_frame(self.team_names)
+
+    def parse_team_stats(self, page):
         """Parse team statistics"""
         try:
             # Find team statistics
-            team_stats_section = soup.find('div', class_='team-stats') or \
-                                soup.find('table', class_='team-comparison')
+            team_stats_section = page.find_first(('div', 'team-stats'), ('table', 'team-comparison'))
 
-            if team_stats_section:
+            if team_stats_section is not None:
                 stat_items = team_stats_section.find_all(['div', 'tr'], class_=re.compile('stat'))
 
                 for item in stat_items:
@@ -173,9 +240,9 @@ class NBAGameScraper:
 
                     if stat_name:
                         self.team_stats.append({
-                            'statistic': stat_name.text.strip(),
-                            'home_team': home_value.text.strip() if home_value else '',
-                            'away_team': away_value.text.strip() if away_value else ''
+                            'statistic': page.text(stat_name),
+                            'home_team': page.text(home_value) if home_value else '',
+                            'away_team': page.text(away_value) if away_value else ''
                         })
 
             print(f"Found {len(self.team_stats)} team statistics")
@@ -186,17 +253,21 @@ class NBAGameScraper:
     def extract_team_names(self, table_data):
         """Extract team names from quarter scores table"""
         if table_data and len(table_data) >= 2:
-            # Usually team names are in the second column of the quarter scores table
+            found = set()
             for row in table_data:
-                if len(row) >= 2:
-                    team_name = row[1] if row[1] and row[1] not in ['Q1', 'Q2', 'Q3', 'Q4'] else None
-                    if team_name and team_name in self.team_name_mapping:
-                        chinese_name = team_name
-                        english_name = self.team_name_mapping.get(team_name, team_name)
-                        self.team_names.append(f"{chinese_name}({english_name})")
-                        self.team_names_chinese.append(chinese_name)  # Store Chinese-only name
-
-    def parse_all_data(self, soup):
+                # Usually team names are in the second column, but any cell may name the team
+                for cell in row[1:2] + row[:1] + row[2:]:
+                    team = TEAM_RESOLVER.resolve(cell)
+                    if team is None or team.id in found:
+                        continue
+                    found.add(team.id)
+                    name = cell.strip()
+                    chinese_name = name if name in self.team_name_mapping else team.chinese
+                    self.team_names.append(f"{chinese_name}({team.english})")
+                    self.team_names_chinese.append(chinese_name)  # Store Chinese-only name
+                    break
+
+    def parse_all_data(self, page):
         """Parse all available data from the page"""
         # Try to extract all possible data structures
         all_data = {
@@ -206,166 +277,135 @@ class NBAGameScraper:
         }
 
         # Extract all tables
-        tables = soup.find_all('table')
-        for i, table in enumerate(tables):
-            table_data = []
-            rows = table.find_all('tr')
-
-            for row in rows:
-                cols = row.find_all(['td', 'th'])
-                row_data = [col.text.strip() for col in cols]
-                if row_data:
-                    table_data.append(row_data)
+        for table in classify_page(page, self.url).tables:
+            table_data = table.data()
 
             if table_data:
                 all_data['tables'].append({
-                    'table_index': i,
-                    'data': table_data
+                    'table_index': table.index,
+                    'data': table_data,
+                    'role': table.role
                 })
 
-                # Try to extract team names from the first table (quarter scores)
-                if i == 0 and not self.team_names:
+                # Try to extract team names from the quarter scores table
+                if table.role == QUARTER_SCORES and not self.team_names:
                     self.extract_team_names(table_data)
 
         # Extract structured divs with numerical data
-        data_divs = soup.find_all('div', class_=re.compile('stat|score|point|player|team'))
-        for div in data_divs:
-            text = div.text.strip()
+        for div in page.find_matching('div', DATA_DIV_PATTERN):
+            text = page.text(div)
             if text and any(char.isdigit() for char in text):
                 all_data['divs_with_data'].append(text)
 
         return all_data
 
+    def build_sheets(self):
+        """
+        Logical output tables in Excel sheet order
+
+        Returns a list of Sheet(name, frame, header, table, team): the sheet
+        name, its DataFrame, whether to write the header row, the logical
+        table it belongs to and, for per-team tables, the team name.
+
+        Built once and shared by every writer of the game; treat the frames as
+        read-only. parse() and add_box_score() drop the cached sheets.
+        """
+        import pandas as pd
+        if self._sheets is not None:
+            return self._sheets
+        sheets = []
+
+        # Save game info
+        if self.game_data:
+            df_game = pd.DataFrame([self.game_data])
+            sheets.append(Sheet('Game Info', df_game, True, 'game_info', None))
+
+        # Save player stats
+        if self.player_stats:
+            df_players = pd.DataFrame(self.player_stats)
+            sheets.append(Sheet('Player Stats', df_players, True, 'player_stats', None))
+
+        # Save team stats
+        if self.team_stats:
+            df_teams = pd.DataFrame(self.team_stats)
+            sheets.append(Sheet('Team Stats', df_teams, True, 'team_stats', None))
+
+        # Process raw scraped data
+        if hasattr(self, 'all_data'):
+            team_sheet_count = 0
+            quarter_sheet = False
+            season_tables = []  # Collect team season statistics tables
+
+            for i, table_info in enumerate(self.all_data.get('tables', [])):
+                if table_info['data']:
+                    df_table = pd.DataFrame(table_info['data'])
+                    role = table_role(table_info)
+
+                    # Home and away box scores (Tables 2 and 3)
+                    if role == BOX_SCORE:
+                        if team_sheet_count < len(self.team_names):
+                            team_name = self.team_names[team_sheet_count]
+                            sheet_name = f"{team_name}_Players"[:31]
+                            team_sheet_count += 1
+                            sheets.append(Sheet(sheet_name, df_table, False, 'team_players', team_name))
+                        else:
+                            sheets.append(Sheet(f'Table_{i+1}'[:31], df_table, False, f'table_{i+1}', None))
+
+                    # Team season stats tables (Tables 4-12)
+                    # These tables have 3 rows: stat name row, team1 row, team2 row
+                    elif role == SEASON_STAT:
+                        season_tables.append(table_info['data'])
+
+                    # Quarter scores (Table 1)
+                    elif role == QUARTER_SCORES and not quarter_sheet:
+                        quarter_sheet = True
+                        sheets.append(Sheet('Quarter Scores', df_table, False, 'quarter_scores', None))
+
+                    # Any other tables that don't match the patterns
+                    else:
+                        sheets.append(Sheet(f'Table_{i+1}'[:31], df_table, False, f'table_{i+1}', None))
+
+            # Save consolidated team season statistics
+            with self.profiler.stage('pivot'):
+                team_season_stats = season_stats_long(season_tables, self.team_name_mapping)
+                if len(team_season_stats):
+                    # One reshape: statistics as rows, value and rank columns per team
+                    df_combined = season_stats_wide(team_season_stats)
+                    sheets.append(Sheet('Team Season Statistics', df_combined, True,
+                                        'team_season_statistics', None))
+
+                    print(f"Consolidated {len(team_season_stats)} team statistics entries")
+
+        self._sheets = sheets
+        return sheets
+
+    def compact(self):
+        """
+        Build the output sheets once and drop parse leftovers that no export reads
+
+        Called by the streaming pipeline between parsing and writing, so a
+        game waiting for a sink holds only its output tables.
+        """
+        self.build_sheets()
+        if hasattr(self, 'all_data'):
+            self.all_data['divs_with_data'] = []
+            self.all_data['lists'] = []
+        return self
+
+    def season_stats_frame(self):
+        """Team season statistics in long format (Team, Statistic, Value, League Rank)"""
+        tables = [table_info['data'] for table_info in getattr(self, 'all_data', {}).get('tables', [])
+                  if table_info['data'] and table_role(table_info) == SEASON_STAT]
+        return season_stats_long(tables, self.team_name_mapping)
+
     def save_to_excel(self, filename='nba_game_data.xlsx'):
         """Save all scraped data to Excel file"""
+        import pandas as pd
         try:
+            sheets = self.build_sheets()
             with pd.ExcelWriter(filename, engine='openpyxl') as writer:
-                # Save game info
-                if self.game_data:
-                    df_game = pd.DataFrame([self.game_data])
-                    df_game.to_excel(writer, sheet_name='Game Info', index=False)
-
-                # Save player stats
-                if self.player_stats:
-                    df_players = pd.DataFrame(self.player_stats)
-                    df_players.to_excel(writer, sheet_name='Player Stats', index=False)
-
-                # Save team stats
-                if self.team_stats:
-                    df_teams = pd.DataFrame(self.team_stats)
-                    df_teams.to_excel(writer, sheet_name='Team Stats', index=False)
-
-                # Process raw scraped data
-                if hasattr(self, 'all_data'):
-                    team_sheet_count = 0
-                    team_season_stats = []  # Collect team season statistics
-
-                    # Mapping for statistics categories
-                    stat_mapping = {
-                        '得分': 'Points per Game',
-                        '助攻': 'Assists per Game',
-                        '籃板': 'Rebounds per Game',
-                        '阻攻': 'Blocks per Game',
-                        '抄截': 'Steals per Game',
-                        '投籃%': 'Field Goal %',
-                        '3分%': '3-Point %',
-                        '罰球%': 'Free Throw %',
-                        '失誤': 'Turnovers per Game'
-                    }
-
-                    for i, table_info in enumerate(self.all_data.get('tables', [])):
-                        if table_info['data']:
-                            df_table = pd.DataFrame(table_info['data'])
-
-                            # Check if this is a player stats table (Tables 2 and 3)
-                            if i > 0 and any('先發' in str(row) or '位置' in str(row) for row in table_info['data'][0] if row):
-                                if team_sheet_count < len(self.team_names):
-                                    sheet_name = f"{self.team_names[team_sheet_count]}_Players"[:31]
-                                    team_sheet_count += 1
-                                    df_table.to_excel(writer, sheet_name=sheet_name, index=False, header=False)
-                                else:
-                                    df_table.to_excel(writer, sheet_name=f'Table_{i+1}'[:31], index=False, header=False)
-
-                            # Check if this is a team season stats table (Tables 4-12)
-                            # These tables have 3 rows: stat name row, team1 row, team2 row
-                            elif (len(table_info['data']) == 3 and
-                                  len(table_info['data'][0]) == 1 and  # First row has stat name only
-                                  len(table_info['data'][1]) == 3 and  # Second row has team data
-                                  len(table_info['data'][2]) == 3):    # Third row has team data
-                                # Extract statistic category from the first row
-                                stat_category = table_info['data'][0][0]  # First row contains stat name
-
-                                if stat_category in stat_mapping:
-                                    # Process both teams' data (rows 1 and 2)
-                                    for row_idx in [1, 2]:
-                                        row = table_info['data'][row_idx]
-                                        if len(row) >= 3:
-                                            team_name = row[0]
-                                            value = row[1]
-                                            rank = row[2]
-
-                                            # Get English name for the team
-                                            english_name = self.team_name_mapping.get(team_name, team_name)
-
-                                            team_season_stats.append({
-                                                'Team': f"{team_name}({english_name})",
-                                                'Statistic': stat_mapping[stat_category],
-                                                'Value': value,
-                                                'League Rank': rank
-                                            })
-
-                            # For quarter scores (Table 1)
-                            elif i == 0:
-                                df_table.to_excel(writer, sheet_name='Quarter Scores', index=False, header=False)
-
-                            # Any other tables that don't match the patterns
-                            else:
-                                # Only save if not a team stats table
-                                if not (len(table_info['data']) == 3 and
-                                       len(table_info['data'][0]) == 1 and
-                                       len(table_info['data'][1]) == 3 and
-                                       len(table_info['data'][2]) == 3):
-                                    df_table.to_excel(writer, sheet_name=f'Table_{i+1}'[:31], index=False, header=False)
-
-                    # Save consolidated team season statistics
-                    if team_season_stats:
-                        # Create a pivot table for better readability
-                        df_team_stats = pd.DataFrame(team_season_stats)
-
-                        # Pivot to have teams as columns and statistics as rows
-                        pivot_stats = df_team_stats.pivot_table(
-                            index='Statistic',
-                            columns='Team',
-                            values='Value',
-                            aggfunc='first'
-                        )
-
-                        # Also create a ranking pivot
-                        pivot_ranks = df_team_stats.pivot_table(
-                            index='Statistic',
-                            columns='Team',
-                            values='League Rank',
-                            aggfunc='first'
-                        )
-
-                        # Combine values and ranks
-                        combined_data = []
-                        for stat in pivot_stats.index:
-                            row_data = {'Statistic': stat}
-                            for team in pivot_stats.columns:
-                                if team in pivot_stats.columns:
-                                    value = pivot_stats.loc[stat, team]
-                                    rank = pivot_ranks.loc[stat, team] if team in pivot_ranks.columns else ''
-                                    row_data[f'{team} Value'] = value
-                                    row_data[f'{team} Rank'] = rank
-                            combined_data.append(row_data)
-
-                        df_combined = pd.DataFrame(combined_data)
-
-                        # Save the consolidated team statistics
-                        df_combined.to_excel(writer, sheet_name='Team Season Statistics', index=False)
-
-                        print(f"Consolidated {len(team_season_stats)} team statistics entries")
+                for sheet in sheets:
+                    sheet.frame.to_excel(writer, sheet_name=sheet.name, index=False, header=sheet.header)
 
                 print(f"Data saved to {filename}")
                 print(f"Team names found: {self.team_names}")
@@ -375,48 +415,117 @@ class NBAGameScraper:
             print(f"Error saving to Excel: {e}")
             return False
 
-    def scrape(self):
-        """Main scraping method"""
-        html_content = self.fetch_page()
-
-        if not html_content:
-            print("Failed to fetch page content")
-            return False
-
-        soup = BeautifulSoup(html_content, 'lxml')
+    @property
+    def game_id(self):
+        """Last path segment of the game URL (the game UUID on tw-nba.udn.com)"""
+        return self.url.rstrip('/').rsplit('/', 1)[-1]
+
+    def parse_embedded(self, game):
+        """Fill game_data, team_stats, player_stats and all_data from embedded JSON game data"""
+        self.game_data.update(game.info)
+        print(f"Game info parsed: {self.game_data}")
+        self.team_stats.extend(game.team_stats)
+        print(f"Found {len(self.team_stats)} team statistics")
+
+        page = page_model(game)
+        with self.profiler.stage('parse_player_stats'):
+            self.parse_player_stats(page)
+        with self.profiler.stage('parse_all_data'):
+            self.all_data = self.parse_all_data(page)
+
+    def parse(self, html_content):
+        """Parse page content (text, or raw UTF-8 bytes) into game_data, player_stats, team_stats and all_data"""
+        stage = self.profiler.stage
+        self._sheets = None
+
+        # Pages that embed their data as JSON skip the DOM entirely
+        if self.embedded and (isinstance(html_content, str) or may_embed(html_content)):
+            if isinstance(html_content, bytes):
+                with stage('decode', len(html_content)):
+                    html_content = decode_page(html_content)
+            with stage('embedded_json'):
+                game = extract_embedded_game(html_content)
+            if game is not None:
+                self.source = 'json'
+                self.parse_embedded(game)
+                return
+        self.source = 'html'
+
+        # Drop what no parser reads before the (smaller) rest is decoded and built into a tree
+        if self.preparse:
+            with stage('preparse', len(html_content)):
+                html_content = trim_page(html_content)
+        if isinstance(html_content, bytes):
+            with stage('decode', len(html_content)):
+                html_content = decode_page(html_content)
+
+        # Walk the document once; every parser reads from the shared page model
+        with stage('tree', len(html_content.encode('utf-8'))):
+            page = self.build_page(html_content)
 
         # Parse different sections
-        self.parse_game_info(soup)
-        self.parse_quarter_scores(soup)
-        self.parse_player_stats(soup)
-        self.parse_team_stats(soup)
+        with stage('parse_game_info'):
+            self.parse_game_info(page)
+        with stage('parse_quarter_scores'):
+            self.parse_quarter_scores(page)
+        with stage('parse_player_stats'):
+            self.parse_player_stats(page)
+        with stage('parse_team_stats'):
+            self.parse_team_stats(page)
 
         # Parse all data as backup
-        self.all_data = self.parse_all_data(soup)
+        with stage('parse_all_data'):
+            self.all_data = self.parse_all_data(page)
 
-        # Create output directory if it doesn't exist
-        output_dir = "output_excel"
-        if not os.path.exists(output_dir):
-            os.makedirs(output_dir)
-            print(f"Created directory: {output_dir}")
-
-        # Generate filename with team names and date
+    def output_basename(self, include_game_id=False):
+        """Output filename without extension: team1_team2_YYYYMMDD_HHMMSS[_gameid]"""
         date_str = datetime.now().strftime("%Y%m%d_%H%M%S")
+        if include_game_id:
+            date_str = f"{date_str}_{self.game_id}"
 
         # Use team names if available, otherwise use default naming
         if len(self.team_names_chinese) >= 2:
             team1 = self.team_names_chinese[0]
             team2 = self.team_names_chinese[1]
-            filename = f"{team1}_{team2}_{date_str}.xlsx"
-        else:
-            # Fallback to default naming if team names not found
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"nba_game_data_{timestamp}.xlsx"
+            return f"{team1}_{team2}_{date_str}"
+
+        # Fallback to default naming if team names not found
+        return f"nba_game_data_{date_str}"
+
+    def scrape(self, html_content=None, output_dir="output_excel", include_game_id=False, writers=None):
+        """
+        Main scraping method
 
-        # Full path with output directory
-        full_path = os.path.join(output_dir, filename)
+        Args:
+            html_content: Already fetched page content, or None to fetch self.url
+            output_dir: Directory the Excel file is written to when writers is None
+            include_game_id: Add the game id to the filename (keeps batch outputs unique)
+            writers: Output writers (see src.writers); defaults to one Excel workbook
+        """
+        if html_content is None:
+            html_content = self.fetch_page()
 
-        # Save to Excel
-        success = self.save_to_excel(full_path)
+        if not html_content:
+            print("Failed to fetch page content")
+            return False
 
-        return success
\ No newline at end of file
+        self.profiler.preload()
+        self.parse(html_content)
+
+        if writers is None:
+            writers = [ExcelOutput(output_dir)]
+
+        basename = self.output_basename(include_game_id)
+        self.output_paths = []
+        for writer in writers:
+            name = f"export_{writer.format}"
+            with self.profiler.stage(name):
+                path = writer.write(self, basename)
+            self.output_paths.append(path)
+            if path and path != writer.root and os.path.exists(path):
+                self.profiler.add_bytes(name, output_size(path))
+        success = all(self.output_paths)
+        if success:
+            self.output_path = self.output_paths[0]
+
+        return success
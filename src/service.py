@@ -0,0 +1,511 @@
+"""
+Game query service
+Serves box scores, quarter scores and team season stats of scraped games as JSON over local HTTP,
+from the season store or an Excel output directory, with an LRU of hot games, per-team and per-date
+indexes and ETags
+
+Start it with `python main.py --api [HOST:PORT]` (add `--store PATH` to serve the store instead of
+output_excel/). Endpoints (GET or HEAD):
+
+    /games                      Game summaries; filters: team, date, from, to, season, limit
+    /games/<id>                 One game: summary, box_score, quarter_scores, team_season_stats
+    /games/<id>/<table>         One of its tables
+    /teams                      Games per team
+    /teams/<team>/games         A team's games, newest first (any team name: 湖人, Lakers, LAL)
+    /teams/<team>/season_stats  The team's season stats from its latest game
+    /dates/<YYYY-MM-DD>         Games of one day
+    /health                     Game count, cache and request counters
+"""
+
+import hashlib
+import json
+import os
+import socket
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from .store import PLAYER_COLUMNS, GameStore, canonical_team
+from .teams import TEAM_NAME_MAPPING, TEAM_RESOLVER
+
+
+DEFAULT_API_ADDRESS = '127.0.0.1:8791'
+DEFAULT_CACHE_GAMES = 256
+DEFAULT_CACHE_LISTS = 512  # List responses kept between index changes
+DEFAULT_REFRESH = 5.0  # Seconds between checks of the source for new or rescraped games
+
+# asyncio is imported inside the functions that use it, keeping it out of main.py's startup
+
+GAME_TABLES = ('box_score', 'quarter_scores', 'team_season_stats')
+GAMES_FILTERS = ('team', 'date', 'from', 'to', 'season', 'limit')  # Query parameters /games reads
+SUMMARY_FIELDS = ('game_id', 'date', 'season', 'home_team', 'away_team', 'home_score', 'away_score')
+
+MAX_REQUEST_BYTES = 16384
+REASONS = {200: 'OK', 304: 'Not Modified', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           500: 'Internal Server Error'}
+
+
+class StoreSource:
+    """Games from a GameStore; its connection lives on the service's single source thread"""
+
+    def __init__(self, path):
+        self.path = path
+        self._store = None
+        self.synced_at = 0.0
+
+    def store(self):
+        if self._store is None:
+            self._store = GameStore(self.path)
+        return self._store
+
+    def changes(self):
+        """(summaries of games stored since the last call, ids of games no longer present)"""
+        rows = self.store().games_scraped_since(self.synced_at)
+        if rows:
+            self.synced_at = max(row['scraped_at'] for row in rows)
+        return [{field: row[field] for field in SUMMARY_FIELDS} for row in rows], []
+
+    def load(self, game_id):
+        return self.store().game_tables(game_id)
+
+    def close(self):
+        if self._store is not None:
+            self._store.close()
+            self._store = None
+
+
+class WorkbookSource:
+    """
+    Games from the Excel workbooks of an output directory
+
+    Summaries come from the cached workbook index (src.utils.WorkbookIndex),
+    so only new or changed workbooks are opened; a game's tables are read
+    (openpyxl read-only) when it is first requested.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.paths = {}  # game_id -> workbook path
+        self._seen = {}  # workbook path -> mtime
+
+    def changes(self):
+        from .utils import WorkbookIndex
+        infos = WorkbookIndex(self.root).scan()
+        summaries, current = [], {}
+        for info in infos:  # Oldest first, so a rescraped game's newest workbook wins
+            current[info['path']] = info['mtime']
+            if info.get('error') or self._seen.get(info['path']) == info['mtime']:
+                continue
+            summary = workbook_summary(info)
+            self.paths[summary['game_id']] = info['path']
+            summaries.append(summary)
+        removed = [game_id for game_id, path in self.paths.items() if path not in current]
+        for game_id in removed:
+            del self.paths[game_id]
+        self._seen = current
+        return summaries, removed
+
+    def load(self, game_id):
+        path = self.paths.get(game_id)
+        return read_workbook_tables(path) if path else None
+
+    def close(self):
+        pass
+
+
+def _sheet(info, name):
+    return next((sheet for sheet in info['sheets'] if sheet['name'] == name), None)
+
+
+def workbook_summary(info):
+    """Game summary from a workbook's index entry (Game Info and Quarter Scores sample rows)"""
+    from .discovery import GAME_ID_PATTERN
+    from .writers import parse_date, season_of
+
+    name = os.path.splitext(os.path.basename(info['path']))[0]
+    match = GAME_ID_PATTERN.search(name)
+    game_info = _sheet(info, 'Game Info')
+    fields = dict(zip(game_info['header'], game_info['sample'][0])) if game_info and game_info['sample'] else {}
+
+    # Team names as the scraper read them: second cell of the quarter table's team rows
+    quarters = _sheet(info, 'Quarter Scores')
+    teams = [row[1] for row in (quarters['sample'] if quarters else []) if len(row) > 1 and row[1]]
+    teams = teams or [fields.get('home_team'), fields.get('away_team')]
+    date = parse_date(str(fields.get('date') or ''))
+    return {
+        'game_id': match.group(0).lower() if match else name,
+        'date': date,
+        'season': season_of(date) if date else None,
+        'home_team': canonical_team(teams[0], TEAM_NAME_MAPPING) if teams[0] else None,
+        'away_team': canonical_team(teams[1], TEAM_NAME_MAPPING) if len(teams) > 1 and teams[1] else None,
+        'home_score': fields.get('home_score'),
+        'away_score': fields.get('away_score'),
+    }
+
+
+def read_workbook_tables(path):
+    """Box score (typed from the team player sheets), quarter scores and long season stats of a workbook"""
+    from openpyxl import load_workbook
+
+    from .boxscore import BoxScoreBuilder
+
+    builder, teams = BoxScoreBuilder(), []
+    quarters, season = [], []
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        for worksheet in workbook.worksheets:
+            rows = [list(row) for row in worksheet.iter_rows(values_only=True)]
+            if worksheet.title.endswith('_Players') and rows:
+                teams.append(canonical_team(worksheet.title[:-len('_Players')], TEAM_NAME_MAPPING))
+                builder.start_table(['' if cell is None else str(cell) for cell in rows[0]])
+                for row in rows[1:]:
+                    while row and row[-1] is None:
+                        row.pop()
+                    builder.add_row(['' if cell is None else str(cell) for cell in row])
+            elif worksheet.title == 'Quarter Scores':
+                quarters = [['' if cell is None else cell for cell in row] for row in rows]  # Empty cells as scraped
+            elif worksheet.title == 'Team Season Statistics' and rows:
+                header = rows[0]
+                for row in rows[1:]:
+                    for i in range(1, len(header) - 1, 2):
+                        team = str(header[i]).rsplit(' ', 1)[0]
+                        season.append({'team': canonical_team(team, TEAM_NAME_MAPPING), 'statistic': row[0],
+                                       'value': row[i], 'league_rank': row[i + 1]})
+    finally:
+        workbook.close()
+
+    frame = builder.to_frame(teams)
+    box_score = json.loads(frame.reindex(columns=list(PLAYER_COLUMNS)).to_json(orient='records', force_ascii=False))
+    return {'box_score': box_score, 'quarter_scores': quarters, 'team_season_stats': season}
+
+
+def _body(document):
+    """(JSON bytes, strong ETag) of a response document"""
+    body = json.dumps(document, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return body, '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+
+
+class GameIndex:
+    """Game summaries with per-team and per-date indexes, rebuilt from the source's changes"""
+
+    def __init__(self):
+        self.games = {}    # game_id -> summary
+        self.by_team = {}  # canonical team -> game ids, newest first
+        self.by_date = {}  # YYYY-MM-DD -> game ids
+        self.order = []    # Every game id, newest first
+        self.version = 0   # Bumped on every change; list responses are cached per version
+
+    def update(self, summaries, removed=()):
+        for game_id in removed:
+            self.games.pop(game_id, None)
+        for summary in summaries:
+            self.games[summary['game_id']] = summary
+        by_team, by_date = {}, {}
+        order = sorted(self.games.values(), key=lambda game: (game['date'] or '', game['game_id']), reverse=True)
+        for summary in order:
+            for team in {summary['home_team'], summary['away_team']} - {None}:
+                by_team.setdefault(team, []).append(summary['game_id'])
+            by_date.setdefault(summary['date'], []).append(summary['game_id'])
+        self.by_team, self.by_date = by_team, by_date
+        self.order = [summary['game_id'] for summary in order]
+        self.version += 1
+
+    def team(self, name):
+        """Canonical team key of any team name, or None when no indexed team matches"""
+        name = unquote(name).strip()
+        if name in self.by_team:
+            return name
+        english = TEAM_RESOLVER.english(name, TEAM_NAME_MAPPING)
+        return english if english in self.by_team else None
+
+
+class GameService:
+    """
+    Answers query paths with (status, body, etag)
+
+    Game documents are loaded from the source on a single worker thread,
+    kept as pre-encoded JSON in an LRU of cache_size hot games (concurrent
+    misses for one game share a load), and dropped when the source reports
+    the game changed. List responses are computed from the indexes and kept
+    in an LRU of list_cache_size, keyed on the filters they read, until the
+    index changes.
+    """
+
+    def __init__(self, source, cache_size=DEFAULT_CACHE_GAMES, refresh=DEFAULT_REFRESH,
+                 list_cache_size=DEFAULT_CACHE_LISTS):
+        self.source = source
+        self.cache_size = cache_size
+        self.list_cache_size = list_cache_size
+        self.refresh_interval = refresh
+        self.index = GameIndex()
+        self.hot = OrderedDict()  # game_id -> {view: (body, etag)}
+        self.lists = OrderedDict()  # (index version, path, filters) -> (body, etag)
+        self.loading = {}         # game_id -> Future of a load in progress
+        self.executor = ThreadPoolExecutor(1, thread_name_prefix='game-source')
+        self.stats = {'requests': 0, 'not_modified': 0, 'hits': 0, 'misses': 0, 'evictions': 0, 'refreshes': 0}
+
+    async def refresh(self):
+        """Pull new, rescraped and removed games from the source; returns how many changed"""
+        import asyncio
+        loop = asyncio.get_running_loop()
+        summaries, removed = await loop.run_in_executor(self.executor, self.source.changes)
+        if summaries or removed:
+            for game_id in [summary['game_id'] for summary in summaries] + list(removed):
+                self.hot.pop(game_id, None)
+            self.index.update(summaries, removed)
+            self.lists.clear()
+        self.stats['refreshes'] += 1
+        return len(summaries) + len(removed)
+
+    async def refresh_forever(self):
+        import asyncio
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.refresh()
+            except Exception as e:
+                print(f"Refresh failed: {type(e).__name__}: {e}")
+
+    async def game_views(self, game_id):
+        """Encoded views of a hot game, loading it on a miss; None for unknown games"""
+        import asyncio
+        views = self.hot.get(game_id)
+        if views is not None:
+            self.hot.move_to_end(game_id)
+            self.stats['hits'] += 1
+            return views
+        summary = self.index.games.get(game_id)
+        if summary is None:
+            return None
+
+        self.stats['misses'] += 1
+        future = self.loading.get(game_id)
+        if future is None:
+            future = asyncio.get_running_loop().run_in_executor(self.executor, self.source.load, game_id)
+            self.loading[game_id] = future
+        try:
+            tables = await future
+        finally:
+            self.loading.pop(game_id, None)
+        if tables is None:
+            return None
+
+        views = {None: _body(dict(summary, **tables))}
+        views.update((name, _body(tables[name])) for name in GAME_TABLES)
+        if self.cache_size:
+            self.hot[game_id] = views
+            while len(self.hot) > self.cache_size:
+                self.hot.popitem(last=False)
+                self.stats['evictions'] += 1
+        return views
+
+    def _cached_list(self, key):
+        cached = self.lists.get(key)
+        if cached is not None:
+            self.lists.move_to_end(key)
+        return cached
+
+    def _keep_list(self, key, cached):
+        self.lists[key] = cached
+        while len(self.lists) > self.list_cache_size:
+            self.lists.popitem(last=False)
+        return cached
+
+    def _list(self, path, filters, build):
+        key = (self.index.version, path, filters)
+        cached = self._cached_list(key)
+        if cached is None:
+            cached = self._keep_list(key, _body(build()))
+        return cached
+
+    def _games_filters(self, params):
+        """The /games filters as a cache key: known parameters only, the team resolved to its index name"""
+        filters = {name: params[name] for name in GAMES_FILTERS if name in params}
+        if 'team' in filters:
+            filters['team'] = self.index.team(filters['team'])
+        if 'limit' in filters and not filters['limit'].isdigit():
+            del filters['limit']  # Ignored by _filtered_games
+        return tuple(sorted(filters.items(), key=lambda item: item[0]))
+
+    def _summaries(self, game_ids, limit=None):
+        return [self.index.games[game_id] for game_id in game_ids[:limit]]
+
+    def _filtered_games(self, params):
+        """Summaries for /games: narrowed by the team or date index first, then by the other filters"""
+        index = self.index
+        team, date = params.get('team'), params.get('date')
+        if team is not None:
+            team = index.team(team)
+            game_ids = index.by_team.get(team, []) if team else []
+        elif date is not None:
+            game_ids = index.by_date.get(date, [])
+        else:
+            game_ids = index.order
+        start, end, season = params.get('from'), params.get('to'), params.get('season')
+        games = [game for game in self._summaries(game_ids)
+                 if (date is None or game['date'] == date) and (season is None or game['season'] == season)
+                 and (start is None or (game['date'] or '') >= start) and (end is None or (game['date'] or '') <= end)]
+        limit = params.get('limit')
+        return {'games': games[:int(limit)] if limit and limit.isdigit() else games}
+
+    async def respond(self, target):
+        """(status, body, etag) for a request target such as /games?team=湖人"""
+        self.stats['requests'] += 1
+        url = urlsplit(target)
+        parts = [unquote(part) for part in url.path.strip('/').split('/') if part]
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+
+        if parts == ['health']:
+            return (200,) + _body({'games': len(self.index.games), 'hot_games': len(self.hot),
+                                   'cache_size': self.cache_size, 'cached_lists': len(self.lists), **self.stats})
+        if parts == ['games']:
+            return (200,) + self._list('/games', self._games_filters(params), lambda: self._filtered_games(params))
+        if parts == ['teams']:
+            return (200,) + self._list('/teams', (), lambda: {
+                'teams': {team: len(ids) for team, ids in sorted(self.index.by_team.items())}})
+
+        if len(parts) in (2, 3) and parts[0] == 'games':
+            game_id = parts[1].lower()
+            view = parts[2] if len(parts) == 3 else None
+            if view is not None and view not in GAME_TABLES:
+                return _error(404, f"Unknown table {view!r} (choose from {', '.join(GAME_TABLES)})")
+            views = await self.game_views(game_id)
+            if views is None:
+                return _error(404, f"Unknown game {game_id}")
+            return (200,) + views[view]
+
+        if len(parts) == 3 and parts[0] == 'teams' and parts[2] in ('games', 'season_stats'):
+            team = self.index.team(parts[1])
+            if team is None:
+                return _error(404, f"No games for team {parts[1]!r}")
+            if parts[2] == 'games':
+                return (200,) + self._list('/teams/games', (team,), lambda: {
+                    'team': team, 'games': self._summaries(self.index.by_team[team])})
+            key = (self.index.version, '/teams/season_stats', (team,))
+            cached = self._cached_list(key)
+            if cached is None:
+                # Season stats are cumulative: the newest game with rows for the team wins
+                result = {'team': team, 'game_id': None, 'date': None, 'statistics': []}
+                for game_id in self.index.by_team[team]:
+                    views = await self.game_views(game_id)
+                    stats = json.loads(views['team_season_stats'][0]) if views else []
+                    rows = [row for row in stats if row['team'] == team]
+                    if rows:
+                        result.update(game_id=game_id, date=self.index.games[game_id]['date'], statistics=rows)
+                        break
+                cached = self._keep_list(key, _body(result))
+            return (200,) + cached
+
+        if len(parts) == 2 and parts[0] == 'dates':
+            return (200,) + self._list('/dates', (parts[1],), lambda: {
+                'date': parts[1], 'games': self._summaries(self.index.by_date.get(parts[1], []))})
+
+        return _error(404, f"Unknown path {url.path}")
+
+
+def _error(status, message):
+    body, _ = _body({'error': message})
+    return status, body, None
+
+
+async def handle_connection(service, reader, writer):
+    """Serve HTTP/1.1 requests on one connection (keep-alive) until the client closes it"""
+    import asyncio
+    try:
+        while True:
+            try:
+                head = await reader.readuntil(b'\r\n\r\n')
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                return
+            lines = head.decode('latin-1').split('\r\n')
+            try:
+                method, target, version = lines[0].split(' ', 2)
+            except ValueError:
+                await _send(writer, 400, *_error(400, 'Malformed request line')[1:], keep_alive=False)
+                return
+            headers = {}
+            for line in lines[1:]:
+                name, sep, value = line.partition(':')
+                if sep:
+                    headers[name.strip().lower()] = value.strip()
+            keep_alive = (headers.get('connection', '').lower() != 'close'
+                          and (version == 'HTTP/1.1' or headers.get('connection', '').lower() == 'keep-alive'))
+
+            # Request bodies are never read; drain them so the next request on the connection starts clean
+            length = headers.get('content-length', '0')
+            if 'transfer-encoding' in headers or not length.isdigit() or int(length) > MAX_REQUEST_BYTES:
+                keep_alive = False  # Can't skip this body reliably: answer, then close
+            elif int(length):
+                try:
+                    await reader.readexactly(int(length))
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    return
+
+            if method not in ('GET', 'HEAD'):
+                status, body, etag = _error(405, f"Method {method} not allowed")
+            else:
+                try:
+                    status, body, etag = await service.respond(target.encode('latin-1').decode('utf-8'))
+                except Exception as e:
+                    status, body, etag = _error(500, f"{type(e).__name__}: {e}")
+            if etag is not None and etag in headers.get('if-none-match', ''):
+                service.stats['not_modified'] += 1
+                status, body = 304, b''
+            await _send(writer, status, body, etag, keep_alive, head_only=method == 'HEAD')
+            if not keep_alive:
+                return
+    finally:
+        writer.close()
+
+
+async def _send(writer, status, body, etag, keep_alive, head_only=False):
+    headers = [f"HTTP/1.1 {status} {REASONS.get(status, '')}",
+               'Content-Type: application/json; charset=utf-8',
+               f"Content-Length: {len(body)}",
+               'Cache-Control: no-cache',
+               f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+    if etag is not None:
+        headers.append(f"ETag: {etag}")
+    writer.write(('\r\n'.join(headers) + '\r\n\r\n').encode('latin-1') + (b'' if head_only else body))
+    await writer.drain()
+
+
+def open_source(store=None, root=None):
+    """StoreSource for a store path, otherwise a WorkbookSource over root (default output_excel/)"""
+    from .writers import DEFAULT_ROOTS
+    if store:
+        return StoreSource(store)
+    return WorkbookSource(root or DEFAULT_ROOTS['excel'])
+
+
+async def serve(service, address=DEFAULT_API_ADDRESS, ready=None):
+    """Index the source, then serve on host:port or a Unix socket until cancelled; calls ready(server) once listening"""
+    import asyncio
+
+    from .daemon import parse_address
+
+    start = time.perf_counter()
+    await service.refresh()
+    family, location = parse_address(address)
+
+    def handler(reader, writer):
+        return handle_connection(service, reader, writer)
+
+    if family == socket.AF_INET:
+        server = await asyncio.start_server(handler, *location, limit=MAX_REQUEST_BYTES)
+        location = 'http://{}:{}/'.format(*server.sockets[0].getsockname()[:2])
+    else:
+        server = await asyncio.start_unix_server(handler, location, limit=MAX_REQUEST_BYTES)
+    print(f"Serving {len(service.index.games)} games on {location} "
+          f"(indexed in {time.perf_counter() - start:.2f}s, up to {service.cache_size} hot games cached)")
+    if ready is not None:
+        ready(server)
+    refresher = asyncio.ensure_future(service.refresh_forever())
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        refresher.cancel()
+        service.executor.submit(service.source.close).result()
+        service.executor.shutdown()
@@ -0,0 +1,307 @@
+"""
+Season game store
+Append-only SQLite store of scraped games keyed by game UUID, with indexed team/date/player queries
+"""
+
+import json
+import math
+import os
+import re
+import time
+
+from .teams import TEAM_RESOLVER
+from .writers import OutputWriter, game_date, season_of
+
+
+DEFAULT_STORE_PATH = 'nba_games.sqlite'
+
+_TEAM_WITH_ENGLISH = re.compile(r'^(.*)\((.+)\)$')
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS games (
+    game_id TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    date TEXT,
+    season TEXT,
+    home_team TEXT,
+    away_team TEXT,
+    home_score TEXT,
+    away_score TEXT,
+    scraped_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS games_date ON games (date);
+CREATE INDEX IF NOT EXISTS games_season ON games (season);
+
+CREATE TABLE IF NOT EXISTS game_teams (
+    game_id TEXT NOT NULL,
+    team TEXT NOT NULL,
+    PRIMARY KEY (game_id, team)
+);
+CREATE INDEX IF NOT EXISTS game_teams_team ON game_teams (team);
+
+CREATE TABLE IF NOT EXISTS players (
+    game_id TEXT NOT NULL,
+    team TEXT,
+    player TEXT NOT NULL,
+    position TEXT,
+    starter INTEGER,
+    seconds INTEGER,
+    fgm INTEGER, fga INTEGER, fg3m INTEGER, fg3a INTEGER, ftm INTEGER, fta INTEGER,
+    oreb INTEGER, dreb INTEGER, reb INTEGER, ast INTEGER, stl INTEGER, blk INTEGER,
+    tov INTEGER, pf INTEGER, pts INTEGER, plus_minus INTEGER
+);
+CREATE INDEX IF NOT EXISTS players_game ON players (game_id);
+CREATE INDEX IF NOT EXISTS players_player ON players (player);
+CREATE INDEX IF NOT EXISTS players_team ON players (team);
+
+CREATE TABLE IF NOT EXISTS quarter_scores (
+    game_id TEXT NOT NULL,
+    row_index INTEGER NOT NULL,
+    cells TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS quarter_scores_game ON quarter_scores (game_id);
+
+CREATE TABLE IF NOT EXISTS team_season_stats (
+    game_id TEXT NOT NULL,
+    team TEXT NOT NULL,
+    statistic TEXT NOT NULL,
+    value TEXT,
+    league_rank TEXT
+);
+CREATE INDEX IF NOT EXISTS team_season_stats_game ON team_season_stats (game_id);
+CREATE INDEX IF NOT EXISTS team_season_stats_team ON team_season_stats (team);
+
+CREATE TABLE IF NOT EXISTS team_aliases (
+    alias TEXT PRIMARY KEY,
+    team TEXT NOT NULL
+);
+'''
+
+PLAYER_COLUMNS = ('team', 'player', 'position', 'starter', 'seconds', 'fgm', 'fga', 'fg3m', 'fg3a',
+                  'ftm', 'fta', 'oreb', 'dreb', 'reb', 'ast', 'stl', 'blk', 'tov', 'pf', 'pts', 'plus_minus')
+
+
+def canonical_team(name, team_name_mapping):
+    """Canonical (English) team name from 'Chinese(English)', a mapped Chinese name, or an English name"""
+    if not name:
+        return name
+    name = name.strip()
+    match = _TEAM_WITH_ENGLISH.match(name)
+    if match:
+        return match.group(2).strip()
+    return TEAM_RESOLVER.english(name, team_name_mapping)
+
+
+def _plain(value):
+    """SQLite-friendly scalar: missing values become NULL, numpy scalars become Python ones"""
+    import pandas as pd
+    if value is None or value is pd.NA or (isinstance(value, float) and math.isnan(value)):
+        return None
+    return value.item() if hasattr(value, 'item') else value
+
+
+class GameStore:
+    """
+    SQLite store of every scraped game
+
+    Writing a game replaces any earlier rows for the same game id, so
+    rescraping is idempotent. Teams are stored under their canonical names.
+    """
+
+    def __init__(self, path=DEFAULT_STORE_PATH):
+        import sqlite3
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.executescript(SCHEMA)
+        self._allow_unknown_dates()
+
+    def _allow_unknown_dates(self):
+        """Rebuild a games table from older stores, which required a date, so undated games store NULL"""
+        required = {name for _, name, _, notnull, _, _ in self.conn.execute('PRAGMA table_info(games)') if notnull}
+        if 'date' not in required:
+            return
+        create = SCHEMA[SCHEMA.index('CREATE TABLE IF NOT EXISTS games'):SCHEMA.index(';')]
+        with self.conn:
+            self.conn.execute(create.replace('IF NOT EXISTS games', 'games_new'))
+            self.conn.execute('INSERT INTO games_new SELECT * FROM games')
+            self.conn.execute('DROP TABLE games')
+            self.conn.execute('ALTER TABLE games_new RENAME TO games')
+        self.conn.executescript(SCHEMA)  # Indexes went with the old table
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def write_game(self, scraper):
+        """Insert or replace everything scraped for one game"""
+        mapping = scraper.team_name_mapping
+        game_id = scraper.game_id
+        date = game_date(scraper)
+        teams = [canonical_team(name, mapping) for name in scraper.team_names]
+        info = scraper.game_data
+
+        players = scraper.player_frame()
+        player_rows = []
+        for record in players.to_dict('records'):
+            record['team'] = canonical_team(record.get('team'), mapping)
+            player_rows.append((game_id,) + tuple(_plain(record.get(col)) for col in PLAYER_COLUMNS))
+
+        quarter_rows = []
+        for sheet in scraper.build_sheets():
+            if sheet.table == 'quarter_scores':
+                quarter_rows = [(game_id, i, json.dumps([_plain(v) for v in row], ensure_ascii=False))
+                                for i, row in enumerate(sheet.frame.itertuples(index=False, name=None))]
+        season_rows = [(game_id, canonical_team(team, mapping), statistic, _plain(value), _plain(rank))
+                       for team, statistic, value, rank in
+                       scraper.season_stats_frame().itertuples(index=False, name=None)]
+
+        with self.conn:
+            for table in ('games', 'game_teams', 'players', 'quarter_scores', 'team_season_stats'):
+                self.conn.execute(f'DELETE FROM {table} WHERE game_id = ?', (game_id,))
+            self.conn.execute(
+                'INSERT INTO games VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (game_id, scraper.url, date, season_of(date),
+                 teams[0] if len(teams) > 0 else canonical_team(info.get('home_team'), mapping),
+                 teams[1] if len(teams) > 1 else canonical_team(info.get('away_team'), mapping),
+                 info.get('home_score'), info.get('away_score'), time.time()))
+            self.conn.executemany('INSERT OR IGNORE INTO game_teams VALUES (?, ?)',
+                                  [(game_id, team) for team in teams])
+            placeholders = ', '.join('?' * (len(PLAYER_COLUMNS) + 1))
+            self.conn.executemany(f'INSERT INTO players (game_id, {", ".join(PLAYER_COLUMNS)}) '
+                                  f'VALUES ({placeholders})', player_rows)
+            self.conn.executemany('INSERT INTO quarter_scores VALUES (?, ?, ?)', quarter_rows)
+            self.conn.executemany('INSERT INTO team_season_stats VALUES (?, ?, ?, ?, ?)', season_rows)
+            self.conn.executemany('INSERT OR IGNORE INTO team_aliases VALUES (?, ?)',
+                                  [(alias, team) for alias, team in mapping.items()] +
+                                  [(team, team) for team in set(mapping.values())])
+
+    def resolve_team(self, name):
+        """Canonical team name for any alias seen in scraped games ('湖人', '湖人(Lakers)', 'Lakers')"""
+        name = name.strip()
+        match = _TEAM_WITH_ENGLISH.match(name)
+        if match:
+            return match.group(2).strip()
+        row = self.conn.execute('SELECT team FROM team_aliases WHERE alias = ?', (name,)).fetchone()
+        return row[0] if row else TEAM_RESOLVER.english(name)
+
+    def games_for_team(self, team, season=None):
+        """Games involving a team (any known name), newest first"""
+        query = 'SELECT g.* FROM games g JOIN game_teams t ON t.game_id = g.game_id WHERE t.team = ?'
+        params = [self.resolve_team(team)]
+        if season:
+            query += ' AND g.season = ?'
+            params.append(season)
+        return self._rows(query + ' ORDER BY g.date DESC', params)
+
+    def games_between(self, start_date, end_date):
+        """Games with start_date <= date <= end_date (YYYY-MM-DD)"""
+        return self._rows('SELECT * FROM games WHERE date BETWEEN ? AND ? ORDER BY date',
+                          (start_date, end_date))
+
+    def player_games(self, player):
+        """Every box-score line of a player, newest game first"""
+        return self._rows('SELECT g.date, g.season, p.* FROM players p JOIN games g ON g.game_id = p.game_id '
+                          'WHERE p.player = ? ORDER BY g.date DESC', (player,))
+
+    def games_scraped_since(self, timestamp):
+        """Games stored or re-stored after a scraped_at timestamp, oldest first"""
+        return self._rows('SELECT * FROM games WHERE scraped_at > ? ORDER BY scraped_at', (timestamp,))
+
+    def players_frame(self, game_ids=None):
+        """Box-score rows with game_id and date, for the given games or every stored game"""
+        import pandas as pd
+        query = 'SELECT p.game_id, g.date, p.* FROM players p JOIN games g ON g.game_id = p.game_id'
+        columns = ['game_id', 'date', 'p_game_id'] + list(PLAYER_COLUMNS)
+        if game_ids is None:
+            frame = pd.DataFrame(self.conn.execute(query).fetchall(), columns=columns)
+        else:
+            game_ids = list(game_ids)
+            chunks = []
+            for start in range(0, len(game_ids), 500):  # Stay under SQLite's bound-parameter limit
+                chunk = game_ids[start:start + 500]
+                chunks.extend(self.conn.execute(f"{query} WHERE p.game_id IN ({', '.join('?' * len(chunk))})",
+                                                chunk).fetchall())
+            frame = pd.DataFrame(chunks, columns=columns)
+        return frame.drop(columns='p_game_id')
+
+    def season_stats_frame(self):
+        """Every stored team season statistic in long format, with game_id and date (see src.consolidate)"""
+        import pandas as pd
+        cursor = self.conn.execute('SELECT s.game_id, g.date, s.team, s.statistic, s.value, s.league_rank '
+                                   'FROM team_season_stats s JOIN games g ON g.game_id = s.game_id')
+        return pd.DataFrame(cursor.fetchall(),
+                            columns=['game_id', 'date', 'Team', 'Statistic', 'Value', 'League Rank'])
+
+    def game_tables(self, game_id):
+        """Box score, quarter score rows and team season stats of one game, as JSON-ready lists"""
+        players = self._rows(f'SELECT {", ".join(PLAYER_COLUMNS)} FROM players WHERE game_id = ? ORDER BY rowid',
+                             (game_id,))
+        for player in players:
+            player['starter'] = None if player['starter'] is None else bool(player['starter'])
+        quarters = [json.loads(cells) for (cells,) in self.conn.execute(
+            'SELECT cells FROM quarter_scores WHERE game_id = ? ORDER BY row_index', (game_id,))]
+        season = self._rows('SELECT team, statistic, value, league_rank FROM team_season_stats '
+                            'WHERE game_id = ? ORDER BY rowid', (game_id,))
+        return {'box_score': players, 'quarter_scores': quarters, 'team_season_stats': season}
+
+    def has_game(self, game_id):
+        return self.conn.execute('SELECT 1 FROM games WHERE game_id = ?', (game_id,)).fetchone() is not None
+
+    def summary(self):
+        """Counts per table plus games per team and the covered date range"""
+        count = lambda table: self.conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+        first, last = self.conn.execute('SELECT MIN(date), MAX(date) FROM games').fetchone()
+        teams = self.conn.execute('SELECT team, COUNT(*) FROM game_teams GROUP BY team '
+                                  'ORDER BY COUNT(*) DESC, team').fetchall()
+        return {
+            'games': count('games'),
+            'players': count('players'),
+            'quarter_scores': count('quarter_scores'),
+            'team_season_stats': count('team_season_stats'),
+            'first_date': first,
+            'last_date': last,
+            'games_per_team': dict(teams),
+        }
+
+    def game_overview(self):
+        """One row per game with its teams and how many rows each table holds for it"""
+        return self._rows('''
+            SELECT g.game_id, g.date, g.home_team, g.away_team,
+                   (SELECT COUNT(*) FROM players p WHERE p.game_id = g.game_id) AS players,
+                   (SELECT COUNT(*) FROM quarter_scores q WHERE q.game_id = g.game_id) AS quarter_scores,
+                   (SELECT COUNT(*) FROM team_season_stats s WHERE s.game_id = g.game_id) AS team_season_stats
+            FROM games g ORDER BY g.date, g.game_id''', ())
+
+    def _rows(self, query, params):
+        cursor = self.conn.execute(query, params)
+        columns = [description[0] for description in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+class StoreOutput(OutputWriter):
+    """Writer that upserts each scraped game into the GameStore at root"""
+
+    format = 'store'
+
+    def __init__(self, root=DEFAULT_STORE_PATH):
+        self.root = root
+
+    def write(self, scraper, basename):
+        try:
+            with GameStore(self.root) as store:
+                store.write_game(scraper)
+            print(f"Game {scraper.game_id} stored in {self.root}")
+            return self.root
+        except Exception as e:
+            print(f"Error saving to store: {e}")
+            return None
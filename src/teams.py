@@ -0,0 +1,201 @@
+"""
+Team name resolution
+One shared resolver for all 30 teams: canonical ids, Chinese and English names and abbreviations,
+matched after Unicode normalization with an Aho-Corasick automaton
+"""
+
+import difflib
+import re
+import unicodedata
+from collections import deque, namedtuple
+
+
+Team = namedtuple('Team', ['id', 'english', 'full_name', 'chinese', 'aliases'])
+
+# id, English name, full English name, Chinese name used in filenames, other aliases
+TEAMS = [
+    Team('BOS', 'Celtics', 'Boston Celtics', '塞爾蒂克', ('塞爾提克', '凱爾特人', '波士頓塞爾蒂克')),
+    Team('BKN', 'Nets', 'Brooklyn Nets', '籃網', ('布魯克林籃網', 'BRK')),
+    Team('NYK', 'Knicks', 'New York Knicks', '尼克', ('紐約尼克',)),
+    Team('PHI', '76ers', 'Philadelphia 76ers', '76人', ('七六人', '費城76人', 'Sixers')),
+    Team('TOR', 'Raptors', 'Toronto Raptors', '暴龍', ('速龍', '多倫多暴龍')),
+    Team('CHI', 'Bulls', 'Chicago Bulls', '公牛', ('芝加哥公牛',)),
+    Team('CLE', 'Cavaliers', 'Cleveland Cavaliers', '騎士', ('克里夫蘭騎士', 'Cavs')),
+    Team('DET', 'Pistons', 'Detroit Pistons', '活塞', ('底特律活塞',)),
+    Team('IND', 'Pacers', 'Indiana Pacers', '溜馬', ('印第安納溜馬',)),
+    Team('MIL', 'Bucks', 'Milwaukee Bucks', '公鹿', ('密爾瓦基公鹿',)),
+    Team('ATL', 'Hawks', 'Atlanta Hawks', '老鷹', ('亞特蘭大老鷹',)),
+    Team('CHA', 'Hornets', 'Charlotte Hornets', '黃蜂', ('夏洛特黃蜂', 'CHO')),
+    Team('MIA', 'Heat', 'Miami Heat', '熱火', ('邁阿密熱火',)),
+    Team('ORL', 'Magic', 'Orlando Magic', '魔術', ('奧蘭多魔術',)),
+    Team('WAS', 'Wizards', 'Washington Wizards', '巫師', ('華盛頓巫師',)),
+    Team('DEN', 'Nuggets', 'Denver Nuggets', '金塊', ('丹佛金塊',)),
+    Team('MIN', 'Timberwolves', 'Minnesota Timberwolves', '灰狼', ('明尼蘇達灰狼', 'Wolves')),
+    Team('OKC', 'Thunder', 'Oklahoma City Thunder', '雷霆', ('俄克拉荷馬雷霆', '奧克拉荷馬雷霆')),
+    Team('POR', 'Trail Blazers', 'Portland Trail Blazers', '拓荒者', ('波特蘭拓荒者', 'Blazers')),
+    Team('UTA', 'Jazz', 'Utah Jazz', '爵士', ('猶他爵士',)),
+    Team('GSW', 'Warriors', 'Golden State Warriors', '勇士', ('金州勇士',)),
+    Team('LAC', 'Clippers', 'LA Clippers', '快艇', ('洛杉磯快艇', 'Los Angeles Clippers')),
+    Team('LAL', 'Lakers', 'Los Angeles Lakers', '湖人', ('洛杉磯湖人',)),
+    Team('PHX', 'Suns', 'Phoenix Suns', '太陽', ('鳳凰城太陽', 'PHO')),
+    Team('SAC', 'Kings', 'Sacramento Kings', '國王', ('沙加緬度國王',)),
+    Team('DAL', 'Mavericks', 'Dallas Mavericks', '獨行俠', ('小牛', '達拉斯獨行俠', '達拉斯小牛', 'Mavs')),
+    Team('HOU', 'Rockets', 'Houston Rockets', '火箭', ('休士頓火箭',)),
+    Team('MEM', 'Grizzlies', 'Memphis Grizzlies', '灰熊', ('曼菲斯灰熊',)),
+    Team('NOP', 'Pelicans', 'New Orleans Pelicans', '鵜鶘', ('紐奧良鵜鶘',)),
+    Team('SAS', 'Spurs', 'San Antonio Spurs', '馬刺', ('聖安東尼奧馬刺',)),
+]
+
+# Chinese name -> English name, the lookup table the scraper has always exposed
+TEAM_NAME_MAPPING = {name: team.english for team in TEAMS
+                     for name in (team.chinese,) + team.aliases if not name.isascii()}
+
+# Trailing 隊 ("team"), e.g. 湖人隊 or 洛杉磯湖人隊
+TEAM_SUFFIX = '隊'
+
+# 'Chinese(English)' labels written by the scraper
+_LABEL_PATTERN = re.compile(r'^(.*)\((.+)\)$')
+_WHITESPACE = re.compile(r'\s+')
+
+# Minimum similarity for the fuzzy fallback on English names (catches typos like 'Lakres');
+# candidates must also share the first letter, so 'wheat' isn't taken for 'heat'
+FUZZY_CUTOFF = 0.8
+
+
+def normalize(text):
+    """NFKC (full-width to half-width), case-folded, whitespace collapsed and trimmed"""
+    return _WHITESPACE.sub(' ', unicodedata.normalize('NFKC', text).casefold()).strip()
+
+
+def _is_word_char(char):
+    return char.isascii() and char.isalnum()
+
+
+class AliasAutomaton:
+    """
+    Aho-Corasick automaton over normalized aliases
+
+    Finds every alias occurring in a text in one linear pass. ASCII aliases
+    only match on word boundaries, so 'heat' doesn't match inside 'wheat'.
+    """
+
+    def __init__(self, aliases):
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]  # (length, ascii, value) of the aliases ending at each node, longest first
+        for alias, value in aliases.items():
+            node = 0
+            for char in alias:
+                following = self.goto[node].get(char)
+                if following is None:
+                    following = len(self.goto)
+                    self.goto[node][char] = following
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                node = following
+            self.output[node].append((len(alias), alias.isascii(), value))
+
+        # Breadth-first failure links; each node also reports its suffixes' aliases
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self.goto[node].items():
+                queue.append(child)
+                state = self.fail[node]
+                while state and char not in self.goto[state]:
+                    state = self.fail[state]
+                self.fail[child] = 0 if node == 0 else self.goto[state].get(char, 0)
+                self.output[child] = self.output[child] + self.output[self.fail[child]]
+        for outputs in self.output:
+            outputs.sort(key=lambda item: -item[0])
+
+    def find(self, text):
+        """Non-overlapping (start, end, value) matches in an already normalized text, leftmost-longest"""
+        matches = []
+        node = 0
+        for end, char in enumerate(text, 1):
+            while node and char not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(char, 0)
+            for length, ascii_alias, value in self.output[node]:
+                start = end - length
+                if ascii_alias and ((start > 0 and _is_word_char(text[start - 1])) or
+                                    (end < len(text) and _is_word_char(text[end]))):
+                    continue
+                matches.append((start, end, value))
+
+        selected = []
+        last_end = 0
+        for start, end, value in sorted(matches, key=lambda match: (match[0], match[0] - match[1])):
+            if start >= last_end:
+                selected.append((start, end, value))
+                last_end = end
+        return selected
+
+
+class TeamResolver:
+    """
+    Resolves any team mention to its Team
+
+    Exact lookups cover ids, abbreviations and every name after normalization
+    (and without a trailing 隊). Free text is scanned with the alias automaton;
+    abbreviations are left out of scanning since they collide with stat headers
+    such as MIN.
+    """
+
+    def __init__(self, teams):
+        self.teams = list(teams)
+        self.by_id = {team.id: team for team in self.teams}
+        self.exact = {}
+        scanned = {}
+        for team in self.teams:
+            names = (team.english, team.full_name, team.chinese) + team.aliases
+            for name in names + (team.id,):
+                self.exact.setdefault(normalize(name), team)
+            for name in names:
+                if not (name.isascii() and name.isupper()):  # Abbreviations are exact-only
+                    scanned.setdefault(normalize(name), team)
+        self.automaton = AliasAutomaton(scanned)
+        self._english_names = {normalize(name): team for team in self.teams
+                               for name in (team.english, team.full_name) + team.aliases if name.isascii()}
+
+    def resolve(self, text):
+        """The Team named by text, or None when it names no team (or more than one)"""
+        key = normalize(text) if text else ''
+        if not key:
+            return None  # Empty or whitespace only
+        team = self.exact.get(key) or self.exact.get(key.removesuffix(TEAM_SUFFIX).strip())
+        if team is not None:
+            return team
+
+        label = _LABEL_PATTERN.match(key)
+        if label:
+            return self.resolve(label.group(2)) or self.resolve(label.group(1))
+
+        mentioned = {team.id: team for team in self.find_teams(key, normalized=True)}
+        if len(mentioned) == 1:
+            return next(iter(mentioned.values()))
+        if not mentioned and key.isascii():
+            candidates = [name for name in self._english_names if name[0] == key[0]]
+            close = difflib.get_close_matches(key, candidates, n=1, cutoff=FUZZY_CUTOFF)
+            if close:
+                return self._english_names[close[0]]
+        return None
+
+    def find_teams(self, text, normalized=False):
+        """Every team mentioned in text, in order of appearance (repeats included)"""
+        if not text:
+            return []
+        return [team for _, _, team in self.automaton.find(text if normalized else normalize(text))]
+
+    def english(self, name, mapping=TEAM_NAME_MAPPING):
+        """English team name for any mention; exact mapping entries win, unknown names pass through"""
+        if name in mapping:
+            return mapping[name]
+        team = self.resolve(name)
+        return team.english if team is not None else name
+
+
+# Built once at import time and shared by every scraper
+TEAM_RESOLVER = TeamResolver(TEAMS)
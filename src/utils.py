@@ -2,107 +2,374 @@
 Utility functions for NBA Game Data Scraper
 """
 
-import pandas as pd
+import json
 import os
+from concurrent.futures import ProcessPoolExecutor
 
 
-def check_excel_data(filename=None):
+# Sheets every scraped workbook should contain
+EXPECTED_SHEETS = ['Player Stats', 'Quarter Scores', 'Team Season Statistics']
+
+# Metadata index kept next to the workbooks; entries are reused while a file's mtime and size are unchanged
+INDEX_FILENAME = '.workbook_index.json'
+INDEX_VERSION = 1
+
+SAMPLE_ROWS = 3
+_PLAYER_KEYWORDS = ('name', 'player', '球員', '先發')
+
+
+def _cell(value):
+    """JSON-friendly cell value for the index"""
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+def _sheet_info(worksheet, sample_rows, summaries):
+    """
+    Dimensions, header row and first data rows of a read-only worksheet
+
+    Uses the sheet's stored dimensions when present; workbooks written in
+    write-only mode have none, so their rows are streamed and counted. With
+    summaries, player and season-stat sheets are streamed in full to count
+    players and list statistics.
+    """
+    name = worksheet.title
+    player_sheet = summaries and 'Player Stats' in name
+    season_sheet = summaries and name == 'Team Season Statistics'
+    max_row, max_column = worksheet.max_row, worksheet.max_column
+    stream = max_row is None or player_sheet or season_sheet
+    if stream:
+        worksheet.reset_dimensions()
+
+    header, sample = [], []
+    player_column, players, statistics = None, set(), []
+    row_count, column_count = 0, 0
+    for row in worksheet.iter_rows(values_only=True, max_row=None if stream else 1 + sample_rows):
+        row_count += 1
+        column_count = max(column_count, len(row))
+        if row_count == 1:
+            header = [_cell(value) for value in row]
+            player_column = next((i for i, col in enumerate(header)
+                                  if any(keyword in str(col).lower() for keyword in _PLAYER_KEYWORDS)), None)
+            continue
+        if len(sample) < sample_rows:
+            sample.append([_cell(value) for value in row])
+        if player_sheet and player_column is not None and player_column < len(row) and row[player_column] is not None:
+            players.add(row[player_column])
+        if season_sheet and row:
+            statistics.append(_cell(row[0]))
+
+    info = {
+        'name': name,
+        'rows': max(row_count - 1, 0) if stream else max(max_row - 1, 0),
+        'columns': column_count if stream else max_column,
+        'header': header,
+        'sample': sample,
+    }
+    if player_sheet and player_column is not None:
+        info['players'] = len(players)
+    if season_sheet:
+        info['statistics'] = statistics
+    return info
+
+
+def workbook_info(filename, sample_rows=SAMPLE_ROWS, summaries=False):
+    """
+    Sheet names, dimensions, header rows and sample rows of a workbook, read
+    with openpyxl's read-only (streaming) mode instead of loading DataFrames
+
+    summaries adds the unique player count of player-stat sheets and the
+    statistics listed in the season-stat sheet. Returns a JSON-serializable
+    dict; unreadable files get an 'error' entry.
+    """
+    from openpyxl import load_workbook
+
+    stat = os.stat(filename)
+    info = {'path': filename, 'mtime': stat.st_mtime, 'size': stat.st_size, 'sheets': []}
+    try:
+        workbook = load_workbook(filename, read_only=True, data_only=True)
+    except Exception as e:
+        info['error'] = f"{type(e).__name__}: {e}"
+        return info
+    try:
+        info['sheets'] = [_sheet_info(worksheet, sample_rows, summaries) for worksheet in workbook.worksheets]
+    except Exception as e:
+        info['error'] = f"{type(e).__name__}: {e}"
+    finally:
+        workbook.close()
+    return info
+
+
+def validate_workbook(info):
+    """Problems found in a workbook_info() result; an empty list means the workbook looks complete"""
+    if info.get('error'):
+        return [f"unreadable ({info['error']})"]
+    names = [sheet['name'] for sheet in info['sheets']]
+    problems = [f"{sheet} sheet missing" for sheet in EXPECTED_SHEETS if sheet not in names]
+    if not any('_Players' in name for name in names):
+        problems.append("no team player sheets")
+    problems.extend(f"{sheet['name']} sheet empty" for sheet in info['sheets']
+                    if sheet['name'] in EXPECTED_SHEETS and sheet['rows'] == 0)
+    return problems
+
+
+class WorkbookIndex:
+    """
+    Cached metadata for every workbook under a directory
+
+    scan() re-reads only workbooks that are new or whose mtime or size
+    changed, spreading them over a process pool, and saves the index as JSON
+    in the directory (.workbook_index.json).
+    """
+
+    def __init__(self, root=None, path=None):
+        from .writers import DEFAULT_ROOTS
+
+        self.root = root or DEFAULT_ROOTS['excel']
+        self.path = path or os.path.join(self.root, INDEX_FILENAME)
+        self.entries = {}
+        self.read = 0  # Workbooks (re)read by the last scan
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                document = json.load(f)
+        except (OSError, ValueError):
+            return
+        if document.get('version') == INDEX_VERSION:
+            self.entries = document.get('workbooks', {})
+
+    def save(self):
+        temporary = f"{self.path}.tmp"
+        with open(temporary, 'w', encoding='utf-8') as f:
+            json.dump({'version': INDEX_VERSION, 'workbooks': self.entries}, f, ensure_ascii=False)
+        os.replace(temporary, self.path)
+
+    def scan(self, workers=None):
+        """workbook_info() of every .xlsx under root, oldest first"""
+        if not os.path.isdir(self.root):
+            return []
+        current = {}
+        stale = []
+        for entry in os.scandir(self.root):
+            if not (entry.is_file() and entry.name.endswith('.xlsx')) or entry.name.startswith('~$'):
+                continue
+            stat = entry.stat()
+            cached = self.entries.get(entry.name)
+            if cached is not None and cached['mtime'] == stat.st_mtime and cached['size'] == stat.st_size:
+                current[entry.name] = cached
+            else:
+                stale.append(entry.path)
+
+        self.read = len(stale)
+        if len(stale) > 1 and workers != 1:
+            with ProcessPoolExecutor(workers) as pool:
+                infos = list(pool.map(workbook_info, stale, chunksize=max(1, len(stale) // 32)))
+        else:
+            infos = [workbook_info(path) for path in stale]
+        for info in infos:
+            current[os.path.basename(info['path'])] = info
+
+        changed = bool(stale) or current.keys() != self.entries.keys()
+        self.entries = current
+        if changed:
+            self.save()
+        return sorted(current.values(), key=lambda info: (info['mtime'], info['path']))
+
+
+def latest_workbook(root=None):
+    """Most recently written workbook under the Excel output directory, falling back to nba_game_data*.xlsx"""
+    infos = WorkbookIndex(root).scan()
+    if infos:
+        return infos[-1]['path']
+    excel_files = [f for f in os.listdir('.') if f.endswith('.xlsx') and f.startswith('nba_game_data')]
+    return sorted(excel_files)[-1] if excel_files else None
+
+
+def check_excel_data(filename=None, store=None):
     """
     Check and display the contents of the scraped NBA data
 
     Args:
-        filename: Specific Excel file to check, or None for latest
+        filename: Specific Excel file to check, or None for the latest in output_excel
+        store: Path of a GameStore database; summarizes every stored game instead of an Excel file
     """
+    if store:
+        summarize_store(store)
+        return
+
+    filename = filename or latest_workbook()
     if not filename:
-        # Find the most recent Excel file
-        excel_files = [f for f in os.listdir('.') if f.endswith('.xlsx') and f.startswith('nba_game_data')]
-        if not excel_files:
-            print("No Excel files found")
-            return
-        filename = sorted(excel_files)[-1]
+        print("No Excel files found")
+        return
 
     print(f"Checking file: {filename}")
     print("=" * 60)
 
-    # Read all sheets
-    with pd.ExcelFile(filename) as xls:
-        sheet_names = xls.sheet_names
-        print(f"Found {len(sheet_names)} sheets in the Excel file:\n")
+    info = workbook_info(filename, summaries=True)
+    if info.get('error'):
+        print(f"Could not read workbook: {info['error']}")
+        return
+    print(f"Found {len(info['sheets'])} sheets in the Excel file:\n")
 
-        for sheet_name in sheet_names:
-            df = pd.read_excel(xls, sheet_name=sheet_name)
-            print(f"\n--- Sheet: {sheet_name} ---")
-            print(f"Shape: {df.shape} (rows: {df.shape[0]}, columns: {df.shape[1]})")
+    for sheet in info['sheets']:
+        print(f"\n--- Sheet: {sheet['name']} ---")
+        print(f"Shape: ({sheet['rows']}, {sheet['columns']}) (rows: {sheet['rows']}, columns: {sheet['columns']})")
 
-            if not df.empty:
-                print("\nColumn names:")
-                print(list(df.columns))
+        if sheet['header']:
+            print("\nColumn names:")
+            print(sheet['header'])
 
-                print("\nFirst few rows:")
-                print(df.head(3))
+            print("\nFirst few rows:")
+            for row in sheet['sample']:
+                print(row)
 
-                # Show summary for player stats
-                if 'Player Stats' in sheet_name and df.shape[0] > 0:
-                    print("\nSample player data:")
-                    # Try to find columns with player names and points
-                    for col in df.columns:
-                        if any(keyword in str(col).lower() for keyword in ['name', 'player', '球員']):
-                            print(f"Players found: {df[col].nunique()} unique players")
-                            break
+            # Show summary for player stats
+            if 'players' in sheet and sheet['rows'] > 0:
+                print("\nSample player data:")
+                print(f"Players found: {sheet['players']} unique players")
 
-                # Show team statistics summary
-                if sheet_name == 'Team Season Statistics':
-                    print("\nStatistics included:")
-                    if 'Statistic' in df.columns:
-                        for stat in df['Statistic'].tolist():
-                            print(f"  • {stat}")
+            # Show team statistics summary
+            if sheet.get('statistics') and 'Statistic' in sheet['header']:
+                print("\nStatistics included:")
+                for stat in sheet['statistics']:
+                    print(f"  • {stat}")
 
-            print("-" * 60)
+        print("-" * 60)
 
 
-def verify_sheets(filename=None):
+def verify_sheets(filename=None, store=None):
     """
     Verify the sheet names in the generated Excel file
 
     Args:
-        filename: Specific Excel file to check, or None for latest
+        filename: Specific Excel file to check, or None for the latest in output_excel
+        store: Path of a GameStore database; verifies every stored game instead of an Excel file
     """
+    if store:
+        verify_store(store)
+        return
+
+    filename = filename or latest_workbook()
     if not filename:
-        # Find the most recent Excel file
-        excel_files = [f for f in os.listdir('.') if f.endswith('.xlsx') and f.startswith('nba_game_data')]
-        if not excel_files:
-            print("No Excel files found")
-            return
-        filename = sorted(excel_files)[-1]
+        print("No Excel files found")
+        return
 
     print(f"Checking file: {filename}")
     print("=" * 50)
 
-    # Read and display sheet names
-    with pd.ExcelFile(filename) as xls:
-        sheet_names = xls.sheet_names
-        print(f"Found {len(sheet_names)} sheets:\n")
+    info = workbook_info(filename, sample_rows=0)
+    if info.get('error'):
+        print(f"Could not read workbook: {info['error']}")
+        return
+    sheet_names = [sheet['name'] for sheet in info['sheets']]
+    print(f"Found {len(sheet_names)} sheets:\n")
 
-        for i, sheet_name in enumerate(sheet_names, 1):
-            df = pd.read_excel(xls, sheet_name=sheet_name)
-            print(f"{i:2}. {sheet_name:<35} ({df.shape[0]} rows, {df.shape[1]} columns)")
+    for i, sheet in enumerate(info['sheets'], 1):
+        print(f"{i:2}. {sheet['name']:<35} ({sheet['rows']} rows, {sheet['columns']} columns)")
 
-        # Check for key sheets
-        print("\n" + "=" * 50)
-        print("Sheet Structure Verification:")
+    # Check for key sheets
+    print("\n" + "=" * 50)
+    print("Sheet Structure Verification:")
 
-        expected_sheets = ['Player Stats', 'Quarter Scores', 'Team Season Statistics']
-        for sheet in expected_sheets:
-            if sheet in sheet_names:
-                print(f"✅ {sheet} sheet found")
-            else:
-                print(f"❌ {sheet} sheet missing")
-
-        # Check for team player sheets
-        team_sheets = [s for s in sheet_names if '_Players' in s]
-        if team_sheets:
-            print(f"✅ Found {len(team_sheets)} team player sheets:")
-            for sheet in team_sheets:
-                print(f"   - {sheet}")
+    for sheet in EXPECTED_SHEETS:
+        if sheet in sheet_names:
+            print(f"✅ {sheet} sheet found")
         else:
-            print("❌ No team player sheets found")
\ No newline at end of file
+            print(f"❌ {sheet} sheet missing")
+
+    # Check for team player sheets
+    team_sheets = [s for s in sheet_names if '_Players' in s]
+    if team_sheets:
+        print(f"✅ Found {len(team_sheets)} team player sheets:")
+        for sheet in team_sheets:
+            print(f"   - {sheet}")
+    else:
+        print("❌ No team player sheets found")
+
+
+def verify_workbooks(root=None, workers=None):
+    """
+    Verify every workbook in the Excel output directory
+
+    Only workbooks added or changed since the last run are opened (in
+    parallel); the rest come from the metadata index.
+
+    Args:
+        root: Directory of workbooks, output_excel by default
+        workers: Processes reading changed workbooks (default: CPU count)
+    """
+    index = WorkbookIndex(root)
+    infos = index.scan(workers)
+
+    print(f"Checking directory: {index.root}")
+    print("=" * 50)
+    print(f"Found {len(infos)} workbooks ({index.read} read, {len(infos) - index.read} from index):\n")
+
+    incomplete = 0
+    for i, info in enumerate(infos, 1):
+        problems = validate_workbook(info)
+        incomplete += bool(problems)
+        status = "✅" if not problems else "❌"
+        print(f"{i:3}. {status} {os.path.basename(info['path'])} ({len(info['sheets'])} sheets)"
+              + (f" {'; '.join(problems)}" if problems else ""))
+
+    print("\n" + "=" * 50)
+    print(f"{len(infos) - incomplete} complete, {incomplete} incomplete")
+    return incomplete == 0
+
+
+def summarize_store(path):
+    """
+    Summarize every game in a GameStore without opening any Excel file
+
+    Args:
+        path: Path of the GameStore database
+    """
+    from .store import GameStore
+
+    with GameStore(path) as store:
+        summary = store.summary()
+
+    print(f"Checking store: {path}")
+    print("=" * 60)
+    print(f"Games: {summary['games']} ({summary['first_date']} to {summary['last_date']})")
+    print(f"Player lines: {summary['players']}")
+    print(f"Quarter score rows: {summary['quarter_scores']}")
+    print(f"Team season stat entries: {summary['team_season_stats']}")
+    if summary['games_per_team']:
+        print("\nGames per team:")
+        for team, games in summary['games_per_team'].items():
+            print(f"  • {team}: {games}")
+
+
+def verify_store(path):
+    """
+    Verify that every game in a GameStore has the tables the Excel export would contain
+
+    Args:
+        path: Path of the GameStore database
+    """
+    from .store import GameStore
+
+    with GameStore(path) as store:
+        games = store.game_overview()
+
+    print(f"Checking store: {path}")
+    print("=" * 50)
+    print(f"Found {len(games)} games:\n")
+
+    incomplete = 0
+    for i, game in enumerate(games, 1):
+        missing = [table for table in ('players', 'quarter_scores', 'team_season_stats') if not game[table]]
+        status = "✅" if not missing else "❌"
+        incomplete += bool(missing)
+        print(f"{i:3}. {status} {game['date']} {game['home_team']} vs {game['away_team']} "
+              f"({game['players']} players, {game['quarter_scores']} quarter rows, "
+              f"{game['team_season_stats']} season stats)"
+              + (f" missing: {', '.join(missing)}" if missing else ""))
+
+    print("\n" + "=" * 50)
+    print(f"{len(games) - incomplete} complete, {incomplete} incomplete")
@@ -0,0 +1,325 @@
+"""
+Live game watch mode
+Polls a game page, fingerprints each table and emits only changed rows as JSON-lines deltas
+"""
+
+import hashlib
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+from .cache import is_final
+from .layout import BOX_SCORE, CLASSIFIER, QUARTER_SCORES
+from .lxml_parser import game_status, parse_document, table_rows, xpath
+from .fetcher import create_fetcher
+
+
+DEFAULT_INTERVAL = 60
+DEFAULT_ARTIFACT_DIR = 'output_live'
+MIN_INTERVAL = 15
+MAX_INTERVAL = 300
+
+# Interval multipliers: poll faster while the page changes, back off while it doesn't
+SPEED_UP = 0.5
+BACK_OFF = 1.5
+
+_TABLES = '//table'  # Compiled by xpath() on first use
+
+ARTIFACT_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS live_rows (
+    table_index INTEGER NOT NULL,
+    row_key TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    cells TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (table_index, row_key)
+);
+CREATE TABLE IF NOT EXISTS live_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+'''
+
+
+# Delta kinds of the classified table roles; every other table is 'table'
+ROLE_KINDS = {QUARTER_SCORES: 'quarter', BOX_SCORE: 'player'}
+
+
+def table_kind(rows, source=None):
+    """'quarter' for quarter scores, 'player' for box scores, 'table' for everything else"""
+    data = [row for row in rows if row]
+    if not data:
+        return 'table'
+    return ROLE_KINDS.get(CLASSIFIER.classify(data, source), 'table')
+
+
+def row_name(cells, kind='table'):
+    """
+    Name of a row: its first cell (player or statistic name)
+
+    Quarter-score rows start with an empty team logo cell, so they are named
+    by their first non-empty cell, the team name.
+    """
+    if kind == 'quarter':
+        return next((cell for cell in cells if cell), '')
+    return cells[0]
+
+
+def keyed_rows(rows, kind='table'):
+    """
+    Rows keyed by their name (see row_name)
+
+    Repeated or empty names get their occurrence number appended so every
+    row keeps a stable key between polls.
+    """
+    keyed = {}
+    seen = {}
+    for position, cells in enumerate(rows):
+        if not cells:
+            continue
+        name = row_name(cells, kind) or '#'
+        count = seen[name] = seen.get(name, 0) + 1
+        keyed[name if count == 1 else f'{name}#{count}'] = (position, cells)
+    return keyed
+
+
+def diff_rows(previous, current):
+    """(op, key, position, cells) for every added, updated or removed row"""
+    changes = []
+    for key, (position, cells) in current.items():
+        old = previous.get(key)
+        if old is None:
+            changes.append(('add', key, position, cells))
+        elif old[1] != cells:
+            changes.append(('update', key, position, cells))
+    for key, (position, cells) in previous.items():
+        if key not in current:
+            changes.append(('remove', key, position, cells))
+    return changes
+
+
+class LiveArtifact:
+    """
+    SQLite file holding the latest row of every table, updated in place
+
+    Each poll touches only the rows that changed, inside one transaction, so
+    readers always see a complete snapshot.
+    """
+
+    def __init__(self, path):
+        import sqlite3
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.executescript(ARTIFACT_SCHEMA)
+
+    def apply(self, deltas, meta):
+        now = time.time()
+        with self.conn:
+            for delta in deltas:
+                if delta['op'] == 'remove':
+                    self.conn.execute('DELETE FROM live_rows WHERE table_index = ? AND row_key = ?',
+                                      (delta['table'], delta['key']))
+                else:
+                    self.conn.execute('INSERT OR REPLACE INTO live_rows VALUES (?, ?, ?, ?, ?, ?)',
+                                      (delta['table'], delta['key'], delta['kind'], delta['position'],
+                                       json.dumps(delta['cells'], ensure_ascii=False), now))
+            self.conn.executemany('INSERT OR REPLACE INTO live_meta VALUES (?, ?)',
+                                  [(key, str(value)) for key, value in meta.items()])
+
+    def rows(self, table_index):
+        """Current rows of one table in page order"""
+        cursor = self.conn.execute('SELECT cells FROM live_rows WHERE table_index = ? ORDER BY position',
+                                   (table_index,))
+        return [json.loads(cells) for (cells,) in cursor.fetchall()]
+
+    def close(self):
+        self.conn.close()
+
+
+class GameWatcher:
+    """
+    Polls one game page and reports what changed since the previous poll
+
+    A poll stops early when the server answers 304 or the body is byte-for-byte
+    unchanged. Otherwise each table's raw markup is hashed, and only tables whose
+    hash changed have their cell text extracted and diffed row by row.
+    """
+
+    def __init__(self, url, interval=DEFAULT_INTERVAL, min_interval=MIN_INTERVAL, max_interval=MAX_INTERVAL,
+                 stream=None, artifact=None, session=None, cache=None):
+        self.url = url
+        self.interval = interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.stream = stream or sys.stdout
+        self.artifact = artifact  # Optional LiveArtifact updated after every changed poll
+        self.session = session or create_fetcher()
+        self.cache = cache  # Optional ResponseCache; supplies and stores validators
+        self.polls = 0
+        self.last_html = None
+        self.final = False
+        self._etag = None
+        self._last_modified = None
+        self._body_digest = None
+        self._fingerprints = []
+        self._tables = []  # Per table: (kind, keyed rows)
+
+    def fetch(self):
+        """
+        (page text, response headers), or (None, None) when the server reports it unchanged
+
+        The caller stores a fetched page in the cache once it knows the game status.
+        """
+        headers = {}
+        if self._etag is None and self._last_modified is None and self.cache is not None:
+            entry = self.cache.lookup(self.url)
+            if entry is not None:
+                self._etag, self._last_modified = entry.etag, entry.last_modified
+                self.last_html = entry.text
+        if self._etag:
+            headers['If-None-Match'] = self._etag
+        if self._last_modified:
+            headers['If-Modified-Since'] = self._last_modified
+
+        response = self.session.get(self.url, timeout=30, headers=headers)
+        if response.status_code == 304:
+            if self.cache is not None:
+                self.cache.mark_revalidated(self.url)
+            # A first poll revalidated from the cache still has to be diffed once
+            return (self.last_html if self.polls == 1 and self._body_digest is None else None), None
+
+        response.raise_for_status()
+        response.encoding = 'utf-8'
+        self._etag = response.headers.get('ETag')
+        self._last_modified = response.headers.get('Last-Modified')
+        return response.text, response.headers
+
+    def poll(self):
+        """Fetch once and return the list of row deltas (empty when nothing changed)"""
+        from lxml import etree
+
+        self.polls += 1
+        html, headers = self.fetch()
+        if html is None:
+            return []
+
+        digest = hashlib.blake2b(html.encode('utf-8'), digest_size=16).digest()
+        if digest == self._body_digest:
+            self._store(html, headers)
+            return []
+        self._body_digest = digest
+        self.last_html = html
+        root = parse_document(html)
+        # The page's own game status; another game ending on the same page must not stop the watch
+        self.final = is_final(game_status(html, root))
+        self._store(html, headers)
+        if root is None:
+            return []
+
+        deltas = []
+        elements = xpath(_TABLES)(root)
+        for index, element in enumerate(elements):
+            fingerprint = hashlib.blake2b(etree.tostring(element), digest_size=16).digest()
+            if index < len(self._fingerprints) and self._fingerprints[index] == fingerprint:
+                continue  # Unchanged markup: skip text extraction entirely
+
+            rows = table_rows(element)
+            kind = table_kind(rows, self.url)
+            current = keyed_rows(rows, kind)
+            previous = self._tables[index][1] if index < len(self._tables) else {}
+            for op, key, position, cells in diff_rows(previous, current):
+                deltas.append(self._delta(op, kind, index, key, position, cells))
+
+            if index < len(self._fingerprints):
+                self._fingerprints[index] = fingerprint
+                self._tables[index] = (kind, current)
+            else:
+                self._fingerprints.append(fingerprint)
+                self._tables.append((kind, current))
+
+        # Tables that disappeared from the page
+        for index in range(len(elements), len(self._tables)):
+            kind, previous = self._tables[index]
+            for key, (position, cells) in previous.items():
+                deltas.append(self._delta('remove', kind, index, key, position, cells))
+        del self._fingerprints[len(elements):]
+        del self._tables[len(elements):]
+
+        return deltas
+
+    def _store(self, html, headers):
+        """Cache a downloaded page with the status this poll already parsed, instead of parsing it again"""
+        if self.cache is not None and headers is not None:
+            self.cache.store(self.url, html, headers, self.final)
+
+    def _delta(self, op, kind, index, key, position, cells):
+        delta = {'poll': self.polls, 'op': op, 'kind': kind, 'table': index,
+                 'key': key, 'position': position, 'cells': cells}
+        team = self._team_of(kind, index) if kind == 'player' else None
+        if kind == 'quarter' and position > 0:
+            team = row_name(cells, kind)
+        if team:
+            delta['team'] = team
+        return delta
+
+    def _team_of(self, kind, index):
+        """Team of a box-score table: the n-th box score belongs to the n-th team row of the quarter table"""
+        quarter = next((rows for other, rows in self._tables if other == 'quarter'), None)
+        if kind != 'player' or quarter is None:
+            return None
+        ordinal = sum(1 for other, _ in self._tables[:index] if other == 'player')
+        quarter_rows = sorted(quarter.values())
+        teams = [row_name(cells, 'quarter') for position, cells in quarter_rows if position > 0]
+        return teams[ordinal] if ordinal < len(teams) else None
+
+    def emit(self, deltas):
+        """Write deltas to the stream as JSON lines and apply them to the artifact"""
+        timestamp = datetime.now().isoformat(timespec='seconds')
+        for delta in deltas:
+            self.stream.write(json.dumps(dict(delta, time=timestamp), ensure_ascii=False) + '\n')
+        self.stream.flush()
+        if self.artifact is not None:
+            self.artifact.apply(deltas, self._meta(timestamp))
+
+    def _meta(self, timestamp):
+        return {'url': self.url, 'polls': self.polls, 'updated_at': timestamp, 'final': int(self.final)}
+
+    def next_interval(self, changed):
+        """Halve the interval after a change, grow it by half after a quiet poll, within bounds"""
+        factor = SPEED_UP if changed else BACK_OFF
+        self.interval = min(self.max_interval, max(self.min_interval, self.interval * factor))
+        return self.interval
+
+    def run(self, max_polls=None):
+        """
+        Poll until the game is final and unchanged, or max_polls is reached
+
+        Returns the number of deltas emitted.
+        """
+        emitted = 0
+        while True:
+            try:
+                deltas = self.poll()
+            except Exception as e:
+                print(f"Error polling {self.url}: {e}", file=sys.stderr)
+                deltas = None
+
+            if deltas:
+                self.emit(deltas)
+                emitted += len(deltas)
+            print(f"Poll {self.polls}: {len(deltas) if deltas else 0} changed rows"
+                  f"{' (final)' if self.final else ''}", file=sys.stderr)
+
+            if (self.final and deltas == []) or (max_polls and self.polls >= max_polls):
+                if self.artifact is not None:
+                    self.artifact.apply([], self._meta(datetime.now().isoformat(timespec='seconds')))
+                return emitted
+            time.sleep(self.next_interval(bool(deltas)))
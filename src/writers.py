@@ -0,0 +1,403 @@
+"""
+Output writers
+Export a scraped game to Excel, CSV, Parquet (partitioned by season/date/team) or Arrow IPC,
+or spool it into combined workbooks holding a whole night, a team's games or every game
+"""
+
+import glob
+import os
+import pickle
+import re
+import time
+
+
+# Default output directory per format
+DEFAULT_ROOTS = {
+    'excel': 'output_excel',
+    'csv': 'output_csv',
+    'parquet': 'output_parquet',
+    'arrow': 'output_arrow',
+    'combined': 'output_combined',
+}
+
+EXCEL_MODES = ('normal', 'write-only')
+
+# How the combined writer groups games into workbooks
+COMBINE_BY = ('night', 'team', 'all')
+
+# Logical tables holding raw grids the parsers did not recognize (Table_N sheets)
+RAW_TABLE_PATTERN = re.compile(r'table_\d+$')
+
+_DATE_PATTERN = re.compile(r'(\d{4})[-/.](\d{1,2})[-/.](\d{1,2})')
+# Partition and workbook label of games whose page has no date
+UNKNOWN_DATE = 'unknown'
+
+
+def parse_date(text):
+    """First date in text as YYYY-MM-DD ('2025/11/21 08:30' -> '2025-11-21'), or None"""
+    match = _DATE_PATTERN.search(text or '')
+    if match:
+        year, month, day = (int(part) for part in match.groups())
+        return f"{year:04d}-{month:02d}-{day:02d}"
+    return None
+
+
+def game_date(scraper):
+    """Game date as YYYY-MM-DD from the parsed game info, or None when the page has none"""
+    return parse_date(scraper.game_data.get('date', ''))
+
+
+def season_of(date):
+    """NBA season label for a YYYY-MM-DD date; seasons start in October (2025-11-21 -> 2025-26), None without one"""
+    if not date:
+        return None
+    year, month = int(date[:4]), int(date[5:7])
+    start = year if month >= 10 else year - 1
+    return f"{start}-{(start + 1) % 100:02d}"
+
+
+def logical_tables(scraper):
+    """
+    The game's exported tables keyed by logical table name
+
+    Same content as the Excel sheets, shaped for columnar formats: every table
+    gets a game_id column, per-team sheets are merged with a team column, raw
+    grids get c0..cN column names and player_stats uses the typed box score.
+    """
+    import pandas as pd
+    grouped = {}
+    for sheet in scraper.build_sheets():
+        if sheet.table == 'player_stats':
+            frame = scraper.player_frame()
+        else:
+            frame = sheet.frame.copy()
+            frame.columns = [str(col) if sheet.header else f'c{col}' for col in frame.columns]
+        if sheet.team is not None:
+            frame.insert(0, 'team', sheet.team)
+        frame.insert(0, 'game_id', scraper.game_id)
+        grouped.setdefault(sheet.table, []).append(frame)
+
+    return {name: frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+            for name, frames in grouped.items()}
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError("Parquet and Arrow output require pyarrow (pip install pyarrow)")
+    return pyarrow
+
+
+def _excel_value(value):
+    """Plain Python value for openpyxl; missing values become empty cells"""
+    import pandas as pd
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    return value.item() if hasattr(value, 'item') else value
+
+
+def save_excel_write_only(sheets, filename):
+    """Stream sheets into a workbook with openpyxl's write-only (constant memory) mode"""
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    for sheet in sheets:
+        worksheet = workbook.create_sheet(sheet.name)
+        if sheet.header:
+            worksheet.append([str(col) for col in sheet.frame.columns])
+        for row in sheet.frame.itertuples(index=False, name=None):
+            worksheet.append([_excel_value(value) for value in row])
+    workbook.save(filename)
+
+
+class OutputWriter:
+    """Base class: writes one game under root and returns the written path, or None on failure"""
+
+    format = None
+
+    def __init__(self, root=None):
+        self.root = root or DEFAULT_ROOTS[self.format]
+
+    def ensure_root(self):
+        if not os.path.exists(self.root):
+            os.makedirs(self.root, exist_ok=True)
+            print(f"Created directory: {self.root}")
+
+    def write(self, scraper, basename):
+        self.ensure_root()
+        try:
+            return self._write(scraper, basename)
+        except Exception as e:
+            print(f"Error saving to {self.format}: {e}")
+            return None
+
+    def _write(self, scraper, basename):
+        raise NotImplementedError
+
+    def close(self):
+        """Finish output spanning several games; returns the paths written (per-game writers have none)"""
+        return []
+
+
+class ExcelOutput(OutputWriter):
+    """One workbook per game; 'write-only' streams rows without keeping cell objects in memory"""
+
+    format = 'excel'
+
+    def __init__(self, root=None, mode='normal'):
+        super().__init__(root)
+        if mode not in EXCEL_MODES:
+            raise ValueError(f"Unknown Excel mode: {mode}")
+        self.mode = mode
+
+    def _write(self, scraper, basename):
+        path = os.path.join(self.root, f"{basename}.xlsx")
+        if self.mode == 'normal':
+            return path if scraper.save_to_excel(path) else None
+
+        save_excel_write_only(scraper.build_sheets(), path)
+        print(f"Data saved to {path}")
+        return path
+
+
+class CSVOutput(OutputWriter):
+    """One directory per game holding a CSV file per logical table"""
+
+    format = 'csv'
+
+    def _write(self, scraper, basename):
+        directory = os.path.join(self.root, basename)
+        os.makedirs(directory, exist_ok=True)
+        for name, frame in logical_tables(scraper).items():
+            frame.to_csv(os.path.join(directory, f"{name}.csv"), index=False)
+        print(f"Data saved to {directory}")
+        return directory
+
+
+class ArrowOutput(OutputWriter):
+    """One directory per game holding an Arrow IPC file per logical table"""
+
+    format = 'arrow'
+
+    def _write(self, scraper, basename):
+        pyarrow = _require_pyarrow()
+        directory = os.path.join(self.root, basename)
+        os.makedirs(directory, exist_ok=True)
+        for name, frame in logical_tables(scraper).items():
+            table = pyarrow.Table.from_pandas(frame, preserve_index=False)
+            with pyarrow.OSFile(os.path.join(directory, f"{name}.arrow"), 'wb') as sink:
+                with pyarrow.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+        print(f"Data saved to {directory}")
+        return directory
+
+
+class ParquetOutput(OutputWriter):
+    """
+    A Parquet dataset per logical table, partitioned by season/date (and team where present)
+
+    Files are named after the game id, so rewriting a game replaces its files.
+    """
+
+    format = 'parquet'
+
+    def _write(self, scraper, basename):
+        pyarrow = _require_pyarrow()
+        import pyarrow.parquet as pq
+
+        date = game_date(scraper)
+        season = season_of(date) or UNKNOWN_DATE
+        date = date or UNKNOWN_DATE
+        for name, frame in logical_tables(scraper).items():
+            frame = frame.assign(season=season, date=date)
+            partition_cols = ['season', 'date'] + (['team'] if 'team' in frame.columns else [])
+            frame = frame.astype({col: str for col in partition_cols})
+            pq.write_to_dataset(pyarrow.Table.from_pandas(frame, preserve_index=False),
+                                os.path.join(self.root, name),
+                                partition_cols=partition_cols,
+                                basename_template=f"{scraper.game_id}-{{i}}.parquet",
+                                existing_data_behavior='overwrite_or_ignore')
+        print(f"Data saved to {self.root}")
+        return self.root
+
+
+def _sheet_title(table):
+    """Sheet name of a logical table in a combined workbook (player_stats -> Player Stats)"""
+    return table.replace('_', ' ').title()[:31]
+
+
+def _safe_filename(name):
+    return re.sub(r'[\\/:*?"<>|]', '_', name)
+
+
+class CombinedExcelOutput(OutputWriter):
+    """
+    Many games in one workbook per night, per team or overall, one sheet per logical table
+
+    write() only spools the game's logical tables (with their game_id column)
+    to a small file under root/.games; close() then streams the spooled games
+    of every workbook the run touched into openpyxl's write-only mode, one game
+    in memory at a time. Spool files are kept, so a later run that adds games
+    to a night rebuilds its workbook with all of them. Spooling per game also
+    works from batch mode's worker processes.
+    """
+
+    format = 'combined'
+
+    def __init__(self, root=None, combine_by='night', skip_raw_tables=False):
+        super().__init__(root)
+        if combine_by not in COMBINE_BY:
+            raise ValueError(f"Unknown grouping: {combine_by} (choose from {', '.join(COMBINE_BY)})")
+        self.combine_by = combine_by
+        self.skip_raw_tables = skip_raw_tables
+        self.started = time.time()  # Spool files written since then belong to this run
+
+    @property
+    def spool_dir(self):
+        return os.path.join(self.root, '.games')
+
+    def groups_of(self, meta):
+        """Names of the workbooks a game belongs to"""
+        if self.combine_by == 'night':
+            return [f"nba_{meta['date'] or UNKNOWN_DATE}"]
+        if self.combine_by == 'team':
+            return [_safe_filename(team) for team in meta['teams']] or ['unknown_team']
+        return ['nba_games']
+
+    def _write(self, scraper, basename):
+        os.makedirs(self.spool_dir, exist_ok=True)
+        tables = {}
+        for name, frame in logical_tables(scraper).items():
+            if self.skip_raw_tables and RAW_TABLE_PATTERN.match(name):
+                continue
+            if name == 'team_season_statistics':
+                # The wide sheet has a column pair per team; long format keeps one column set for every game
+                frame = scraper.season_stats_frame()
+                frame.insert(0, 'game_id', scraper.game_id)
+            tables[name] = ([str(col) for col in frame.columns],
+                            [[_excel_value(value) for value in row]
+                             for row in frame.itertuples(index=False, name=None)])
+        meta = {'game_id': scraper.game_id, 'date': game_date(scraper), 'teams': list(scraper.team_names_chinese),
+                'columns': {name: columns for name, (columns, _) in tables.items()}}
+
+        # Metadata first, so close() can plan the workbooks without loading any rows
+        path = os.path.join(self.spool_dir, f"{_safe_filename(scraper.game_id)}.pkl")
+        with open(path + '.tmp', 'wb') as f:
+            pickle.dump(meta, f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(tables, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(path + '.tmp', path)
+
+        workbook = os.path.join(self.root, f"{self.groups_of(meta)[0]}.xlsx")
+        print(f"Game {scraper.game_id} spooled for {workbook}")
+        return workbook
+
+    def close(self):
+        """Rebuild every workbook holding a game spooled since this writer was created"""
+        spooled = []
+        for path in sorted(glob.glob(os.path.join(self.spool_dir, '*.pkl'))):
+            with open(path, 'rb') as f:
+                spooled.append((path, pickle.load(f)))
+
+        touched = {group for path, meta in spooled if os.path.getmtime(path) >= self.started
+                   for group in self.groups_of(meta)}
+        written = []
+        for group in sorted(touched):
+            games = sorted(((path, meta) for path, meta in spooled if group in self.groups_of(meta)),
+                           key=lambda item: (item[1]['date'] or '', item[1]['game_id']))
+            filename = os.path.join(self.root, f"{group}.xlsx")
+            save_combined_workbook(games, filename, self.skip_raw_tables)
+            print(f"Combined {len(games)} games into {filename}")
+            written.append(filename)
+        return written
+
+
+def save_combined_workbook(games, filename, skip_raw_tables=False):
+    """
+    Stream spooled games ((path, metadata) pairs) into one write-only workbook
+
+    Each sheet's columns are the union of its games' columns in order of first
+    appearance; every game's spool file is read once.
+    """
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font, NamedStyle, PatternFill
+
+    columns = {}
+    for _, meta in games:
+        for table, table_columns in meta['columns'].items():
+            if skip_raw_tables and RAW_TABLE_PATTERN.match(table):
+                continue
+            known = columns.setdefault(table, [])
+            known.extend(column for column in table_columns if column not in known)
+
+    workbook = Workbook(write_only=True)
+    # Registered once and referenced by name from every header cell
+    header_style = NamedStyle('header', font=Font(bold=True), fill=PatternFill('solid', fgColor='DDEBF7'))
+    workbook.add_named_style(header_style)
+
+    sheets = {}
+    for table, table_columns in columns.items():
+        worksheet = workbook.create_sheet(_sheet_title(table))
+        worksheet.freeze_panes = 'A2'
+        header = []
+        for column in table_columns:
+            cell = WriteOnlyCell(worksheet, value=column)
+            cell.style = 'header'
+            header.append(cell)
+        worksheet.append(header)
+        sheets[table] = (worksheet, {column: i for i, column in enumerate(table_columns)})
+
+    for path, _ in games:
+        with open(path, 'rb') as f:
+            pickle.load(f)
+            tables = pickle.load(f)
+        for table, (table_columns, rows) in tables.items():
+            if table not in sheets:
+                continue
+            worksheet, positions = sheets[table]
+            targets = [positions[column] for column in table_columns]
+            for row in rows:
+                cells = [None] * len(positions)
+                for target, value in zip(targets, row):
+                    cells[target] = value
+                worksheet.append(cells)
+        tables = None
+
+    workbook.save(filename)
+
+
+WRITERS = {
+    'excel': ExcelOutput,
+    'csv': CSVOutput,
+    'parquet': ParquetOutput,
+    'arrow': ArrowOutput,
+    'combined': CombinedExcelOutput,
+}
+
+
+def create_writers(formats, excel_mode='normal', roots=None, combine_by='night', skip_raw_tables=False):
+    """Writers for a list of format names; roots optionally overrides output directories per format"""
+    writers = []
+    for name in formats:
+        if name not in WRITERS:
+            raise ValueError(f"Unknown output format: {name} (choose from {', '.join(WRITERS)})")
+        root = (roots or {}).get(name)
+        if name == 'excel':
+            writers.append(ExcelOutput(root, mode=excel_mode))
+        elif name == 'combined':
+            writers.append(CombinedExcelOutput(root, combine_by=combine_by, skip_raw_tables=skip_raw_tables))
+        else:
+            writers.append(WRITERS[name](root))
+    return writers
+
+
+def close_writers(writers):
+    """Finish multi-game outputs once every game is written; returns the paths written"""
+    paths = []
+    for writer in writers:
+        try:
+            paths.extend(writer.close())
+        except Exception as e:
+            print(f"Error finishing {writer.format} output: {e}")
+    return paths